@@ -404,9 +404,13 @@ class WaterborneDiseaseChatbot:
         
         return user_input
     
-    def extract_symptoms(self, user_input: str) -> List[str]:
-        """Extract symptoms from user input using keyword matching"""
-        user_input = self.preprocess_user_input(user_input)
+    def extract_symptoms(self, user_input: str, processed_input: Optional[str] = None) -> List[str]:
+        """Extract symptoms from user input using keyword matching
+
+        Pass ``processed_input`` when preprocess_user_input() already ran on
+        this input to skip the synonym pass.
+        """
+        user_input = processed_input if processed_input is not None else self.preprocess_user_input(user_input)
         found_symptoms = []
         
         for disease in self.diseases:
@@ -416,16 +420,18 @@ class WaterborneDiseaseChatbot:
         
         return list(set(found_symptoms))
     
-    def diagnose_disease(self, user_input: str) -> List[Tuple[Dict, float, List[str]]]:
+    def diagnose_disease(self, user_input: str,
+                         processed_input: Optional[str] = None) -> List[Tuple[Dict, float, List[str]]]:
         """Diagnose potential diseases based on symptoms using RAG approach"""
         if not self.diseases:
             return []
         
-        # Preprocess input
-        processed_input = self.preprocess_user_input(user_input)
+        # Preprocess input (once - extract_symptoms reuses it)
+        if processed_input is None:
+            processed_input = self.preprocess_user_input(user_input)
         
         # Extract symptoms
-        found_symptoms = self.extract_symptoms(user_input)
+        found_symptoms = self.extract_symptoms(user_input, processed_input)
         
         # Create vector for user input
         user_vector = self.vectorizer.transform([processed_input])
@@ -879,10 +885,18 @@ Currently loaded diseases: {len(self.diseases)} diseases in database
 
 
 # Web API functions
-def create_web_api_response(user_symptoms: str, db_path: str = "waterborne_diseases.db") -> Dict:
-    """Function to be used in web API - returns structured JSON response"""
-    chatbot = WaterborneDiseaseChatbot(db_path)
-    disease_matches = chatbot.diagnose_disease(user_symptoms)
+def create_web_api_response(user_symptoms: str, db_path: str = "waterborne_diseases.db",
+                            chatbot: Optional[WaterborneDiseaseChatbot] = None,
+                            processed_input: Optional[str] = None) -> Dict:
+    """Function to be used in web API - returns structured JSON response
+
+    Pass an already initialized ``chatbot`` to reuse its loaded knowledge base
+    and TF-IDF vectors instead of rebuilding them for every request, and
+    ``processed_input`` when the caller already ran preprocess_user_input().
+    """
+    if chatbot is None:
+        chatbot = WaterborneDiseaseChatbot(db_path)
+    disease_matches = chatbot.diagnose_disease(user_symptoms, processed_input)
     
     if not disease_matches:
         return {
@@ -10,11 +10,15 @@ Features:
 - Symptom analysis using the existing chatbot
 - Disease prediction with probability scores
 - Speech-to-text integration support
+- Streaming analysis of partial speech transcripts over WebSocket
+- Hot reload of the disease knowledge base (file watcher or admin endpoint)
 - Regional context for Northeast India
 - Enhanced regional language processing
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Dict, List, Optional
@@ -22,6 +26,7 @@ import sys
 import os
 import json
 import logging
+import secrets
 
 # Add the AI chatbot directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'AI chatbot'))
@@ -38,6 +43,10 @@ sys.path.append(os.path.dirname(__file__))
 # Add the data directory to path for accessing existing data services
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'data'))
 
+from request_coalescing import AsyncSingleFlight
+from admission_control import AsyncAdmissionController, OverloadedError
+from symptom_stream import StreamingSymptomSession
+
 try:
     from disease_prediction_service import DiseasePredictor
 except ImportError as e:
@@ -77,6 +86,21 @@ chatbot = None
 chatbot_db_path = None
 disease_predictor = None
 
+# Concurrent identical symptom analyses share one computation
+symptom_analysis_flight = AsyncSingleFlight()
+
+# Bounds concurrent analyses; excess requests queue briefly, then get a 503
+# (limits from NIROGYA_SYMPTOM_ANALYSIS_MAX_CONCURRENT / _MAX_QUEUE / _QUEUE_TIMEOUT)
+symptom_analysis_admission = AsyncAdmissionController.from_env("NIROGYA_SYMPTOM_ANALYSIS")
+
+# Seconds between knowledge base file checks (0 disables the watcher)
+KNOWLEDGE_WATCH_INTERVAL = float(os.environ.get("NIROGYA_KB_WATCH_INTERVAL", "5"))
+knowledge_watcher = None
+
+# /admin endpoints require this value in the X-Admin-Token header; without
+# it they are disabled (403), so an unconfigured deployment is never open
+ADMIN_TOKEN = os.environ.get("NIROGYA_ADMIN_TOKEN")
+
 # Pydantic models for request/response
 class SymptomAnalysisRequest(BaseModel):
     name: str
@@ -105,25 +129,49 @@ class SymptomAnalysisResponse(BaseModel):
     recommendations: List[str]
     emergency_contacts: Dict[str, str]
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize the chatbot and disease predictor on startup"""
+def initialize_services():
+    """
+    Load the SQLite knowledge base, fit the TF-IDF vectors and build the
+    disease predictor.
+
+    Safe to call more than once: services that are already loaded are kept.
+    The prefork launcher (prefork_server.py) calls this in the master process
+    so forked workers inherit the loaded state instead of rebuilding it.
+    """
     global chatbot, chatbot_db_path, disease_predictor
-    
+
     try:
         # Initialize the chatbot
-        chatbot_db_path = os.path.join(os.path.dirname(__file__), '..', 'AI chatbot', 'waterborne_diseases.db')
-        chatbot = WaterborneDiseaseChatbot(chatbot_db_path)
-        logger.info("Chatbot initialized successfully")
-        
+        if chatbot is None:
+            chatbot_db_path = os.path.join(os.path.dirname(__file__), '..', 'AI chatbot', 'waterborne_diseases.db')
+            chatbot = WaterborneDiseaseChatbot(chatbot_db_path)
+            logger.info("Chatbot initialized successfully")
+
         # Initialize the disease predictor
-        if DiseasePredictor:
+        if DiseasePredictor and disease_predictor is None:
             disease_predictor = DiseasePredictor()
             logger.info("Disease predictor initialized successfully")
-        
+
     except Exception as e:
         logger.error(f"Failed to initialize services: {e}")
 
+@app.on_event("startup")
+async def startup_event():
+    """Initialize the chatbot and disease predictor on startup"""
+    global knowledge_watcher
+    initialize_services()
+
+    # Started per worker: threads do not survive the prefork fork
+    if disease_predictor and KNOWLEDGE_WATCH_INTERVAL > 0 and knowledge_watcher is None:
+        knowledge_watcher = disease_predictor.start_knowledge_watcher(KNOWLEDGE_WATCH_INTERVAL)
+        logger.info(f"Watching knowledge base files every {KNOWLEDGE_WATCH_INTERVAL}s")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the knowledge base watcher"""
+    if knowledge_watcher:
+        knowledge_watcher.stop()
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
@@ -132,7 +180,10 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "analyze_symptoms": "/analyze-symptoms",
-            "health": "/health"
+            "analyze_symptoms_stream": "/ws/analyze-symptoms",
+            "health": "/health",
+            "metrics": "/metrics",
+            "reload_knowledge_base": "/admin/reload-knowledge-base"
         }
     }
 
@@ -142,115 +193,276 @@ async def health_check():
     return {
         "status": "healthy",
         "chatbot_available": chatbot is not None,
-        "disease_predictor_available": disease_predictor is not None
+        "disease_predictor_available": disease_predictor is not None,
+        "worker_pid": os.getpid()
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Runtime counters for the analysis path of this worker"""
+    return {
+        "worker_pid": os.getpid(),
+        "symptom_analysis_coalescing": symptom_analysis_flight.get_stats(),
+        "symptom_analysis_admission": symptom_analysis_admission.get_stats(),
+        "knowledge_base": disease_predictor.get_knowledge_info() if disease_predictor else None,
+        "input_languages": disease_predictor.get_language_stats() if disease_predictor else None
     }
 
+@app.post("/admin/reload-knowledge-base")
+async def reload_knowledge_base(x_admin_token: Optional[str] = Header(None)):
+    """
+    Reload disease_knowledge.json and regional.json without a restart
+
+    The new version is validated and compiled before it replaces the current
+    one; on error the current version keeps serving. Under prefork this
+    reloads the worker that handles the request - the file watcher picks the
+    change up in every worker.
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (NIROGYA_ADMIN_TOKEN is not set)")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    if not disease_predictor:
+        raise HTTPException(status_code=500, detail="Disease predictor not available")
+
+    result = await run_in_threadpool(disease_predictor.reload_knowledge_base)
+    if result.get('status') == 'error':
+        raise HTTPException(status_code=400, detail=result)
+    return {"worker_pid": os.getpid(), **result}
+
+EMERGENCY_CONTACTS = {
+    "ambulance": "108",
+    "health_helpline": "104",
+    "disaster_management": "1070"
+}
+
+def normalize_symptom_text(symptoms: str) -> str:
+    """Normalize symptom text so equivalent submissions share one analysis"""
+    return " ".join(symptoms.lower().split())
+
+def run_symptom_analysis(symptoms: str) -> Dict:
+    """
+    Run the chatbot and disease predictor on one symptom description.
+
+    Returns the user-independent part of the response so concurrent requests
+    with the same symptoms can share a single computation.
+    """
+    # Translate and normalize the text once; every step below reuses it
+    context = disease_predictor.create_context(symptoms) if disease_predictor else None
+    chatbot_input = chatbot.preprocess_user_input(symptoms)
+
+    # Get disease analysis from chatbot
+    chatbot_response = create_web_api_response(symptoms, chatbot_db_path, chatbot=chatbot,
+                                               processed_input=chatbot_input)
+    
+    # Enhanced disease prediction with regional language support (try this first)
+    enhanced_prediction = None
+    if disease_predictor:
+        try:
+            enhanced_prediction = disease_predictor.predict_disease_type(context)
+            logger.info(f"Enhanced prediction completed for symptoms: {symptoms}")
+        except Exception as e:
+            logger.warning(f"Enhanced prediction failed: {e}")
+    
+    # If both original chatbot and enhanced prediction fail, return no match
+    if chatbot_response["status"] == "no_match" and (not enhanced_prediction or enhanced_prediction.get('probability', 0) == 0):
+        return {
+            "status": "no_match",
+            "message": "Could not identify specific diseases based on the symptoms provided",
+            "diseases": [],
+            "disclaimer": "This is an AI assessment tool. Please consult a healthcare professional for accurate diagnosis.",
+            "severity_assessment": "Unknown",
+            "recommendations": [
+                "Consult a healthcare professional for proper diagnosis",
+                "Monitor symptoms and seek immediate care if they worsen",
+                "Stay hydrated and rest"
+            ]
+        }
+    
+    # Convert chatbot diseases to our response format
+    diseases = []
+    if chatbot_response["status"] != "no_match":
+        for disease_data in chatbot_response["diseases"]:
+            diseases.append(DiseaseMatch(
+                id=disease_data["id"],
+                name=disease_data["name"],
+                confidence=disease_data["confidence"],
+                description=disease_data["description"],
+                matching_symptoms=disease_data["matching_symptoms"],
+                transmission=disease_data["transmission"],
+                severity=disease_data["severity"],
+                treatment=disease_data["treatment"],
+                prevention=disease_data["prevention"],
+                region_specific_info=disease_data["region_specific_info"]
+            ))
+    
+    # If original chatbot found no diseases but enhanced prediction did, use enhanced prediction
+    if not diseases and enhanced_prediction and enhanced_prediction.get('probability', 0) > 0:
+        # Create a disease match from enhanced prediction
+        diseases.append(DiseaseMatch(
+            id=999,  # Special ID for enhanced predictions
+            name=enhanced_prediction.get('predicted_disease', 'Unknown'),
+            confidence=enhanced_prediction.get('probability', 0) / 100,  # Convert to 0-1 scale
+            description=f"AI-predicted condition based on symptom analysis",
+            matching_symptoms=enhanced_prediction.get('matched_symptoms', []),
+            transmission=enhanced_prediction.get('disease_info', {}).get('transmission', 'Unknown'),
+            severity=enhanced_prediction.get('disease_info', {}).get('severity', 'Unknown'),
+            treatment=enhanced_prediction.get('disease_info', {}).get('treatment', 'Consult healthcare provider'),
+            prevention="Follow general health precautions",
+            region_specific_info="Based on regional symptom analysis"
+        ))
+    
+    # Determine overall severity assessment
+    max_confidence = max([d.confidence for d in diseases]) if diseases else 0
+    if enhanced_prediction and 'error' not in enhanced_prediction:
+        severity_assessment = disease_predictor.get_severity_assessment(enhanced_prediction, context)
+    else:
+        severity_assessment = get_severity_assessment(diseases, max_confidence)
+
+    # Generate personalized recommendations
+    if enhanced_prediction and 'error' not in enhanced_prediction:
+        recommendations = disease_predictor.get_health_recommendations(enhanced_prediction, context)
+    else:
+        recommendations = generate_recommendations(diseases, symptoms)
+    
+    return {
+        "status": "success",
+        "message": None,
+        "diseases": diseases,
+        "disclaimer": chatbot_response.get("disclaimer", "This is an AI assessment tool. Please consult a healthcare professional for accurate diagnosis."),
+        "severity_assessment": severity_assessment,
+        "recommendations": recommendations
+    }
+
+async def admitted_symptom_analysis(symptoms: str) -> Dict:
+    """Run one analysis in the threadpool once admission control grants a slot"""
+    async with symptom_analysis_admission.admit():
+        return await run_in_threadpool(run_symptom_analysis, symptoms)
+
 @app.post("/analyze-symptoms", response_model=SymptomAnalysisResponse)
 async def analyze_symptoms(request: SymptomAnalysisRequest):
     """
     Analyze user symptoms and provide disease predictions with recommendations
+
+    Concurrent requests with the same normalized symptom text are coalesced
+    into one analysis, which runs in the threadpool off the event loop.
+    Only that one analysis passes admission control; when the server is
+    saturated every waiting caller receives 503 with a Retry-After header.
     """
+    if not chatbot:
+        raise HTTPException(status_code=500, detail="Chatbot service not available")
+
     try:
-        if not chatbot:
-            raise HTTPException(status_code=500, detail="Chatbot service not available")
-        
-        # Get disease analysis from chatbot
-        chatbot_response = create_web_api_response(request.symptoms, chatbot_db_path)
-        
-        # Enhanced disease prediction with regional language support (try this first)
-        enhanced_prediction = None
-        if disease_predictor:
-            try:
-                enhanced_prediction = disease_predictor.predict_disease_type(request.symptoms)
-                logger.info(f"Enhanced prediction completed for symptoms: {request.symptoms}")
-            except Exception as e:
-                logger.warning(f"Enhanced prediction failed: {e}")
-        
-        # If both original chatbot and enhanced prediction fail, return no match
-        if chatbot_response["status"] == "no_match" and (not enhanced_prediction or enhanced_prediction.get('probability', 0) == 0):
-            return SymptomAnalysisResponse(
-                status="no_match",
-                message="Could not identify specific diseases based on the symptoms provided",
-                diseases=[],
-                disclaimer="This is an AI assessment tool. Please consult a healthcare professional for accurate diagnosis.",
-                user_name=request.name,
-                severity_assessment="Unknown",
-                recommendations=[
-                    "Consult a healthcare professional for proper diagnosis",
-                    "Monitor symptoms and seek immediate care if they worsen",
-                    "Stay hydrated and rest"
-                ],
-                emergency_contacts={
-                    "ambulance": "108",
-                    "health_helpline": "104",
-                    "disaster_management": "1070"
-                }
-            )
-        
-        # Convert chatbot diseases to our response format
-        diseases = []
-        if chatbot_response["status"] != "no_match":
-            for disease_data in chatbot_response["diseases"]:
-                diseases.append(DiseaseMatch(
-                    id=disease_data["id"],
-                    name=disease_data["name"],
-                    confidence=disease_data["confidence"],
-                    description=disease_data["description"],
-                    matching_symptoms=disease_data["matching_symptoms"],
-                    transmission=disease_data["transmission"],
-                    severity=disease_data["severity"],
-                    treatment=disease_data["treatment"],
-                    prevention=disease_data["prevention"],
-                    region_specific_info=disease_data["region_specific_info"]
-                ))
-        
-        # If original chatbot found no diseases but enhanced prediction did, use enhanced prediction
-        if not diseases and enhanced_prediction and enhanced_prediction.get('probability', 0) > 0:
-            # Create a disease match from enhanced prediction
-            diseases.append(DiseaseMatch(
-                id=999,  # Special ID for enhanced predictions
-                name=enhanced_prediction.get('predicted_disease', 'Unknown'),
-                confidence=enhanced_prediction.get('probability', 0) / 100,  # Convert to 0-1 scale
-                description=f"AI-predicted condition based on symptom analysis",
-                matching_symptoms=enhanced_prediction.get('matched_symptoms', []),
-                transmission=enhanced_prediction.get('disease_info', {}).get('transmission', 'Unknown'),
-                severity=enhanced_prediction.get('disease_info', {}).get('severity', 'Unknown'),
-                treatment=enhanced_prediction.get('disease_info', {}).get('treatment', 'Consult healthcare provider'),
-                prevention="Follow general health precautions",
-                region_specific_info="Based on regional symptom analysis"
-            ))
-        
-        # Determine overall severity assessment
-        max_confidence = max([d.confidence for d in diseases]) if diseases else 0
-        if enhanced_prediction and 'error' not in enhanced_prediction:
-            severity_assessment = disease_predictor.get_severity_assessment(enhanced_prediction, request.symptoms)
-        else:
-            severity_assessment = get_severity_assessment(diseases, max_confidence)
-
-        # Generate personalized recommendations
-        if enhanced_prediction and 'error' not in enhanced_prediction:
-            recommendations = disease_predictor.get_health_recommendations(enhanced_prediction, request.symptoms)
-        else:
-            recommendations = generate_recommendations(diseases, request.symptoms)
+        symptoms = normalize_symptom_text(request.symptoms)
+        analysis = await symptom_analysis_flight.do(symptoms, admitted_symptom_analysis, symptoms)
         
         return SymptomAnalysisResponse(
-            status="success",
-            diseases=diseases,
-            disclaimer=chatbot_response.get("disclaimer", "This is an AI assessment tool. Please consult a healthcare professional for accurate diagnosis."),
             user_name=request.name,
-            severity_assessment=severity_assessment,
-            recommendations=recommendations,
-            emergency_contacts={
-                "ambulance": "108",
-                "health_helpline": "104",
-                "disaster_management": "1070"
-            }
+            emergency_contacts=dict(EMERGENCY_CONTACTS),
+            **analysis
         )
         
+    except OverloadedError as e:
+        logger.warning(f"Shedding symptom analysis request: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         logger.error(f"Error analyzing symptoms: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@app.websocket("/ws/analyze-symptoms")
+async def analyze_symptoms_stream(websocket: WebSocket):
+    """
+    Stream partial speech transcripts and receive updated rankings
+
+    Client messages (JSON):
+        {"type": "chunk", "text": "mujhe pet mein"}     new words of the transcript
+        {"type": "final", "name": "Asha", "text": ""}  end of speech (text optional)
+        {"type": "reset"}                               discard the transcript
+
+    Every chunk is answered with a "partial" message built incrementally from
+    the previous state; "final" runs the full analysis and is answered with
+    the same body as POST /analyze-symptoms. Malformed messages and chunks
+    over the session limits (symptom_stream.MAX_CHUNK_CHARS /
+    MAX_TRANSCRIPT_WORDS) get an "error" message and the socket stays open.
+    """
+    await websocket.accept()
+
+    if not disease_predictor:
+        await websocket.send_json({"type": "error", "error": "Disease predictor not available"})
+        await websocket.close()
+        return
+
+    session = StreamingSymptomSession(disease_predictor)
+
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except ValueError:
+                message = None
+            if not isinstance(message, dict):
+                await websocket.send_json({"type": "error", "error": "Messages must be JSON objects"})
+                continue
+            message_type = message.get("type", "chunk")
+            text = message.get("text") or ""
+            if not isinstance(text, str) or not isinstance(message.get("name", ""), str):
+                await websocket.send_json({"type": "error", "error": "'text' and 'name' must be strings"})
+                continue
+
+            if message_type == "chunk":
+                try:
+                    await websocket.send_json(session.add_chunk(text))
+                except ValueError as e:
+                    await websocket.send_json({"type": "error", "error": str(e)})
+
+            elif message_type == "final":
+                if text:
+                    try:
+                        session.add_chunk(text)
+                    except ValueError as e:
+                        await websocket.send_json({"type": "error", "error": str(e)})
+                        continue
+                if not chatbot:
+                    await websocket.send_json({"type": "error", "error": "Chatbot service not available"})
+                    continue
+
+                symptoms = normalize_symptom_text(session.transcript)
+                try:
+                    analysis = await symptom_analysis_flight.do(symptoms, admitted_symptom_analysis, symptoms)
+                except OverloadedError as e:
+                    await websocket.send_json({"type": "error", "error": str(e), "retry_after": e.retry_after})
+                    continue
+                except Exception as e:
+                    logger.error(f"Error analyzing streamed symptoms: {e}")
+                    await websocket.send_json({"type": "error", "error": f"Internal server error: {str(e)}"})
+                    continue
+
+                response = SymptomAnalysisResponse(
+                    user_name=message.get("name", ""),
+                    emergency_contacts=dict(EMERGENCY_CONTACTS),
+                    **analysis
+                )
+                await websocket.send_json({
+                    "type": "final",
+                    "transcript": session.transcript,
+                    "analysis": jsonable_encoder(response)
+                })
+                session.reset()
+
+            elif message_type == "reset":
+                session.reset()
+                await websocket.send_json(session.get_update())
+
+            else:
+                await websocket.send_json({"type": "error", "error": f"Unknown message type: {message_type}"})
+
+    except WebSocketDisconnect:
+        logger.info("Symptom stream client disconnected")
+
 def get_severity_assessment(diseases: List[DiseaseMatch], max_confidence: float) -> str:
     """Determine overall severity assessment based on diseases and confidence"""
     if not diseases:
@@ -8,6 +8,9 @@ and health recommendations based on symptom analysis.
 
 Features:
 - Disease type prediction based on symptoms
+- Vectorized disease x symptom scoring matrix, with a batched variant
+- Knowledge base loaded from disease_knowledge.json, hot-reloadable
+- Language detection so plain English input skips translation
 - Risk assessment and severity levels
 - Health recommendations
 - Regional context for Northeast India
@@ -17,23 +20,163 @@ import os
 import sys
 import json
 import random
-from typing import Dict, List, Optional
+import threading
+from typing import Dict, List, Optional, Union
 from datetime import datetime
 
+import numpy as np
+
+from language_detection import LanguageMixStats, normalize_english
+from knowledge_base import (KnowledgeSnapshot, KnowledgeBaseWatcher, get_knowledge_file_path,
+                            load_knowledge_file)
+
+class SymptomAnalysisContext:
+    """
+    Per-request symptom analysis state, built once by DiseasePredictor.create_context()
+
+    Holds the regional-to-English translation, its tokens and the matched
+    symptoms so every predictor step reuses them instead of re-translating,
+    plus the knowledge snapshot they came from so a reload in the middle of
+    the request cannot mix two knowledge base versions.
+    """
+
+    def __init__(self, symptoms_text: str, translated_text: str, matched_symptoms: set,
+                 knowledge: Optional[KnowledgeSnapshot] = None):
+        self.symptoms_text = symptoms_text
+        self.translated_text = translated_text
+        self.tokens = translated_text.split()
+        self.matched_symptoms = matched_symptoms
+        self.knowledge = knowledge
+
+    def mentions_any(self, terms: List[str]) -> bool:
+        """True if any of the terms occurs in the translated text"""
+        return any(term in self.translated_text for term in terms)
+
 class DiseasePredictor:
     """
     A simplified disease predictor for chatbot integration
     """
-    
+
+    # Additional common Hindi/Hinglish patterns, applied after the regional.json sections
+    HINDI_PATTERNS = {
+        'mujhe pet mein dard hai': 'i have stomach pain',
+        'mujhe pet dard hai': 'i have stomach pain',
+        'pet mein dard hai': 'stomach pain',
+        'pet mein dard': 'stomach pain',
+        'pet dard hai': 'stomach pain',
+        'dard hai': 'pain',
+        'pet dard': 'stomach pain',
+        'mujhe': 'i have',
+        'mere': 'my',
+        'pet mein': 'stomach',
+        'sir mein': 'head',
+        'dard': 'pain',
+        'hai': '',  # Remove 'hai' as it's just 'is' and not needed
+        'ho raha hai': 'happening',
+        'aa raha hai': 'coming',
+        'feel kar raha hun': 'feeling',
+        'paani jesa': 'watery',
+        'paani jaisa': 'watery',
+        'bahut': 'very',
+        'thoda': 'little',
+        'zyada': 'more',
+        'bhi': 'also',
+        'aur': 'and',
+        'jor': 'high',
+        'tez': 'severe'
+    }
+
+    # Recognized without a disease match, for the low-confidence fallback
+    GENERAL_GI_SYMPTOMS = ['stomach pain', 'diarrhea', 'fever', 'vomiting', 'nausea',
+                           'pet dard', 'pet mein dard', 'loose motion', 'bukhar', 'ulti']
+
     def __init__(self):
         """Initialize the predictor with disease knowledge base"""
-        self.disease_knowledge = self._load_disease_knowledge()
-        self.symptom_weights = self._load_symptom_weights()
-        self.regional_data = self._load_regional_data()
-        print("✅ Disease predictor initialized successfully!")
+        self.knowledge_file_path = get_knowledge_file_path()
+        self.regional_file_path = None
+        self._reload_lock = threading.Lock()
+        self.language_stats = LanguageMixStats()
+        self.knowledge = self._build_knowledge_snapshot()
+        print(f"✅ Disease predictor initialized successfully! (knowledge base {self.knowledge.version})")
+
+    # Compiled knowledge of the current snapshot
+    disease_knowledge = property(lambda self: self.knowledge.disease_knowledge)
+    symptom_weights = property(lambda self: self.knowledge.symptom_weights)
+    regional_data = property(lambda self: self.knowledge.regional_data)
+    translator = property(lambda self: self.knowledge.translator)
+    symptom_vocabulary = property(lambda self: self.knowledge.symptom_vocabulary)
+    disease_names = property(lambda self: self.knowledge.disease_names)
+
+    def _build_knowledge_snapshot(self, strict: bool = False) -> KnowledgeSnapshot:
+        """
+        Load the knowledge file and regional.json and compile a snapshot
+
+        With strict=False (startup) unreadable files fall back to the built-in
+        data; with strict=True (reload) they raise so the current snapshot
+        keeps serving.
+        """
+        try:
+            data = load_knowledge_file(self.knowledge_file_path)
+            disease_knowledge = data['diseases']
+            symptom_weights = data.get('symptom_weights', {})
+            version = str(data.get('version', 'unversioned'))
+            sources = [self.knowledge_file_path]
+        except Exception as e:
+            if strict:
+                raise
+            print(f"⚠️ Knowledge base file not loaded ({e}), using built-in knowledge base")
+            disease_knowledge = self._get_default_disease_knowledge()
+            symptom_weights = self._get_default_symptom_weights()
+            version = "builtin"
+            sources = []
+
+        regional_data = self._load_regional_data(strict=strict)
+        if self.regional_file_path:
+            sources.append(self.regional_file_path)
+
+        return KnowledgeSnapshot(disease_knowledge, symptom_weights, regional_data,
+                                 extra_patterns=self.HINDI_PATTERNS, extra_symptoms=self.GENERAL_GI_SYMPTOMS,
+                                 version=version, sources=sources)
+
+    def reload_knowledge_base(self) -> Dict:
+        """
+        Rebuild the knowledge snapshot from disk and swap it in atomically
+
+        Requests already running finish on the snapshot they started with.
+        If the files are invalid the current snapshot stays in place.
+        """
+        with self._reload_lock:
+            previous = self.knowledge
+            try:
+                snapshot = self._build_knowledge_snapshot(strict=True)
+            except Exception as e:
+                return {
+                    'status': 'error',
+                    'error': f"Knowledge base reload failed: {str(e)}",
+                    'version': previous.version
+                }
+            self.knowledge = snapshot
+        print(f"✅ Knowledge base reloaded: {previous.version} -> {snapshot.version}")
+        return {'status': 'reloaded', 'previous_version': previous.version, **snapshot.get_info()}
+
+    def get_language_stats(self) -> Dict:
+        """Traffic mix by detected input language"""
+        return self.language_stats.snapshot()
+
+    def get_knowledge_info(self) -> Dict:
+        """Version details of the knowledge base in use"""
+        return self.knowledge.get_info()
+
+    def watched_files(self) -> List[str]:
+        """Files whose changes should trigger a reload"""
+        return [path for path in (self.knowledge_file_path, self.regional_file_path) if path]
+
+    def start_knowledge_watcher(self, interval: float = 5.0) -> KnowledgeBaseWatcher:
+        """Reload automatically when the knowledge file or regional.json changes"""
+        return KnowledgeBaseWatcher(self.watched_files, self.reload_knowledge_base, interval).start()
     
-    def _load_disease_knowledge(self) -> Dict:
-        """Load disease knowledge base"""
+    def _get_default_disease_knowledge(self) -> Dict:
+        """Built-in disease knowledge base if disease_knowledge.json is unavailable"""
         return {
             'Acute Diarrheal Disease': {
                 'symptoms': ['diarrhea', 'stomach pain', 'dehydration', 'nausea', 'vomiting', 'fever',
@@ -87,8 +230,8 @@ class DiseasePredictor:
             }
         }
     
-    def _load_symptom_weights(self) -> Dict:
-        """Load symptom importance weights"""
+    def _get_default_symptom_weights(self) -> Dict:
+        """Built-in symptom importance weights if disease_knowledge.json is unavailable"""
         return {
             'severe diarrhea': 0.9,
             'bloody diarrhea': 0.95,
@@ -119,7 +262,7 @@ class DiseasePredictor:
             'jee michlaana': 0.6
         }
 
-    def _load_regional_data(self) -> Dict:
+    def _load_regional_data(self, strict: bool = False) -> Dict:
         """Load regional language mappings from regional.json"""
         try:
             # Try to find regional.json in the AI chatbot directory
@@ -131,6 +274,7 @@ class DiseasePredictor:
 
             for path in regional_file_paths:
                 if os.path.exists(path):
+                    self.regional_file_path = os.path.abspath(path)
                     with open(path, 'r', encoding='utf-8') as f:
                         return json.load(f)
 
@@ -138,6 +282,8 @@ class DiseasePredictor:
             return self._get_basic_regional_mappings()
 
         except Exception as e:
+            if strict:
+                raise
             print(f"⚠️ Error loading regional data: {e}")
             return self._get_basic_regional_mappings()
 
@@ -162,171 +308,194 @@ class DiseasePredictor:
             }
         }
 
-    def _translate_regional_terms(self, symptoms_text: str) -> str:
+    def _translate_regional_terms(self, symptoms_text: str, knowledge: Optional[KnowledgeSnapshot] = None,
+                                  language: Optional[str] = None) -> str:
         """Translate regional/Hindi terms to English for better processing"""
         try:
-            translated_text = symptoms_text.lower()
-
-            # Get synonyms from regional data
-            synonyms = self.regional_data.get('synonyms', {})
-
-            # Replace regional terms with English equivalents
-            for regional_term, english_term in synonyms.items():
-                if regional_term.lower() in translated_text:
-                    translated_text = translated_text.replace(regional_term.lower(), english_term.lower())
-
-            # Additional common Hindi/Hinglish patterns (order matters - longer phrases first)
-            hindi_patterns = {
-                'mujhe pet mein dard hai': 'i have stomach pain',
-                'mujhe pet dard hai': 'i have stomach pain',
-                'pet mein dard hai': 'stomach pain',
-                'pet mein dard': 'stomach pain',
-                'pet dard hai': 'stomach pain',
-                'dard hai': 'pain',
-                'pet dard': 'stomach pain',
-                'mujhe': 'i have',
-                'mere': 'my',
-                'pet mein': 'stomach',
-                'sir mein': 'head',
-                'dard': 'pain',
-                'hai': '',  # Remove 'hai' as it's just 'is' and not needed
-                'ho raha hai': 'happening',
-                'aa raha hai': 'coming',
-                'feel kar raha hun': 'feeling',
-                'paani jesa': 'watery',
-                'paani jaisa': 'watery',
-                'bahut': 'very',
-                'thoda': 'little',
-                'zyada': 'more',
-                'bhi': 'also',
-                'aur': 'and',
-                'jor': 'high',
-                'tez': 'severe'
-            }
-
-            for hindi, english in hindi_patterns.items():
-                translated_text = translated_text.replace(hindi, english)
-
-            return translated_text
+            return (knowledge or self.knowledge).translate(symptoms_text, language)
 
         except Exception as e:
             print(f"Warning: Regional translation failed: {e}")
             return symptoms_text
 
-    def predict_disease_type(self, symptoms_text: str) -> Dict:
+    def get_translation_window(self) -> int:
         """
-        Predict disease type based on symptoms text
+        Longest regional phrase or symptom in words.
+
+        Text translated in pieces must overlap by this many words so that a
+        phrase split across two pieces is still seen whole.
+        """
+        return self.knowledge.translation_window()
+
+    def create_context(self, symptoms_text: str) -> SymptomAnalysisContext:
+        """Translate and match the symptom text once for a whole request"""
+        knowledge = self.knowledge
+        language = knowledge.language_detector.detect(symptoms_text)
+        self.language_stats.record(language)
+        translated_text = self._translate_regional_terms(symptoms_text, knowledge, language).lower()
+        return SymptomAnalysisContext(symptoms_text, translated_text, knowledge.match_symptoms(translated_text),
+                                      knowledge)
+
+    def create_contexts(self, symptoms_list: List[Union[str, SymptomAnalysisContext]],
+                        knowledge: Optional[KnowledgeSnapshot] = None) -> List[SymptomAnalysisContext]:
+        """Build contexts for a batch, translating each distinct text once"""
+        texts = [s for s in symptoms_list if not isinstance(s, SymptomAnalysisContext)]
+        knowledge = knowledge or self.knowledge
+        detector = knowledge.language_detector
+        languages = [detector.detect(text) for text in texts]
+        for language in languages:
+            self.language_stats.record(language)
+
+        # Only text with regional words goes through the translator
+        regional = [text for text, language in zip(texts, languages) if detector.needs_translation(language)]
+        regional_translated = iter(knowledge.translator.translate_many(regional))
+        translated = iter([next(regional_translated) if detector.needs_translation(language)
+                           else normalize_english(text) for text, language in zip(texts, languages)])
+        contexts = []
+        for symptoms in symptoms_list:
+            if isinstance(symptoms, SymptomAnalysisContext):
+                contexts.append(symptoms)
+            else:
+                translated_text = next(translated)
+                contexts.append(SymptomAnalysisContext(symptoms, translated_text,
+                                                       knowledge.match_symptoms(translated_text), knowledge))
+        return contexts
+
+    def _as_context(self, symptoms: Union[str, SymptomAnalysisContext]) -> SymptomAnalysisContext:
+        if isinstance(symptoms, SymptomAnalysisContext):
+            return symptoms
+        return self.create_context(symptoms)
+
+    def match_symptoms(self, translated_text: str) -> set:
+        """Find the known symptoms mentioned in already translated text"""
+        return self.knowledge.match_symptoms(translated_text)
+
+    def rank_diseases(self, matched_symptoms: set, knowledge: Optional[KnowledgeSnapshot] = None) -> Dict:
+        """
+        Rank diseases from a set of matched symptoms
         
         Args:
-            symptoms_text (str): User's symptom description
+            matched_symptoms (set): Lowercased symptoms from match_symptoms()
+            knowledge (KnowledgeSnapshot): Snapshot the symptoms were matched
+                against (defaults to the current one)
             
         Returns:
             dict: Disease prediction with probability and characteristics
         """
-        try:
-            # First translate regional terms to English
-            translated_symptoms = self._translate_regional_terms(symptoms_text)
-
-            # Normalize symptoms text
-            symptoms_lower = translated_symptoms.lower()
-            
-            # Calculate disease scores
-            disease_scores = {}
-            
-            for disease, info in self.disease_knowledge.items():
-                score = 0.0
-                matched_symptoms = []
-                
-                for symptom in info['symptoms']:
-                    if symptom.lower() in symptoms_lower:
-                        weight = self.symptom_weights.get(symptom.lower(), 0.5)
-                        score += weight
-                        matched_symptoms.append(symptom)
-                
-                # Bonus for multiple symptom matches
-                if len(matched_symptoms) > 1:
-                    score *= (1 + 0.1 * len(matched_symptoms))
-                
-                disease_scores[disease] = {
-                    'score': score,
-                    'matched_symptoms': matched_symptoms,
-                    'info': info
-                }
-            
-            # Normalize scores to probabilities
-            total_score = sum([d['score'] for d in disease_scores.values()])
-            
-            if total_score == 0:
-                # Check if we have any recognizable symptoms even if no disease match
-                translated_symptoms = self._translate_regional_terms(symptoms_text).lower()
-                common_symptoms = ['stomach pain', 'diarrhea', 'fever', 'vomiting', 'nausea',
-                                 'pet dard', 'pet mein dard', 'loose motion', 'bukhar', 'ulti']
-
-                recognized_symptoms = [s for s in common_symptoms if s in translated_symptoms]
-
-                if recognized_symptoms:
-                    return {
-                        'predicted_disease': 'General Gastrointestinal Symptoms',
-                        'probability': 15.0,  # Low but not zero
-                        'confidence': 'Low',
-                        'all_probabilities': {'General Gastrointestinal Symptoms': 15.0},
-                        'mortality_rate': 0.5,
-                        'matched_symptoms': recognized_symptoms,
-                        'disease_info': {
-                            'severity': 'Mild',
-                            'transmission': 'Various causes',
-                            'treatment': 'Symptomatic care, monitor symptoms'
-                        }
-                    }
-                else:
-                    return {
-                        'predicted_disease': 'Unknown',
-                        'probability': 0.0,
-                        'confidence': 'Low',
-                        'all_probabilities': {},
-                        'mortality_rate': 0.0,
-                        'matched_symptoms': []
+        knowledge = knowledge or self.knowledge
+        scores = knowledge.score(knowledge.symptom_presence(matched_symptoms))
+        return self._build_prediction(knowledge, scores, matched_symptoms)
+
+    def _build_prediction(self, knowledge: KnowledgeSnapshot, scores: np.ndarray, matched_symptoms: set) -> Dict:
+        """Turn one row of disease scores into the prediction dict"""
+        # Normalize scores to probabilities
+        scores = scores.tolist()
+        total_score = sum(scores)
+        
+        if total_score == 0:
+            # Check if we have any recognizable symptoms even if no disease match
+            recognized_symptoms = [s for s in self.GENERAL_GI_SYMPTOMS if s in matched_symptoms]
+
+            if recognized_symptoms:
+                return {
+                    'predicted_disease': 'General Gastrointestinal Symptoms',
+                    'probability': 15.0,  # Low but not zero
+                    'confidence': 'Low',
+                    'all_probabilities': {'General Gastrointestinal Symptoms': 15.0},
+                    'mortality_rate': 0.5,
+                    'matched_symptoms': recognized_symptoms,
+                    'disease_info': {
+                        'severity': 'Mild',
+                        'transmission': 'Various causes',
+                        'treatment': 'Symptomatic care, monitor symptoms'
                     }
-            
-            disease_probabilities = {}
-            for disease, data in disease_scores.items():
-                probability = (data['score'] / total_score) * 100
-                disease_probabilities[disease] = probability
-            
-            # Get top prediction
-            top_disease = max(disease_probabilities.keys(), key=lambda k: disease_probabilities[k])
-            top_probability = disease_probabilities[top_disease]
-            
-            # Determine confidence
-            if top_probability > 40:
-                confidence = "High"
-            elif top_probability > 25:
-                confidence = "Medium"
+                }
             else:
-                confidence = "Low"
-            
-            # Get disease info
-            disease_info = disease_scores[top_disease]['info']
-            matched_symptoms = disease_scores[top_disease]['matched_symptoms']
+                return {
+                    'predicted_disease': 'Unknown',
+                    'probability': 0.0,
+                    'confidence': 'Low',
+                    'all_probabilities': {},
+                    'mortality_rate': 0.0,
+                    'matched_symptoms': []
+                }
+        
+        disease_probabilities = [score / total_score * 100 for score in scores]
+        
+        # Get top prediction (first disease wins ties, ignoring float summation noise)
+        top_probability = max(disease_probabilities)
+        top_index = next(i for i, p in enumerate(disease_probabilities) if p >= top_probability - 1e-9)
+        top_disease = knowledge.disease_names[top_index]
+        top_probability = disease_probabilities[top_index]
+        
+        # Determine confidence
+        if top_probability > 40:
+            confidence = "High"
+        elif top_probability > 25:
+            confidence = "Medium"
+        else:
+            confidence = "Low"
+        
+        # Get disease info
+        disease_info = knowledge.disease_knowledge[top_disease]
+        
+        return {
+            'predicted_disease': top_disease,
+            'probability': round(top_probability, 1),
+            'confidence': confidence,
+            'all_probabilities': {name: round(p, 1) for name, p in zip(knowledge.disease_names, disease_probabilities)},
+            'disease_info': {
+                'severity': disease_info['severity'],
+                'transmission': disease_info['transmission'],
+                'treatment': disease_info['treatment']
+            },
+            'mortality_rate': disease_info['mortality_rate'],
+            'matched_symptoms': [s for s in disease_info['symptoms'] if s.lower() in matched_symptoms]
+        }
+
+    def predict_disease_type(self, symptoms: Union[str, SymptomAnalysisContext]) -> Dict:
+        """
+        Predict disease type based on symptoms text
+        
+        Args:
+            symptoms (str or SymptomAnalysisContext): User's symptom description,
+                or the context already built for this request
             
-            return {
-                'predicted_disease': top_disease,
-                'probability': round(top_probability, 1),
-                'confidence': confidence,
-                'all_probabilities': {k: round(v, 1) for k, v in disease_probabilities.items()},
-                'disease_info': {
-                    'severity': disease_info['severity'],
-                    'transmission': disease_info['transmission'],
-                    'treatment': disease_info['treatment']
-                },
-                'mortality_rate': disease_info['mortality_rate'],
-                'matched_symptoms': matched_symptoms
-            }
+        Returns:
+            dict: Disease prediction with probability and characteristics
+        """
+        try:
+            context = self._as_context(symptoms)
+            return self.rank_diseases(context.matched_symptoms, context.knowledge)
             
         except Exception as e:
             return {'error': f"Disease prediction failed: {str(e)}"}
     
-    def get_severity_assessment(self, disease_prediction: Dict, symptoms_text: str) -> str:
+    def predict_disease_types(self, symptoms_list: List[Union[str, SymptomAnalysisContext]]) -> List[Dict]:
+        """
+        Batched predict_disease_type: one matrix product scores every input
+        
+        Args:
+            symptoms_list (list): Symptom descriptions and/or contexts
+            
+        Returns:
+            list: One prediction dict per input, in input order
+        """
+        try:
+            knowledge = self.knowledge
+            contexts = self.create_contexts(symptoms_list, knowledge)
+            if not contexts:
+                return []
+            scores = knowledge.score(knowledge.presence_matrix([c.matched_symptoms for c in contexts]))
+            # Contexts built before a reload are ranked on their own snapshot
+            return [self._build_prediction(knowledge, row, c.matched_symptoms) if c.knowledge in (knowledge, None)
+                    else self.rank_diseases(c.matched_symptoms, c.knowledge) for row, c in zip(scores, contexts)]
+            
+        except Exception as e:
+            return [{'error': f"Disease prediction failed: {str(e)}"} for _ in symptoms_list]
+    
+    def get_severity_assessment(self, disease_prediction: Dict,
+                                symptoms: Union[str, SymptomAnalysisContext]) -> str:
         """Get overall severity assessment"""
         if 'error' in disease_prediction:
             return "Unknown Risk"
@@ -334,8 +503,7 @@ class DiseasePredictor:
         probability = disease_prediction.get('probability', 0)
         disease = disease_prediction.get('predicted_disease', '')
 
-        # Translate symptoms for better assessment
-        translated_symptoms = self._translate_regional_terms(symptoms_text).lower()
+        context = self._as_context(symptoms)
 
         # High-risk diseases
         high_risk_diseases = ['Cholera', 'Typhoid', 'Dysentery']
@@ -343,12 +511,12 @@ class DiseasePredictor:
         # Check for emergency symptoms (including regional terms)
         emergency_symptoms = ['severe diarrhea', 'bloody diarrhea', 'severe dehydration', 'high fever',
                             'paani jaisa', 'jor bukhar', 'khoon']
-        has_emergency = any(symptom in translated_symptoms for symptom in emergency_symptoms)
+        has_emergency = context.mentions_any(emergency_symptoms)
 
         # Check for common symptoms (including regional terms)
         common_symptoms = ['stomach pain', 'diarrhea', 'fever', 'vomiting', 'nausea',
                           'pet dard', 'pet mein dard', 'loose motion', 'bukhar', 'ulti']
-        has_common_symptoms = any(symptom in translated_symptoms for symptom in common_symptoms)
+        has_common_symptoms = context.mentions_any(common_symptoms)
 
         # Enhanced assessment logic
         if disease in high_risk_diseases and probability > 30:
@@ -362,7 +530,8 @@ class DiseasePredictor:
         else:
             return "Mild Symptoms - Basic Care Recommended"
     
-    def get_health_recommendations(self, disease_prediction: Dict, symptoms_text: str) -> List[str]:
+    def get_health_recommendations(self, disease_prediction: Dict,
+                                   symptoms: Union[str, SymptomAnalysisContext]) -> List[str]:
         """Get health recommendations based on prediction"""
         recommendations = []
 
@@ -373,25 +542,24 @@ class DiseasePredictor:
                 "Consult healthcare professional if symptoms persist"
             ]
 
-        # Translate symptoms for better recommendation matching
-        translated_symptoms = self._translate_regional_terms(symptoms_text).lower()
+        context = self._as_context(symptoms)
         
         disease = disease_prediction.get('predicted_disease', '')
 
         # Immediate care based on symptoms (including regional terms)
-        if any(term in translated_symptoms for term in ['diarrhea', 'loose motion', 'paani jaisa']):
+        if context.mentions_any(['diarrhea', 'loose motion', 'paani jaisa']):
             recommendations.append("🚰 Drink ORS (Oral Rehydration Solution) to prevent dehydration")
             recommendations.append("🍚 Eat bland foods like rice, bananas, and toast")
 
-        if any(term in translated_symptoms for term in ['fever', 'bukhar', 'jor']):
+        if context.mentions_any(['fever', 'bukhar', 'jor']):
             recommendations.append("🌡️ Monitor temperature and take fever reducers if needed")
             recommendations.append("🛏️ Get plenty of rest")
 
-        if any(term in translated_symptoms for term in ['vomiting', 'ulti']):
+        if context.mentions_any(['vomiting', 'ulti']):
             recommendations.append("💧 Take small, frequent sips of clear fluids")
             recommendations.append("🚫 Avoid solid foods until vomiting stops")
 
-        if any(term in translated_symptoms for term in ['stomach pain', 'pet dard', 'pet mein dard']):
+        if context.mentions_any(['stomach pain', 'pet dard', 'pet mein dard']):
             recommendations.append("🍵 Try ginger tea or warm water for stomach comfort")
             recommendations.append("🥗 Avoid spicy, oily, or heavy foods")
         
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Hot-Reloadable Disease Knowledge Base
+=====================================
+
+The disease knowledge (symptoms, severity, treatment, mortality) and symptom
+weights live in a versioned JSON file (disease_knowledge.json) so clinical
+teams can update them without a code deploy. Everything the predictor derives
+from that file and regional.json - the regional translator, the symptom
+vocabulary and the scoring matrices - is compiled into one read-only
+KnowledgeSnapshot. A reload builds a complete new snapshot in the background
+and replaces the old one with a single reference assignment, so a request
+always sees one consistent version.
+
+Features:
+- Versioned knowledge file with validation before it goes live
+- Atomic snapshot swap; a broken file keeps the current version serving
+- Polling file watcher (mtime based, no extra dependencies)
+
+File format:
+    {
+        "version": "1.0.0",
+        "diseases": {
+            "Cholera": {"symptoms": [...], "severity": "High", "transmission": "...",
+                        "treatment": "...", "mortality_rate": 15.0, "common_in_monsoon": true}
+        },
+        "symptom_weights": {"severe diarrhea": 0.9, ...}
+    }
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from language_detection import LanguageDetector, normalize_english
+from regional_translator import RegionalTranslator
+
+# Override the knowledge file location with this environment variable
+KNOWLEDGE_FILE_ENV = "NIROGYA_KNOWLEDGE_BASE_PATH"
+DEFAULT_KNOWLEDGE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'disease_knowledge.json')
+
+REQUIRED_DISEASE_FIELDS = ['symptoms', 'severity', 'transmission', 'treatment', 'mortality_rate']
+
+
+def get_knowledge_file_path() -> str:
+    """Knowledge file in use (environment override or the bundled file)"""
+    return os.environ.get(KNOWLEDGE_FILE_ENV) or DEFAULT_KNOWLEDGE_FILE
+
+
+def validate_knowledge_data(data: Dict):
+    """Raise ValueError describing the first problem in a knowledge file"""
+    if not isinstance(data, dict):
+        raise ValueError("Knowledge base must be a JSON object")
+
+    diseases = data.get('diseases')
+    if not isinstance(diseases, dict) or not diseases:
+        raise ValueError("'diseases' must be a non-empty object")
+
+    for name, info in diseases.items():
+        if not isinstance(info, dict):
+            raise ValueError(f"Disease '{name}' must be an object")
+        missing = [field for field in REQUIRED_DISEASE_FIELDS if field not in info]
+        if missing:
+            raise ValueError(f"Disease '{name}' is missing: {', '.join(missing)}")
+        if not isinstance(info['symptoms'], list) or not info['symptoms']:
+            raise ValueError(f"Disease '{name}' needs a non-empty symptoms list")
+        bad_symptoms = [repr(s) for s in info['symptoms'] if not isinstance(s, str) or not s.strip()]
+        if bad_symptoms:
+            raise ValueError(f"Disease '{name}' has invalid symptoms (need non-empty strings): "
+                             f"{', '.join(bad_symptoms)}")
+        if not isinstance(info['mortality_rate'], (int, float)):
+            raise ValueError(f"Disease '{name}' has a non-numeric mortality_rate")
+
+    weights = data.get('symptom_weights', {})
+    if not isinstance(weights, dict):
+        raise ValueError("'symptom_weights' must be an object")
+    for symptom, weight in weights.items():
+        if not isinstance(weight, (int, float)) or weight < 0:
+            raise ValueError(f"Weight for '{symptom}' must be a non-negative number")
+
+
+def load_knowledge_file(path: str) -> Dict:
+    """Read and validate a knowledge file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    validate_knowledge_data(data)
+    return data
+
+
+class KnowledgeSnapshot:
+    """
+    One compiled, read-only version of the knowledge base
+
+    Never modified after construction; reloads build a new snapshot.
+    """
+
+    def __init__(self, disease_knowledge: Dict, symptom_weights: Dict, regional_data: Dict,
+                 extra_patterns: Optional[Dict[str, str]] = None, extra_symptoms: Iterable[str] = (),
+                 version: str = "builtin", sources: Optional[List[str]] = None):
+        self.disease_knowledge = disease_knowledge
+        self.symptom_weights = {symptom.lower(): weight for symptom, weight in symptom_weights.items()}
+        self.regional_data = regional_data
+        self.version = version
+        self.sources = sources or []
+        self.loaded_at = datetime.now().isoformat()
+
+        self.translator = RegionalTranslator.from_regional_data(regional_data, extra_patterns)
+        self.language_detector = LanguageDetector.from_translator(self.translator)
+        self.symptom_vocabulary = self._build_symptom_vocabulary(extra_symptoms)
+        self._compile_scoring_matrix()
+
+    def _build_symptom_vocabulary(self, extra_symptoms: Iterable[str]) -> List[str]:
+        """All symptom phrases the ranking step can use, lowercased and de-duplicated"""
+        vocabulary = []
+        for info in self.disease_knowledge.values():
+            for symptom in info['symptoms']:
+                if symptom.lower() not in vocabulary:
+                    vocabulary.append(symptom.lower())
+        for symptom in extra_symptoms:
+            if symptom not in vocabulary:
+                vocabulary.append(symptom)
+        return vocabulary
+
+    def _compile_scoring_matrix(self):
+        """
+        Compile the knowledge base into disease x symptom matrices
+
+        weight_matrix holds the symptom weight where a disease lists the
+        symptom and match_matrix how often it lists it, so a symptom-presence
+        vector gives every disease's score and match count in one product.
+        """
+        self.disease_names = list(self.disease_knowledge.keys())
+        self.symptom_index = {symptom: i for i, symptom in enumerate(self.symptom_vocabulary)}
+
+        shape = (len(self.disease_names), len(self.symptom_vocabulary))
+        self.weight_matrix = np.zeros(shape)
+        self.match_matrix = np.zeros(shape)
+        for row, disease in enumerate(self.disease_names):
+            for symptom in self.disease_knowledge[disease]['symptoms']:
+                col = self.symptom_index[symptom.lower()]
+                self.weight_matrix[row, col] += self.symptom_weights.get(symptom.lower(), 0.5)
+                self.match_matrix[row, col] += 1
+
+        # Symptom-major [weights | counts] table: one product gives both per disease
+        self._score_table = np.ascontiguousarray(np.hstack([self.weight_matrix.T, self.match_matrix.T]))
+
+        # Multi-match bonus by match count: x1 for 0-1 matches, else 1 + 0.1 * count
+        max_matches = int(self.match_matrix.sum(axis=1).max()) if self.disease_names else 0
+        self._match_bonus = 1 + 0.1 * np.arange(max_matches + 1)
+        self._match_bonus[:2] = 1.0
+
+    def translate(self, text: str, language: Optional[str] = None) -> str:
+        """Translate text, skipping the translator for text detected as English"""
+        if language is None:
+            language = self.language_detector.detect(text)
+        if self.language_detector.needs_translation(language):
+            return self.translator.translate(text)
+        return normalize_english(text)
+
+    def translation_window(self) -> int:
+        """Longest regional phrase or symptom in words"""
+        longest_symptom = max(len(symptom.split()) for symptom in self.symptom_vocabulary)
+        return max(self.translator.max_phrase_words, longest_symptom)
+
+    def match_symptoms(self, translated_text: str) -> set:
+        """Find the known symptoms mentioned in already translated text"""
+        text = translated_text.lower()
+        return {symptom for symptom in self.symptom_vocabulary if symptom in text}
+
+    def symptom_presence(self, matched_symptoms: set) -> np.ndarray:
+        """0/1 vector over symptom_vocabulary for a set of matched symptoms"""
+        presence = np.zeros(len(self.symptom_vocabulary))
+        presence[[self.symptom_index[s] for s in matched_symptoms if s in self.symptom_index]] = 1.0
+        return presence
+
+    def presence_matrix(self, matched_sets: List[set]) -> np.ndarray:
+        """(inputs x symptoms) presence matrix for a batch"""
+        presence = np.zeros((len(matched_sets), len(self.symptom_vocabulary)))
+        for row, matched in enumerate(matched_sets):
+            presence[row, [self.symptom_index[s] for s in matched if s in self.symptom_index]] = 1.0
+        return presence
+
+    def score(self, presence: np.ndarray) -> np.ndarray:
+        """
+        Disease scores for a presence vector or an (inputs x symptoms) matrix
+
+        Sums the weights of the matched symptoms and applies the multi-match
+        bonus (1 + 0.1 per matched symptom when more than one matches).
+        """
+        totals = presence @ self._score_table
+        n_diseases = len(self.disease_names)
+        match_counts = totals[..., n_diseases:].astype(np.intp)
+        return totals[..., :n_diseases] * self._match_bonus[match_counts]
+
+    def get_info(self) -> Dict:
+        """Version details for the metrics and admin endpoints"""
+        return {
+            'version': self.version,
+            'loaded_at': self.loaded_at,
+            'sources': self.sources,
+            'diseases': len(self.disease_names),
+            'symptoms': len(self.symptom_vocabulary),
+            'regional_phrases': self.translator.phrase_count
+        }
+
+
+class KnowledgeBaseWatcher:
+    """
+    Polls files for modification and calls ``on_change`` when any changes
+
+    Polling keeps this dependency-free and works on network filesystems; the
+    interval only bounds how quickly an edit goes live.
+    """
+
+    def __init__(self, get_paths: Callable[[], List[str]], on_change: Callable[[], Dict],
+                 interval: float = 5.0):
+        self.get_paths = get_paths
+        self.on_change = on_change
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._mtimes = self._read_mtimes()
+
+    def _read_mtimes(self) -> Dict[str, Optional[float]]:
+        mtimes = {}
+        for path in self.get_paths():
+            if not path:
+                continue
+            try:
+                mtimes[path] = os.stat(path).st_mtime
+            except OSError:
+                mtimes[path] = None
+        return mtimes
+
+    def start(self) -> 'KnowledgeBaseWatcher':
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="knowledge-base-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            mtimes = self._read_mtimes()
+            if mtimes == self._mtimes:
+                continue
+            self._mtimes = mtimes
+            try:
+                result = self.on_change()
+                print(f"🔄 Knowledge base change detected: {result.get('status')} "
+                      f"(version {result.get('version')})")
+            except Exception as e:
+                print(f"⚠️ Knowledge base reload failed: {e}")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Fast-Path Language Detection for Symptom Text
+=============================================
+
+Most symptom descriptions arrive in plain English and gain nothing from the
+regional translation pass. LanguageDetector classifies a text with a script
+check and a lookup of its words against the compiled regional lexicon, so
+only text that can actually be translated is sent through the translator.
+
+The lexicon is the set of words a regional phrase can start with (taken from
+the RegionalTranslator), which makes the English fast path exact: text with
+no such word would come out of the translator unchanged apart from
+lowercasing and whitespace, which normalize_english() reproduces.
+
+ASCII text is split into words with bytes.translate + bytes.split, which is
+all C and about twice as fast as the translator's no-match regex scan; only
+non-ASCII text falls back to the regex tokenizer.
+
+Languages:
+- english              Latin script, no regional words
+- hinglish             Latin script with regional words (romanized Hindi etc.)
+- devanagari           Hindi / Nepali script
+- bengali_assamese     Bengali / Assamese script
+- other_script         Any other non-Latin script
+
+Usage:
+    detector = LanguageDetector.from_translator(translator)
+    detector.detect("severe diarrhea and fever")   # 'english'
+    detector.detect("pet mein dard hai")           # 'hinglish'
+"""
+
+import threading
+from typing import Dict
+
+from regional_translator import WORD_PATTERN
+
+LANGUAGE_ENGLISH = 'english'
+LANGUAGE_HINGLISH = 'hinglish'
+LANGUAGE_DEVANAGARI = 'devanagari'
+LANGUAGE_BENGALI_ASSAMESE = 'bengali_assamese'
+LANGUAGE_OTHER_SCRIPT = 'other_script'
+
+# Unicode blocks of the scripts seen in Northeast India
+SCRIPT_RANGES = [
+    (0x0900, 0x097F, LANGUAGE_DEVANAGARI),
+    (0x0980, 0x09FF, LANGUAGE_BENGALI_ASSAMESE),
+]
+
+
+# ASCII bytes outside \w become spaces, so bytes.split() yields exactly the \w+ words
+_ASCII_WORD_TABLE = bytes(code if code < 0x80 and (chr(code).isalnum() or chr(code) == '_') else 0x20
+                          for code in range(256))
+
+
+def normalize_english(text: str) -> str:
+    """What the translator returns for text without regional words"""
+    return " ".join(text.lower().split())
+
+
+class LanguageDetector:
+    """Script + regional-lexicon classifier"""
+
+    def __init__(self, regional_words: frozenset):
+        self.regional_words = regional_words
+        self._ascii_regional_words = frozenset(word.encode('ascii') for word in regional_words if word.isascii())
+
+    @classmethod
+    def from_translator(cls, translator) -> 'LanguageDetector':
+        return cls(translator.lead_words)
+
+    def detect_script(self, text: str) -> str:
+        """Script of the first non-Latin letter"""
+        for char in text:
+            if ord(char) < 0x80 or not char.isalpha():
+                continue
+            code = ord(char)
+            for start, end, language in SCRIPT_RANGES:
+                if start <= code <= end:
+                    return language
+            if code > 0x024F:  # Beyond Latin Extended
+                return LANGUAGE_OTHER_SCRIPT
+        return LANGUAGE_ENGLISH
+
+    def detect(self, text: str) -> str:
+        """Classify one symptom text"""
+        lowered = text.lower()
+        if lowered.isascii():
+            words = lowered.encode('ascii').translate(_ASCII_WORD_TABLE).split()
+            regional_words = self._ascii_regional_words
+        else:
+            language = self.detect_script(text)
+            if language != LANGUAGE_ENGLISH:
+                return language
+            words = WORD_PATTERN.findall(lowered)
+            regional_words = self.regional_words
+        return LANGUAGE_ENGLISH if regional_words.isdisjoint(words) else LANGUAGE_HINGLISH
+
+    def needs_translation(self, language: str) -> bool:
+        return language != LANGUAGE_ENGLISH
+
+
+class LanguageMixStats:
+    """Thread-safe per-language request counters for /metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+
+    def record(self, language: str, count: int = 1):
+        with self._lock:
+            self._counts[language] = self._counts.get(language, 0) + count
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        skipped = counts.get(LANGUAGE_ENGLISH, 0)
+        return {
+            'analyzed': total,
+            'by_language': counts,
+            'translation_skipped': skipped,
+            'translation_skip_rate': round(skipped / total, 4) if total else 0.0
+        }
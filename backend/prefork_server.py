@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Prefork Multi-Worker Launcher for the Chatbot API
+=================================================
+
+Runs several uvicorn workers for api_server.py while building the expensive
+state only once. The master process loads the SQLite knowledge base, fits the
+TF-IDF vectors and builds the DiseasePredictor, freezes the garbage collector
+and then forks the workers. Every worker shares the loaded pages with the
+master copy-on-write and serves requests from a single shared listening socket.
+
+Features:
+- One knowledge base / model build for N workers
+- gc.freeze() so the cyclic GC never writes to the shared object headers
+- Automatic restart of workers that exit unexpectedly
+- Per-worker RSS / PSS / private memory reporting (Linux /proc)
+
+Usage:
+    python prefork_server.py --workers 4
+    python prefork_server.py --workers 2 --port 8001 --memory-report-interval 30
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("prefork_server")
+
+# Fields read from /proc/<pid>/smaps_rollup, values in kB
+MEMORY_FIELDS = ['Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty']
+
+
+def read_process_memory(pid: int) -> Optional[Dict[str, int]]:
+    """
+    Read the memory breakdown of a process in kB.
+
+    Rss counts shared pages in full for every process, so summing it across
+    workers overstates the real footprint. Pss divides shared pages between
+    the processes mapping them and Private_Dirty is what copy-on-write has
+    actually duplicated, which makes those two the numbers to watch.
+    """
+    stats = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].rstrip(':') in MEMORY_FIELDS:
+                    stats[parts[0].rstrip(':')] = int(parts[1])
+    except (OSError, ValueError):
+        return None
+    return stats or None
+
+
+def format_memory_report(master_pid: int, worker_pids: List[int]) -> str:
+    """Build a table of master and per-worker memory usage"""
+    lines = [f"{'process':<16}{'rss_mb':>10}{'pss_mb':>10}{'private_mb':>12}"]
+    total_pss = 0
+    for label, pid in [("master", master_pid)] + [(f"worker {pid}", pid) for pid in worker_pids]:
+        stats = read_process_memory(pid)
+        if stats is None:
+            lines.append(f"{label:<16}{'n/a':>10}{'n/a':>10}{'n/a':>12}")
+            continue
+        private = stats.get('Private_Clean', 0) + stats.get('Private_Dirty', 0)
+        total_pss += stats.get('Pss', 0)
+        lines.append(f"{label:<16}{stats.get('Rss', 0) / 1024:>10.1f}"
+                     f"{stats.get('Pss', 0) / 1024:>10.1f}{private / 1024:>12.1f}")
+    lines.append(f"{'total pss':<16}{'':>10}{total_pss / 1024:>10.1f}")
+    return "\n".join(lines)
+
+
+def create_listening_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Bind the socket in the master so all workers accept from the same queue"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def load_shared_state():
+    """Import the API and build the knowledge base, vectors and models once"""
+    import api_server
+
+    api_server.initialize_services()
+    if api_server.chatbot is None:
+        raise RuntimeError("Chatbot failed to initialize - refusing to fork workers")
+
+    # Move everything allocated so far into the permanent generation. Without
+    # this the first collection in each worker would write to the GC headers
+    # of every shared object and copy those pages.
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Shared state loaded, {gc.get_freeze_count()} objects frozen")
+    return api_server.app
+
+
+def run_worker(app, sock: socket.socket, log_level: str):
+    """Serve requests in a forked worker until it is told to stop"""
+    import uvicorn
+
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+class PreforkServer:
+    """Master process that forks, supervises and stops the workers"""
+
+    def __init__(self, app, sock: socket.socket, workers: int, log_level: str = "info",
+                 memory_report_interval: float = 60.0):
+        self.app = app
+        self.sock = sock
+        self.num_workers = workers
+        self.log_level = log_level
+        self.memory_report_interval = memory_report_interval
+        self.workers: Dict[int, int] = {}  # pid -> worker slot
+        self.shutting_down = False
+
+    def spawn_worker(self, slot: int):
+        """Fork one worker; the child never returns from this call"""
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            exit_code = 0
+            try:
+                run_worker(self.app, self.sock, self.log_level)
+            except Exception as e:
+                logger.error(f"Worker {os.getpid()} crashed: {e}")
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        self.workers[pid] = slot
+        logger.info(f"Started worker {slot} (pid {pid})")
+
+    def handle_shutdown(self, signum, frame):
+        """Forward the shutdown signal to every worker"""
+        if self.shutting_down:
+            return
+        self.shutting_down = True
+        logger.info("Shutting down workers...")
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def reap_workers(self):
+        """Collect exited workers and restart them unless we are stopping"""
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if pid == 0:
+                return
+            slot = self.workers.pop(pid, None)
+            if slot is None:
+                continue
+            if not self.shutting_down:
+                logger.warning(f"Worker {slot} (pid {pid}) exited with status {status}, restarting")
+                self.spawn_worker(slot)
+
+    def run(self):
+        """Fork the workers and supervise them until shutdown"""
+        signal.signal(signal.SIGINT, self.handle_shutdown)
+        signal.signal(signal.SIGTERM, self.handle_shutdown)
+
+        for slot in range(self.num_workers):
+            self.spawn_worker(slot)
+
+        next_report = time.monotonic() + min(self.memory_report_interval, 10.0)
+        while self.workers:
+            self.reap_workers()
+            if (self.memory_report_interval > 0 and not self.shutting_down
+                    and time.monotonic() >= next_report):
+                logger.info("Memory usage:\n" + format_memory_report(os.getpid(), list(self.workers)))
+                next_report = time.monotonic() + self.memory_report_interval
+            time.sleep(0.5)
+
+        self.sock.close()
+        logger.info("All workers stopped")
+
+
+def create_parser():
+    """Create command line argument parser"""
+    parser = argparse.ArgumentParser(description="Prefork multi-worker launcher for the chatbot API")
+    parser.add_argument('--host', default='0.0.0.0', help='Bind address (default: 0.0.0.0)')
+    parser.add_argument('--port', type=int, default=8001, help='Bind port (default: 8001)')
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count() or 1,
+                        help='Number of worker processes (default: CPU count)')
+    parser.add_argument('--log-level', default='info', help='uvicorn log level')
+    parser.add_argument('--memory-report-interval', type=float, default=60.0,
+                        help='Seconds between per-worker memory reports (0 disables)')
+    return parser
+
+
+def main():
+    """Build the shared state, fork the workers and supervise them"""
+    args = create_parser().parse_args()
+
+    if not hasattr(os, 'fork'):
+        print("❌ Prefork mode needs os.fork(); run api_server.py directly on this platform")
+        sys.exit(1)
+
+    sock = create_listening_socket(args.host, args.port)
+    app = load_shared_state()
+
+    print(f"🚀 Serving on http://{args.host}:{args.port} with {args.workers} workers")
+    PreforkServer(app, sock, args.workers, args.log_level, args.memory_report_interval).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Compiled Regional Language Translator
+=====================================
+
+Rewrites Hindi/Hinglish/regional symptom descriptions into English in a single
+left-to-right pass. All regional.json sections and the predictor's pattern
+table are compiled once into a word-level trie, and the trie into one nested
+regular expression, so at every position the longest phrase that starts there
+is replaced and scanning continues after it - all inside the regex engine.
+
+Compared with chained str.replace calls this:
+- only matches whole words ('hai' no longer rewrites the middle of 'chai')
+- never re-translates English output of an earlier replacement
+- shares common prefixes, so cost grows with the text, not the pattern count
+
+Precedence: the longest match wins; for the same phrase the first section in
+SECTION_ORDER that defines it wins, then the extra pattern table.
+
+Usage:
+    translator = RegionalTranslator.from_regional_data(regional_data, HINDI_PATTERNS)
+    translator.translate("Mujhe pet mein dard hai aur bukhar")
+    translator.translate_many(["pet dard", "jor bukhar"])
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+# regional.json sections in precedence order
+SECTION_ORDER = [
+    'synonyms',
+    'phrases',
+    'common_patterns',
+    'severity_indicators',
+    'time_indicators',
+    'body_parts',
+    'water_related_terms',
+    'food_related_terms'
+]
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# Marks a trie node where a phrase ends; maps to its replacement text
+_END = None
+
+# Words of a multi-word phrase may be separated by any whitespace
+_SEPARATOR = r"\s+"
+
+
+def factor_branches(branches: List) -> str:
+    """
+    Alternation of (word, suffix regex) branches with shared word prefixes
+    factored out character by character, so the regex engine never tries
+    more alternatives at a position than there are distinct next letters.
+    """
+    groups: Dict[str, List] = {}
+    alternatives = []
+    for word, suffix in branches:
+        if word:
+            groups.setdefault(word[0], []).append((word[1:], suffix))
+        else:
+            alternatives.append(suffix)
+    for char, rest in groups.items():
+        alternatives.append(re.escape(char) + factor_branches(rest))
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return "(?:" + "|".join(alternatives) + ")"
+
+
+class RegionalTranslator:
+    """Longest-match, word-boundary phrase rewriter"""
+
+    def __init__(self, mappings: Iterable[Dict[str, str]]):
+        """
+        Args:
+            mappings: Phrase -> replacement dicts, highest precedence first
+        """
+        self._trie: Dict = {}
+        self._replacements: Dict[str, str] = {}
+        self.max_phrase_words = 0
+
+        for mapping in mappings:
+            for phrase, replacement in mapping.items():
+                words = WORD_PATTERN.findall(phrase.lower())
+                if words:
+                    self._add(words, replacement.lower())
+
+        self._pattern = self._compile() if self._trie else None
+
+    @property
+    def phrase_count(self) -> int:
+        return len(self._replacements)
+
+    @property
+    def lead_words(self) -> frozenset:
+        """Words a phrase can start with; text containing none of them translates to itself"""
+        return frozenset(word for word in self._trie if word is not _END)
+
+    @classmethod
+    def from_regional_data(cls, regional_data: Dict, extra_patterns: Optional[Dict[str, str]] = None
+                           ) -> 'RegionalTranslator':
+        """Compile the regional.json sections followed by an extra pattern table"""
+        mappings = [regional_data.get(section, {}) for section in SECTION_ORDER]
+        # Sections not known here still take part, after the known ones
+        mappings += [terms for section, terms in regional_data.items()
+                     if section not in SECTION_ORDER and isinstance(terms, dict)]
+        if extra_patterns:
+            mappings.append(extra_patterns)
+        return cls(mappings)
+
+    def _add(self, words: List[str], replacement: str):
+        node = self._trie
+        for word in words:
+            node = node.setdefault(word, {})
+        if _END not in node:  # Earlier mappings keep precedence
+            node[_END] = replacement
+            self._replacements[" ".join(words)] = replacement
+            self.max_phrase_words = max(self.max_phrase_words, len(words))
+
+    def _compile(self):
+        """Turn the trie into a regex that only matches complete phrases"""
+        def node_regex(node: Dict) -> str:
+            branches = []
+            for word, child in node.items():
+                if word is _END:
+                    continue
+                suffix = ""
+                continuations = [w for w in child if w is not _END]
+                if continuations:
+                    # Greedy, so the longer phrase is tried before stopping here
+                    tail = _SEPARATOR + node_regex(child)
+                    suffix = f"(?:{tail})?" if _END in child else tail
+                if not continuations or _END in child:
+                    suffix += r"(?!\w)"
+                branches.append((word, suffix))
+            return factor_branches(branches)
+
+        return re.compile(r"(?<!\w)" + node_regex(self._trie))
+
+    def _replace(self, match) -> str:
+        return self._replacements[" ".join(match.group().split())]
+
+    def translate(self, text: str) -> str:
+        """Translate one text; unmatched words and punctuation are kept as is"""
+        text = text.lower()
+        if self._pattern is not None:
+            text = self._pattern.sub(self._replace, text)
+        # Dropped words ('hai' -> '') leave double spaces behind
+        return " ".join(text.split())
+
+    def translate_many(self, texts: Iterable[str]) -> List[str]:
+        """Translate a batch, doing the work once per distinct text"""
+        translated: Dict[str, str] = {}
+        results = []
+        for text in texts:
+            if text not in translated:
+                translated[text] = self.translate(text)
+            results.append(translated[text])
+        return results
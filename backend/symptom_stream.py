@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Incremental Symptom Analysis for Streaming Speech Input
+=======================================================
+
+Keeps the state of one voice session so that every partial transcript chunk
+only costs the translation of that chunk (plus a short overlap with the
+previous one) and a re-ranking over the matched-symptom set. The full
+chatbot + predictor pipeline runs once, when the transcript is final.
+
+A session holds at most MAX_TRANSCRIPT_WORDS words and accepts chunks of
+at most MAX_CHUNK_CHARS characters, so one connection cannot grow it
+without bound; the client sends "final" or "reset" to start over.
+
+Each transcript is analysed against the knowledge snapshot that was current
+when it started, so a reload mid-session takes effect on the next one.
+
+Used by the /ws/analyze-symptoms WebSocket endpoint in api_server.py.
+"""
+
+from typing import Dict, List
+
+# Far above a spoken symptom description
+MAX_CHUNK_CHARS = 2000
+MAX_TRANSCRIPT_WORDS = 1000
+
+
+class StreamingSymptomSession:
+    """Matched symptoms and ranking for one in-progress transcript"""
+
+    def __init__(self, predictor):
+        self.predictor = predictor
+        self.reset()
+
+    def reset(self):
+        """Start a new transcript"""
+        self.knowledge = self.predictor.knowledge
+        self.overlap_words = self.knowledge.translation_window()
+        self.words: List[str] = []
+        self.matched_symptoms = set()
+        self.prediction = self.predictor.rank_diseases(self.matched_symptoms, self.knowledge)
+        self.chunks_processed = 0
+
+    @property
+    def transcript(self) -> str:
+        return " ".join(self.words)
+
+    def add_chunk(self, text: str) -> Dict:
+        """
+        Fold one partial transcript chunk into the session.
+
+        Only the new words and the last ``overlap_words`` words before them are
+        translated, so phrases spoken across a chunk boundary still match. The
+        diseases are re-ranked only when the chunk added a new symptom.
+
+        Raises:
+            ValueError: The chunk or the resulting transcript is over the limits
+                        (the session is left unchanged)
+        """
+        if len(text) > MAX_CHUNK_CHARS:
+            raise ValueError(f"Chunks are limited to {MAX_CHUNK_CHARS} characters")
+        new_words = text.lower().split()
+        if len(self.words) + len(new_words) > MAX_TRANSCRIPT_WORDS:
+            raise ValueError(f"Transcripts are limited to {MAX_TRANSCRIPT_WORDS} words; "
+                             f"send \"final\" or \"reset\" to start a new one")
+        window = self.words[-self.overlap_words:] + new_words if self.overlap_words else new_words
+        self.words.extend(new_words)
+        self.chunks_processed += 1
+
+        new_symptoms = []
+        if new_words:
+            translated = self.predictor._translate_regional_terms(" ".join(window), self.knowledge)
+            new_symptoms = sorted(self.knowledge.match_symptoms(translated) - self.matched_symptoms)
+
+        if new_symptoms:
+            self.matched_symptoms.update(new_symptoms)
+            self.prediction = self.predictor.rank_diseases(self.matched_symptoms, self.knowledge)
+
+        return self.get_update(new_symptoms)
+
+    def get_update(self, new_symptoms: List[str] = None) -> Dict:
+        """Message pushed to the client after each chunk"""
+        prediction = self.prediction
+        ranked = sorted(prediction.get('all_probabilities', {}).items(), key=lambda item: item[1], reverse=True)
+        return {
+            'type': 'partial',
+            'transcript': self.transcript,
+            'chunks_processed': self.chunks_processed,
+            'new_symptoms': new_symptoms or [],
+            'matched_symptoms': sorted(self.matched_symptoms),
+            'predicted_disease': prediction.get('predicted_disease', 'Unknown'),
+            'probability': prediction.get('probability', 0.0),
+            'confidence': prediction.get('confidence', 'Low'),
+            'ranked_diseases': [
+                {'name': name, 'probability': probability}
+                for name, probability in ranked if probability > 0
+            ]
+        }
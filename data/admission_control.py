@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Admission Control and Backpressure
+==================================
+
+Bounds the number of analyses that run at the same time. Requests beyond the
+concurrency limit wait in a bounded queue for at most ``queue_timeout``
+seconds; when the queue is already full (or the wait times out) the request
+is shed immediately with an OverloadedError so the API can answer
+503 + Retry-After instead of letting latency grow for every client.
+
+Configuration (environment variables, <PREFIX> is e.g. NIROGYA_ANALYSIS):
+    <PREFIX>_MAX_CONCURRENT   analyses running at once      (default: CPU count)
+    <PREFIX>_MAX_QUEUE        requests allowed to wait      (default: 4 x limit)
+    <PREFIX>_QUEUE_TIMEOUT    seconds a request may wait    (default: 5.0)
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict
+
+
+class OverloadedError(Exception):
+    """Raised when a request is shed by admission control"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def load_admission_settings(prefix: str) -> Dict[str, Any]:
+    """Read the limits for one controller from the environment"""
+    max_concurrent = int(os.environ.get(f"{prefix}_MAX_CONCURRENT", os.cpu_count() or 1))
+    max_queue = int(os.environ.get(f"{prefix}_MAX_QUEUE", max_concurrent * 4))
+    queue_timeout = float(os.environ.get(f"{prefix}_QUEUE_TIMEOUT", 5.0))
+    return {
+        'max_concurrent': max(1, max_concurrent),
+        'max_queue': max(0, max_queue),
+        'queue_timeout': max(0.0, queue_timeout)
+    }
+
+
+class _AdmissionStats:
+    """Counters and service-time estimate shared by both controllers"""
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.avg_service_time = 0.0
+
+    def record_service_time(self, seconds: float):
+        # Exponentially weighted so the estimate follows the current load
+        if self.avg_service_time == 0.0:
+            self.avg_service_time = seconds
+        else:
+            self.avg_service_time = 0.8 * self.avg_service_time + 0.2 * seconds
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue is expected to drain"""
+        backlog = (self.waiting + 1) * self.avg_service_time / self.max_concurrent
+        return max(1, math.ceil(backlog))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue,
+            'queue_timeout_seconds': self.queue_timeout,
+            'active': self.active,
+            'queue_depth': self.waiting,
+            'admitted': self.admitted,
+            'rejected_queue_full': self.rejected_queue_full,
+            'rejected_timeout': self.rejected_timeout,
+            'avg_service_time_ms': round(self.avg_service_time * 1000, 2)
+        }
+
+
+class AdmissionController:
+    """
+    Thread-based admission control for synchronous servers such as Flask.
+
+    Usage:
+        with controller.admit():
+            result = expensive_analysis()
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self._stats = _AdmissionStats(max_concurrent, max_queue, queue_timeout)
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_env(cls, prefix: str) -> 'AdmissionController':
+        return cls(**load_admission_settings(prefix))
+
+    def acquire(self):
+        """Take a slot, waiting in the queue until the deadline if necessary"""
+        stats = self._stats
+        with self._condition:
+            if stats.active < stats.max_concurrent:
+                stats.active += 1
+                stats.admitted += 1
+                return
+            if stats.waiting >= stats.max_queue:
+                stats.rejected_queue_full += 1
+                raise OverloadedError("Server is busy - analysis queue is full", stats.retry_after())
+
+            stats.waiting += 1
+            deadline = time.monotonic() + stats.queue_timeout
+            try:
+                while stats.active >= stats.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        stats.rejected_timeout += 1
+                        raise OverloadedError("Server is busy - timed out waiting in queue",
+                                              stats.retry_after())
+                    self._condition.wait(remaining)
+                stats.active += 1
+                stats.admitted += 1
+            finally:
+                stats.waiting -= 1
+
+    def release(self, service_time: float = None):
+        """Give the slot back and wake one waiting request"""
+        with self._condition:
+            self._stats.active -= 1
+            if service_time is not None:
+                self._stats.record_service_time(service_time)
+            self._condition.notify()
+
+    @contextmanager
+    def admit(self):
+        self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Current queue depth and counters for the metrics endpoints"""
+        with self._condition:
+            return self._stats.snapshot()
+
+
+class AsyncAdmissionController:
+    """
+    asyncio admission control for FastAPI handlers.
+
+    Slots are handed directly to the oldest waiter on release, so waiting
+    requests are admitted in arrival order.
+
+    Usage:
+        async with controller.admit():
+            result = await run_in_threadpool(expensive_analysis)
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self._stats = _AdmissionStats(max_concurrent, max_queue, queue_timeout)
+        self._waiters = deque()
+
+    @classmethod
+    def from_env(cls, prefix: str) -> 'AsyncAdmissionController':
+        return cls(**load_admission_settings(prefix))
+
+    async def acquire(self):
+        """Take a slot, waiting in the queue until the deadline if necessary"""
+        stats = self._stats
+        if stats.active < stats.max_concurrent and not self._waiters:
+            stats.active += 1
+            stats.admitted += 1
+            return
+        if len(self._waiters) >= stats.max_queue:
+            stats.rejected_queue_full += 1
+            raise OverloadedError("Server is busy - analysis queue is full", stats.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        stats.waiting = len(self._waiters)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), stats.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up - pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self._discard_waiter(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            stats.rejected_timeout += 1
+            raise OverloadedError("Server is busy - timed out waiting in queue", stats.retry_after())
+        stats.admitted += 1
+
+    def _discard_waiter(self, waiter):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        self._stats.waiting = len(self._waiters)
+
+    def release(self, service_time: float = None):
+        """Hand the slot to the oldest live waiter, or free it"""
+        if service_time is not None:
+            self._stats.record_service_time(service_time)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            self._stats.waiting = len(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._stats.active -= 1
+
+    @asynccontextmanager
+    async def admit(self):
+        await self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Current queue depth and counters for the metrics endpoints"""
+        return self._stats.snapshot()
@@ -11,6 +11,10 @@ Usage:
     
 Then make POST requests to: http://localhost:5000/predict
 
+Concurrent /predict requests are micro-batched into one model call; tune
+with NIROGYA_PREDICT_MAX_BATCH_SIZE and NIROGYA_PREDICT_BATCH_WINDOW_MS
+(see micro_batcher.py) and watch batch fill on GET /metrics.
+
 Requirements:
     pip install flask flask-cors
 """
@@ -24,6 +28,7 @@ except ImportError:
 
 import json
 from disease_prediction_service import DiseasePredictor
+from micro_batcher import MicroBatcher
 
 
 app = Flask(__name__)
@@ -32,12 +37,16 @@ CORS(app)  # Enable CORS for frontend integration
 # Global predictor instance
 predictor = None
 
+# Collects concurrent /predict requests into batched model calls
+predict_batcher = None
+
 
 def initialize_predictor():
     """Initialize the predictor when the app starts"""
-    global predictor
+    global predictor, predict_batcher
     try:
         predictor = DiseasePredictor()
+        predict_batcher = MicroBatcher.from_env(predictor.predict_rows, "NIROGYA_PREDICT")
         print("✅ Disease prediction model loaded successfully!")
         return True
     except Exception as e:
@@ -79,8 +88,14 @@ def predict():
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        # Make prediction
-        result = predictor.predict_single(data)
+        # Make prediction (batched with concurrent requests)
+        if isinstance(data, dict) and predict_batcher is not None:
+            try:
+                result = predict_batcher.submit(data)
+            except TimeoutError as e:
+                return jsonify({'error': str(e)}), 503
+        else:
+            result = predictor.predict_single(data)
         
         if 'error' in result:
             return jsonify(result), 400
@@ -136,6 +151,16 @@ def predict_batch():
         return jsonify({'error': f'Batch prediction failed: {str(e)}'}), 500
 
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Runtime counters: micro-batch fill for /predict and prediction cache hit rate"""
+    return jsonify({
+        'model_version': predictor.model_version if predictor else None,
+        'predict_batching': predict_batcher.get_stats() if predict_batcher else None,
+        'prediction_cache': predictor.get_cache_stats() if predictor else None
+    })
+
+
 @app.route('/model/info', methods=['GET'])
 def model_info():
     """Get model information and performance metrics"""
@@ -154,6 +179,7 @@ def model_info():
         
         return jsonify({
             'model_type': 'GradientBoostingRegressor',
+            'model_version': predictor.model_version,
             'feature_count': len(predictor.feature_names),
             'performance': {
                 'r2_score': float(predictor.metadata['performance_metrics']['test_r2']),
@@ -167,6 +193,50 @@ def model_info():
         return jsonify({'error': f'Failed to get model info: {str(e)}'}), 500
 
 
+@app.route('/model/versions', methods=['GET'])
+def model_versions():
+    """List registered model versions and the one serving requests"""
+    if predictor is None:
+        return jsonify({'error': 'Model not loaded'}), 500
+    
+    return jsonify({
+        'serving_version': predictor.model_version,
+        **predictor.list_versions()
+    })
+
+
+@app.route('/model/activate', methods=['POST'])
+def activate_model():
+    """
+    Switch to another model version without restarting
+    
+    Expects JSON:
+    {
+        "version": "20250905_152526",
+        "persist": false,       # also make it the manifest's active version
+        "background": false     # warm up in the background and return 202
+    }
+    """
+    try:
+        if predictor is None:
+            return jsonify({'error': 'Model not loaded'}), 500
+        
+        data = request.get_json() or {}
+        version = data.get('version')
+        if not version:
+            return jsonify({'error': 'No version provided'}), 400
+        
+        result = predictor.activate_version(version, persist=bool(data.get('persist', False)),
+                                            background=bool(data.get('background', False)))
+        if 'error' in result:
+            return jsonify(result), 400
+        
+        return jsonify(result), 202 if result['status'] == 'warming' else 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Activation failed: {str(e)}'}), 500
+
+
 @app.route('/example', methods=['GET'])
 def get_example():
     """Get an example input for testing"""
@@ -200,7 +270,10 @@ def main():
     print("  GET  /              - Health check")
     print("  POST /predict       - Single prediction")
     print("  POST /predict/batch - Batch predictions")
+    print("  GET  /metrics       - Micro-batching and prediction cache counters")
     print("  GET  /model/info    - Model information")
+    print("  GET  /model/versions - Registered model versions")
+    print("  POST /model/activate - Switch model version without restart")
     print("  GET  /example       - Example input format")
     print("\n💡 Example curl command:")
     print('curl -X POST http://localhost:5000/predict \\')
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Parallel Batch Analysis
+=======================
+
+Runs large /api/batch-analyze requests on a process pool. Scenarios are
+split into chunks, each chunk goes to a worker process with its own
+IntegratedHealthAnalyzer, and the results are reassembled in request order,
+so a district planning run of thousands of scenarios uses every core instead
+of one Flask thread.
+
+Inside a chunk the vectorized stages run once for the whole chunk: the WQI
+of every scenario comes from one wqi_engine pass, and the correlation,
+recommendations and risk scores from one decision_rules pass. Both are
+handed to analyze_integrated_scenario, which then skips those stages.
+The remaining per-scenario steps run in a loop and report through the
+sampled tracing layer rather than print().
+
+Failures stay isolated: an invalid or failing scenario becomes one
+{"success": false, "error": ...} entry, and a crashed worker only fails the
+scenarios of its own chunk (the pool is rebuilt for the next batch). Small
+batches are analyzed in-process, where starting workers would cost more
+than it saves.
+
+Configuration (environment variables, <PREFIX> is e.g. NIROGYA_BATCH):
+    <PREFIX>_WORKERS        worker processes                 (default: CPU count, 1 disables the pool)
+    <PREFIX>_CHUNK_SIZE     scenarios per worker task        (default: 250)
+    <PREFIX>_MIN_PARALLEL   smallest batch sent to the pool  (default: 200)
+    <PREFIX>_START_METHOD   multiprocessing start method     (default: spawn)
+
+Used by:
+- correlation_api.py  /api/batch-analyze
+- batch_upload.py     chunks of uploaded CSV/Parquet files
+"""
+
+import contextlib
+import io
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from disease_water_correlation import IntegratedHealthAnalyzer
+from outbreak_forecast import disease_labels, seasonal_disease_codes
+from wqi_engine import calculate_wqi_batch
+
+
+def load_batch_settings(prefix: str) -> Dict[str, Any]:
+    """Read the pool and chunking limits from the environment"""
+    workers = int(os.environ.get(f"{prefix}_WORKERS", os.cpu_count() or 1))
+    chunk_size = int(os.environ.get(f"{prefix}_CHUNK_SIZE", 250))
+    min_parallel = int(os.environ.get(f"{prefix}_MIN_PARALLEL", 200))
+    start_method = os.environ.get(f"{prefix}_START_METHOD", "spawn")
+    return {
+        'workers': max(1, workers),
+        'chunk_size': max(1, chunk_size),
+        'min_parallel': max(1, min_parallel),
+        'start_method': start_method
+    }
+
+
+def _scenario_error(scenario: Any, index: int, error: str) -> Dict[str, Any]:
+    scenario_id = scenario.get('id', f'scenario_{index + 1}') if isinstance(scenario, dict) \
+        else f'scenario_{index + 1}'
+    return {
+        "scenario_id": scenario_id,
+        "success": False,
+        "error": error
+    }
+
+
+def decide_chunk(analyzer: IntegratedHealthAnalyzer, scenarios: List[Dict[str, Any]],
+                 wqis: List[float]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Correlation, recommendations and risk scores of valid scenarios in one
+    vectorized decision-table pass (the rule-based disease comes from the
+    seasonal rule table). Returns None entries when a value is unusable, so
+    each scenario applies the rules itself.
+    """
+    try:
+        outbreaks = [scenario['outbreak_data'] for scenario in scenarios]
+        cases = np.array([outbreak.get('No_of_Cases', 0) for outbreak in outbreaks], dtype=float)
+        months = np.array([outbreak.get('Start_of_Outbreak_Month', 7) for outbreak in outbreaks], dtype=float)
+        states = np.array([outbreak.get('Northeast_State', 1) for outbreak in outbreaks], dtype=float)
+        columns = {
+            'wqi': wqis,
+            'cases': cases,
+            'disease': disease_labels(seasonal_disease_codes(cases, months, states))
+        }
+        for parameter in analyzer.decision_tables.parameters:
+            columns[parameter] = np.array([scenario['water_params'].get(parameter, np.nan)
+                                           for scenario in scenarios], dtype=float)
+        batch = analyzer.decision_tables.evaluate(columns)
+    except (TypeError, ValueError):
+        return [None] * len(scenarios)
+    return [batch.row(i) for i in range(len(scenarios))]
+
+
+def analyze_chunk(analyzer: IntegratedHealthAnalyzer, scenarios: List[Any],
+                  include_future: bool = True, offset: int = 0) -> List[Dict[str, Any]]:
+    """
+    Analyze one chunk of batch scenarios.
+
+    Args:
+        analyzer: Analyzer used for the per-scenario steps
+        scenarios: Scenario dicts with id, outbreak_data and water_params
+        include_future: Include the 3-month outbreak forecast
+        offset: Index of the first scenario in the whole batch (for default ids)
+
+    Returns:
+        list: One batch result entry per scenario, in order
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(scenarios)
+
+    valid = []
+    for i, scenario in enumerate(scenarios):
+        if not isinstance(scenario, dict):
+            results[i] = _scenario_error(scenario, offset + i, "Scenario must be an object")
+        elif not isinstance(scenario.get('outbreak_data'), dict) or not isinstance(scenario.get('water_params'), dict):
+            missing = 'outbreak_data' if not isinstance(scenario.get('outbreak_data'), dict) else 'water_params'
+            results[i] = _scenario_error(scenario, offset + i, f"'{missing}' must be an object")
+        else:
+            valid.append(i)
+
+    # Vectorized stages: the WQI and the decisions of every valid scenario in
+    # one pass each. If any value is unusable, each scenario runs these
+    # stages itself below so only that scenario fails.
+    try:
+        wqis = calculate_wqi_batch([scenarios[i]['water_params'] for i in valid], use_defaults=True).tolist()
+        decisions = decide_chunk(analyzer, [scenarios[i] for i in valid], wqis)
+    except (TypeError, ValueError):
+        wqis = decisions = [None] * len(valid)
+
+    for i, wqi, decision in zip(valid, wqis, decisions):
+        scenario = scenarios[i]
+        try:
+            analysis = analyzer.analyze_integrated_scenario(
+                scenario['outbreak_data'],
+                scenario['water_params'],
+                include_future=include_future,
+                wqi=wqi,
+                decision=decision
+            )
+            results[i] = {
+                "scenario_id": scenario.get('id', f'scenario_{offset + i + 1}'),
+                "success": True,
+                "analysis": analysis,
+                "input_data": {
+                    "outbreak_data": scenario['outbreak_data'],
+                    "water_params": scenario['water_params']
+                }
+            }
+        except Exception as e:
+            results[i] = _scenario_error(scenario, offset + i, str(e))
+
+    return results
+
+
+# Per-process analyzer of a pool worker
+_worker_analyzer = None
+
+
+def _init_worker():
+    global _worker_analyzer
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker_analyzer = IntegratedHealthAnalyzer()
+
+
+def _analyze_chunk_in_worker(scenarios: List[Any], include_future: bool, offset: int) -> List[Dict[str, Any]]:
+    return analyze_chunk(_worker_analyzer, scenarios, include_future, offset)
+
+
+class ParallelBatchAnalyzer:
+    """
+    Chunked batch analysis on a lazily started process pool.
+
+    Usage:
+        batch_analyzer = ParallelBatchAnalyzer.from_env("NIROGYA_BATCH")
+        results, execution = batch_analyzer.analyze(scenarios, include_future, analyzer)
+    """
+
+    def __init__(self, workers: int = 1, chunk_size: int = 250, min_parallel: int = 200,
+                 start_method: str = "spawn"):
+        self.workers = max(1, int(workers))
+        self.chunk_size = max(1, int(chunk_size))
+        self.min_parallel = max(1, int(min_parallel))
+        self.start_method = start_method
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._parallel_batches = 0
+        self._scenarios = 0
+        self._failed_scenarios = 0
+        self._chunks = 0
+        self._worker_failures = 0
+        self._total_batch_time = 0.0
+
+    @classmethod
+    def from_env(cls, prefix: str) -> 'ParallelBatchAnalyzer':
+        return cls(**load_batch_settings(prefix))
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 1
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker
+                )
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        """Drop a broken pool so the next batch starts fresh workers"""
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def plan_chunks(self, n_scenarios: int, parallel: bool) -> List[Tuple[int, int]]:
+        """(start, stop) ranges; parallel batches are spread over all workers"""
+        size = self.chunk_size
+        if parallel:
+            size = max(1, min(size, math.ceil(n_scenarios / self.workers)))
+        return [(start, min(start + size, n_scenarios)) for start in range(0, n_scenarios, size)]
+
+    def analyze(self, scenarios: List[Any], include_future: bool = True,
+                local_analyzer: Optional[IntegratedHealthAnalyzer] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Analyze a batch of scenarios.
+
+        Args:
+            scenarios: Scenario dicts as accepted by /api/batch-analyze
+            include_future: Include the 3-month outbreak forecast
+            local_analyzer: Analyzer for batches run in-process
+
+        Returns:
+            tuple: (results in request order, execution details)
+        """
+        started = time.perf_counter()
+        parallel = self.enabled and len(scenarios) >= self.min_parallel
+        if not parallel and local_analyzer is None:
+            raise RuntimeError("In-process batch analysis needs an analyzer")
+        chunks = self.plan_chunks(len(scenarios), parallel)
+
+        worker_failures = 0
+        if parallel:
+            pool = self._get_pool()
+            futures = [pool.submit(_analyze_chunk_in_worker, scenarios[start:stop], include_future, start)
+                       for start, stop in chunks]
+            results = []
+            for (start, stop), future in zip(chunks, futures):
+                try:
+                    results.extend(future.result())
+                except Exception as e:
+                    # Only this chunk's scenarios fail; a dead pool is replaced
+                    worker_failures += 1
+                    if isinstance(e, BrokenProcessPool):
+                        self._discard_pool(pool)
+                    results.extend(_scenario_error(scenarios[i], i, f"Batch worker failed: {e}")
+                                   for i in range(start, stop))
+        else:
+            results = []
+            for start, stop in chunks:
+                results.extend(analyze_chunk(local_analyzer, scenarios[start:stop], include_future, start))
+
+        elapsed = time.perf_counter() - started
+        failed = sum(not result['success'] for result in results)
+        with self._stats_lock:
+            self._batches += 1
+            self._parallel_batches += parallel
+            self._scenarios += len(scenarios)
+            self._failed_scenarios += failed
+            self._chunks += len(chunks)
+            self._worker_failures += worker_failures
+            self._total_batch_time += elapsed
+
+        execution = {
+            'parallel': parallel,
+            'workers': self.workers if parallel else 1,
+            'chunks': len(chunks),
+            'elapsed_ms': round(elapsed * 1000, 2)
+        }
+        return results, execution
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool and throughput counters for the metrics endpoint"""
+        with self._stats_lock:
+            return {
+                'enabled': self.enabled,
+                'workers': self.workers,
+                'chunk_size': self.chunk_size,
+                'min_parallel': self.min_parallel,
+                'pool_started': self._pool is not None,
+                'batches': self._batches,
+                'parallel_batches': self._parallel_batches,
+                'scenarios': self._scenarios,
+                'failed_scenarios': self._failed_scenarios,
+                'chunks': self._chunks,
+                'worker_failures': self._worker_failures,
+                'scenarios_per_second': round(self._scenarios / self._total_batch_time, 1)
+                if self._total_batch_time else 0.0
+            }
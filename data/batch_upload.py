@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+"""
+File-Upload Batch Analysis
+==========================
+
+Runs integrated analyses over a CSV or Parquet file of scenarios, such as
+historical outbreak rows joined with water quality samples, instead of a
+JSON array posted to /api/batch-analyze. The file is read in chunks of
+rows, each chunk goes through ParallelBatchAnalyzer (vectorized WQI and
+decision passes, process pool for large chunks) and its results are
+appended to an output file before the next chunk is read, so memory stays
+bounded by the chunk size whatever the size of the file.
+
+Input columns (one scenario per row, other columns are ignored):
+    id or scenario_id              optional, default row_<n> (1-based data row)
+    No_of_Cases, Northeast_State, Start_of_Outbreak_Month
+    ph, dissolved_oxygen, bod, nitrate_n, fecal_coliform, total_coliform, temperature
+Empty cells are left out of the scenario, so the analyzer defaults apply.
+
+Output formats:
+    csv     one flat row per scenario (inputs, disease, WQI, correlation,
+            risk scores, alert level, joined recommendations, forecast)
+    jsonl   one /api/batch-analyze result object per line
+
+Parquet input needs pyarrow; CSV works with pandas alone.
+
+Configuration (environment variables, <PREFIX> is e.g. NIROGYA_UPLOAD):
+    <PREFIX>_DIR          directory for uploads and results   (default: nirogya_batch_uploads in the temp dir)
+    <PREFIX>_CHUNK_ROWS   rows read and analyzed per chunk     (default: 1000)
+    <PREFIX>_MAX_RUNNING  jobs analyzed at the same time       (default: 1)
+    <PREFIX>_KEEP_JOBS    finished jobs kept for download      (default: 20)
+
+Usage:
+    upload_jobs = BatchUploadJobs.from_env("NIROGYA_UPLOAD")
+    job = upload_jobs.submit(file_storage.save, 'history.csv', analyzer, batch_analyzer)
+    upload_jobs.status(job['job_id'])
+
+    python batch_upload.py history.csv -o results.csv
+    python batch_upload.py history.parquet -o results.jsonl --chunk-rows 5000 --no-future
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from batch_analysis import ParallelBatchAnalyzer, analyze_chunk
+
+try:
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+INPUT_FORMATS = {'.csv': 'csv', '.txt': 'csv', '.parquet': 'parquet', '.pq': 'parquet'}
+OUTPUT_FORMATS = ('csv', 'jsonl')
+
+ID_COLUMNS = ('id', 'scenario_id')
+OUTBREAK_COLUMNS = ('No_of_Cases', 'Northeast_State', 'Start_of_Outbreak_Month')
+WATER_COLUMNS = ('ph', 'dissolved_oxygen', 'bod', 'nitrate_n', 'fecal_coliform', 'total_coliform', 'temperature')
+
+FORECAST_MONTHS = 3
+
+RESULT_COLUMNS = (
+    'predicted_disease', 'disease_probability', 'prediction_confidence', 'prediction_method',
+    'wqi', 'quality_category', 'quality_risk', 'water_risk_factors',
+    'correlation_score', 'correlation_strength', 'combined_risk_level', 'correlation_factors',
+    'critical_intervention_needed',
+    'disease_risk', 'water_risk', 'correlation_risk', 'combined_risk', 'alert_level',
+    'recommendations'
+)
+
+LIST_SEPARATOR = ' | '
+
+
+def load_upload_settings(prefix: str) -> Dict[str, Any]:
+    """Read the upload directory and job limits from the environment"""
+    return {
+        'directory': os.environ.get(f"{prefix}_DIR",
+                                    os.path.join(tempfile.gettempdir(), 'nirogya_batch_uploads')),
+        'chunk_rows': int(os.environ.get(f"{prefix}_CHUNK_ROWS", 1000)),
+        'max_running': int(os.environ.get(f"{prefix}_MAX_RUNNING", 1)),
+        'keep_jobs': int(os.environ.get(f"{prefix}_KEEP_JOBS", 20))
+    }
+
+
+def detect_format(filename: str) -> str:
+    """'csv' or 'parquet' from the file extension"""
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension not in INPUT_FORMATS:
+        raise ValueError(f"Unsupported file type '{extension or filename}', expected "
+                         f"{', '.join(sorted(INPUT_FORMATS))}")
+    return INPUT_FORMATS[extension]
+
+
+def read_chunks(path: str, input_format: str, chunk_rows: int,
+                progress: Optional[Callable[[float], None]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Yield the rows of a CSV or Parquet file as DataFrames of at most chunk_rows rows.
+
+    progress, when given, is called after each chunk with the fraction of the
+    file read so far (bytes for CSV, rows for Parquet).
+    """
+    if input_format == 'parquet':
+        if not PARQUET_AVAILABLE:
+            raise RuntimeError("Parquet input needs pyarrow (pip install pyarrow)")
+        parquet_file = pq.ParquetFile(path)
+        total_rows = parquet_file.metadata.num_rows
+        rows_read = 0
+        for record_batch in parquet_file.iter_batches(batch_size=chunk_rows):
+            rows_read += record_batch.num_rows
+            if progress:
+                progress(rows_read / total_rows if total_rows else 1.0)
+            yield record_batch.to_pandas()
+        return
+
+    total_bytes = os.path.getsize(path)
+    with open(path, 'rb') as handle:
+        for frame in pd.read_csv(handle, chunksize=chunk_rows):
+            if progress:
+                # The parser reads ahead, so this runs slightly early
+                progress(min(handle.tell() / total_bytes, 1.0) if total_bytes else 1.0)
+            yield frame
+
+
+def check_columns(columns: List[str]):
+    """Reject files that contain none of the analysis columns"""
+    if not set(columns) & set(OUTBREAK_COLUMNS + WATER_COLUMNS):
+        raise ValueError(f"File has none of the analysis columns "
+                         f"({', '.join(OUTBREAK_COLUMNS + WATER_COLUMNS)})")
+
+
+def _cell(value: Any) -> Any:
+    """Native value of a DataFrame cell, None for empty cells"""
+    if isinstance(value, str):
+        # One bad cell turns a CSV column into strings for its whole chunk;
+        # numbers are parsed back so only the bad row fails
+        value = value.strip()
+        if not value:
+            return None
+        for number in (int, float):
+            try:
+                return number(value)
+            except ValueError:
+                pass
+        return value
+    if value is None or pd.isna(value):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+
+def frame_to_scenarios(frame: pd.DataFrame, first_row: int) -> List[Dict[str, Any]]:
+    """Scenario dicts (id, outbreak_data, water_params) for the rows of one chunk"""
+    id_column = next((column for column in ID_COLUMNS if column in frame.columns), None)
+    outbreak_columns = [column for column in OUTBREAK_COLUMNS if column in frame.columns]
+    water_columns = [column for column in WATER_COLUMNS if column in frame.columns]
+
+    scenarios = []
+    for offset, row in enumerate(frame.to_dict('records')):
+        scenario_id = row[id_column] if id_column else None
+        if not isinstance(scenario_id, str):
+            scenario_id = _cell(scenario_id)
+        outbreak_data = {column: _cell(row[column]) for column in outbreak_columns}
+        water_params = {column: _cell(row[column]) for column in water_columns}
+        scenarios.append({
+            'id': str(scenario_id) if scenario_id is not None else f'row_{first_row + offset + 1}',
+            'outbreak_data': {key: value for key, value in outbreak_data.items() if value is not None},
+            'water_params': {key: value for key, value in water_params.items() if value is not None}
+        })
+    return scenarios
+
+
+def _joined(values: Any) -> str:
+    return LIST_SEPARATOR.join(str(value) for value in values or [])
+
+
+def flatten_result(result: Dict[str, Any], include_future: bool = True,
+                   scenario: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """One flat output row for a batch result entry (inputs from the scenario for failed rows)"""
+    row = {'scenario_id': result.get('scenario_id'), 'success': result.get('success'),
+           'error': result.get('error', '')}
+    inputs = result.get('input_data') or scenario or {}
+    row.update(inputs.get('outbreak_data', {}))
+    row.update(inputs.get('water_params', {}))
+
+    analysis = result.get('analysis')
+    if not analysis:
+        return row
+    prediction = analysis['disease_prediction']
+    water = analysis['water_assessment']
+    correlation = analysis['correlation_analysis']
+    row.update({
+        'predicted_disease': prediction.get('most_likely_disease'),
+        'disease_probability': prediction.get('disease_probability'),
+        'prediction_confidence': prediction.get('confidence'),
+        'prediction_method': prediction.get('method'),
+        'wqi': water.get('wqi'),
+        'quality_category': water.get('quality_category'),
+        'quality_risk': water.get('quality_risk'),
+        'water_risk_factors': _joined(water.get('risk_factors')),
+        'correlation_score': correlation.get('correlation_score'),
+        'correlation_strength': correlation.get('correlation_strength'),
+        'combined_risk_level': correlation.get('combined_risk_level'),
+        'correlation_factors': _joined(correlation.get('correlation_factors')),
+        'critical_intervention_needed': correlation.get('critical_intervention_needed'),
+        'alert_level': analysis.get('alert_level'),
+        'recommendations': _joined(analysis.get('recommendations'))
+    })
+    row.update(analysis.get('risk_scores', {}))
+
+    if include_future:
+        for month, forecast in enumerate((analysis.get('future_predictions') or {}).values(), start=1):
+            row[f'month_{month}_predicted_cases'] = forecast.get('predicted_cases')
+            row[f'month_{month}_disease'] = forecast.get('most_likely_disease')
+            row[f'month_{month}_risk_level'] = forecast.get('risk_level')
+    return row
+
+
+def output_columns(input_columns: List[str], include_future: bool = True) -> List[str]:
+    """CSV header: id, status, the analysis inputs present in the file, then the results"""
+    columns = ['scenario_id', 'success', 'error']
+    columns += [column for column in OUTBREAK_COLUMNS + WATER_COLUMNS if column in input_columns]
+    columns += RESULT_COLUMNS
+    if include_future:
+        for month in range(1, FORECAST_MONTHS + 1):
+            columns += [f'month_{month}_predicted_cases', f'month_{month}_disease', f'month_{month}_risk_level']
+    return columns
+
+
+def run_batch_file(input_path: str, output_path: str, analyzer,
+                   batch_analyzer: Optional[ParallelBatchAnalyzer] = None,
+                   input_format: Optional[str] = None, output_format: str = 'csv',
+                   chunk_rows: int = 1000, include_future: bool = True,
+                   progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Analyze every row of a CSV or Parquet file, writing results chunk by chunk.
+
+    Args:
+        input_path: CSV or Parquet file of scenarios
+        output_path: Results file, overwritten
+        analyzer: IntegratedHealthAnalyzer for in-process chunks
+        batch_analyzer: Pool used for each chunk (None analyzes in-process)
+        input_format: 'csv' or 'parquet' (default: from the file extension)
+        output_format: 'csv' or 'jsonl'
+        chunk_rows: Rows read and analyzed at a time
+        include_future: Include the 3-month outbreak forecast
+        progress: Called with the running totals after each chunk
+
+    Returns:
+        dict: Row, failure and chunk counts with timings
+    """
+    input_format = input_format or detect_format(input_path)
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format '{output_format}', expected {', '.join(OUTPUT_FORMATS)}")
+    chunk_rows = max(1, int(chunk_rows))
+
+    started = time.perf_counter()
+    totals = {'rows': 0, 'successful': 0, 'failed': 0, 'chunks': 0, 'progress': 0.0}
+    read_fraction = [0.0]
+
+    def read_progress(fraction: float):
+        read_fraction[0] = fraction
+
+    with open(output_path, 'w', newline='', encoding='utf-8') as output:
+        writer = None
+        for frame in read_chunks(input_path, input_format, chunk_rows, read_progress):
+            if writer is None:
+                check_columns(list(frame.columns))
+                if output_format == 'csv':
+                    writer = csv.DictWriter(output, fieldnames=output_columns(list(frame.columns), include_future),
+                                            extrasaction='ignore')
+                    writer.writeheader()
+                else:
+                    writer = output
+
+            scenarios = frame_to_scenarios(frame, totals['rows'])
+            if batch_analyzer is not None:
+                results, _ = batch_analyzer.analyze(scenarios, include_future, analyzer)
+            else:
+                results = analyze_chunk(analyzer, scenarios, include_future, totals['rows'])
+
+            if output_format == 'csv':
+                writer.writerows(flatten_result(result, include_future, scenario)
+                                for result, scenario in zip(results, scenarios))
+            else:
+                for result in results:
+                    output.write(json.dumps(result, ensure_ascii=False, default=str) + '\n')
+            output.flush()
+
+            successful = sum(result['success'] for result in results)
+            totals['rows'] += len(results)
+            totals['successful'] += successful
+            totals['failed'] += len(results) - successful
+            totals['chunks'] += 1
+            totals['progress'] = round(read_fraction[0], 4)
+            if progress:
+                progress(dict(totals))
+
+        if writer is None:
+            raise ValueError("File has no data rows")
+
+    elapsed = time.perf_counter() - started
+    totals.update({
+        'progress': 1.0,
+        'elapsed_seconds': round(elapsed, 3),
+        'rows_per_second': round(totals['rows'] / elapsed, 1) if elapsed else 0.0,
+        'output_format': output_format
+    })
+    return totals
+
+
+class BatchUploadJobs:
+    """
+    Background analysis jobs for uploaded files, with progress and results on disk.
+
+    Each job gets a directory with the upload and its results file. The upload
+    is deleted when the job finishes; the oldest finished jobs are removed,
+    files included, once more than keep_jobs are kept.
+    """
+
+    def __init__(self, directory: str, chunk_rows: int = 1000, max_running: int = 1, keep_jobs: int = 20):
+        self.directory = directory
+        self.chunk_rows = max(1, int(chunk_rows))
+        self.max_running = max(1, int(max_running))
+        self.keep_jobs = max(1, int(keep_jobs))
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._rows_processed = 0
+
+    @classmethod
+    def from_env(cls, prefix: str) -> 'BatchUploadJobs':
+        return cls(**load_upload_settings(prefix))
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_running,
+                                                    thread_name_prefix='batch-upload')
+            return self._executor
+
+    def submit(self, save: Callable[[str], Any], filename: str, analyzer,
+               batch_analyzer: Optional[ParallelBatchAnalyzer] = None,
+               input_format: Optional[str] = None, output_format: str = 'csv',
+               include_future: bool = True, chunk_rows: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Store an upload and queue its analysis.
+
+        Args:
+            save: Writes the upload to the given path (e.g. FileStorage.save)
+            filename: Original file name, used for the format and the download name
+
+        Returns:
+            dict: Job status snapshot
+        """
+        input_format = input_format or detect_format(filename)
+        if input_format not in set(INPUT_FORMATS.values()):
+            raise ValueError(f"Unsupported input format '{input_format}', expected csv or parquet")
+        if input_format == 'parquet' and not PARQUET_AVAILABLE:
+            raise ValueError("Parquet input needs pyarrow (pip install pyarrow)")
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format '{output_format}', expected {', '.join(OUTPUT_FORMATS)}")
+
+        job_id = uuid.uuid4().hex
+        job_dir = os.path.join(self.directory, job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        input_path = os.path.join(job_dir, f'input.{input_format}')
+        save(input_path)
+
+        job = {
+            'job_id': job_id,
+            'status': 'queued',
+            'filename': os.path.basename(filename),
+            'input_format': input_format,
+            'output_format': output_format,
+            'include_future': include_future,
+            'upload_bytes': os.path.getsize(input_path),
+            'rows': 0,
+            'successful': 0,
+            'failed': 0,
+            'chunks': 0,
+            'progress': 0.0,
+            'error': None,
+            'created_at': datetime.now().isoformat(),
+            'started_at': None,
+            'finished_at': None,
+            '_dir': job_dir,
+            '_input_path': input_path,
+            '_output_path': os.path.join(job_dir, f'results.{output_format}')
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+        self._get_executor().submit(self._run, job_id, analyzer, batch_analyzer,
+                                    chunk_rows or self.chunk_rows)
+        return self.status(job_id)
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def _run(self, job_id: str, analyzer, batch_analyzer, chunk_rows: int):
+        with self._lock:
+            job = dict(self._jobs[job_id])
+        self._update(job_id, status='running', started_at=datetime.now().isoformat())
+        try:
+            totals = run_batch_file(job['_input_path'], job['_output_path'], analyzer, batch_analyzer,
+                                    input_format=job['input_format'], output_format=job['output_format'],
+                                    chunk_rows=chunk_rows, include_future=job['include_future'],
+                                    progress=lambda running: self._update(job_id, **running))
+            self._update(job_id, status='completed', **totals)
+            with self._lock:
+                self._rows_processed += totals['rows']
+        except Exception as e:
+            self._update(job_id, status='failed', error=str(e))
+            with contextlib.suppress(OSError):
+                os.remove(job['_output_path'])
+        finally:
+            self._update(job_id, finished_at=datetime.now().isoformat())
+            with contextlib.suppress(OSError):
+                os.remove(job['_input_path'])
+            self._prune()
+
+    def _prune(self):
+        """Remove the oldest finished jobs beyond keep_jobs"""
+        with self._lock:
+            finished = [job for job in self._jobs.values() if job['finished_at']]
+            removed = finished[:max(0, len(finished) - self.keep_jobs)]
+            for job in removed:
+                del self._jobs[job['job_id']]
+        for job in removed:
+            shutil.rmtree(job['_dir'], ignore_errors=True)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Public fields of a job, or None for an unknown job"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {key: value for key, value in job.items() if not key.startswith('_')}
+
+    def result_path(self, job_id: str) -> Optional[str]:
+        """Results file of a completed job, or None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] != 'completed':
+                return None
+            return job['_output_path']
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Job counts and throughput for the metrics endpoint"""
+        with self._lock:
+            statuses = {}
+            for job in self._jobs.values():
+                statuses[job['status']] = statuses.get(job['status'], 0) + 1
+            return {
+                'parquet_available': PARQUET_AVAILABLE,
+                'chunk_rows': self.chunk_rows,
+                'max_running': self.max_running,
+                'jobs': statuses,
+                'rows_processed': self._rows_processed
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Integrated analysis of every row of a CSV or Parquet file")
+    parser.add_argument('input', help="CSV or Parquet file of scenarios")
+    parser.add_argument('-o', '--output', help="Results file, .csv or .jsonl (default: <input>_results.csv)")
+    parser.add_argument('--format', choices=sorted(set(INPUT_FORMATS.values())),
+                        help="Input format (default: from the file extension)")
+    parser.add_argument('--chunk-rows', type=int, default=load_upload_settings("NIROGYA_UPLOAD")['chunk_rows'],
+                        help="Rows read and analyzed at a time (default: NIROGYA_UPLOAD_CHUNK_ROWS or 1000)")
+    parser.add_argument('--no-future', action='store_true', help="Skip the 3-month outbreak forecast")
+    args = parser.parse_args()
+
+    output_path = args.output or f"{os.path.splitext(args.input)[0]}_results.csv"
+    output_format = 'jsonl' if output_path.lower().endswith('.jsonl') else 'csv'
+
+    from disease_water_correlation import IntegratedHealthAnalyzer
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer = IntegratedHealthAnalyzer()
+    batch_analyzer = ParallelBatchAnalyzer.from_env("NIROGYA_BATCH")
+
+    def report(totals: Dict[str, Any]):
+        print(f"📦 Chunk {totals['chunks']}: {totals['rows']} rows analyzed, "
+              f"{totals['failed']} failed ({totals['progress'] * 100:.0f}% of file read)")
+
+    print(f"🔄 Analyzing {args.input} in chunks of {args.chunk_rows} rows...")
+    try:
+        totals = run_batch_file(args.input, output_path, analyzer, batch_analyzer,
+                                input_format=args.format, output_format=output_format,
+                                chunk_rows=args.chunk_rows, include_future=not args.no_future,
+                                progress=report)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"❌ Error analyzing {args.input}: {str(e)}")
+        return 1
+    finally:
+        batch_analyzer.shutdown()
+
+    print(f"✅ Wrote {totals['rows']} results to {output_path} ({totals['failed']} failed) "
+          f"in {totals['elapsed_seconds']:.1f}s ({totals['rows_per_second']:.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
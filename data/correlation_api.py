@@ -10,7 +10,9 @@ Features:
 - Disease prediction endpoint
 - Future outbreak trend prediction
 - Batch analysis capabilities
+- CSV/Parquet file batch analysis in background jobs (batch_upload.py)
 - Real-time correlation scoring
+- Cached answers for repeated inputs (response_cache.py)
 
 Usage:
     python correlation_api.py
@@ -20,8 +22,13 @@ API Endpoints:
     POST /api/water-quality - Water quality assessment only
     POST /api/disease-prediction - Disease prediction only
     POST /api/future-trends - Future outbreak predictions
+    POST /api/future-trends/batch - Multi-scenario forecasts (up to 24 months)
     POST /api/batch-analyze - Batch analysis
+    POST /api/batch-analyze/upload - Batch analysis of an uploaded CSV/Parquet file
+    GET /api/batch-analyze/jobs/<job_id> - Upload job progress
+    GET /api/batch-analyze/jobs/<job_id>/download - Upload job results file
     GET /api/health - Health check
+    GET /api/metrics - Runtime counters
     GET /api/docs - API documentation
 
 Author: SIH Project Team
@@ -33,7 +40,7 @@ import sys
 import json
 from datetime import datetime
 from typing import Dict, List, Any
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, request, jsonify, render_template_string, send_file
 from flask_cors import CORS
 import warnings
 warnings.filterwarnings('ignore')
@@ -43,6 +50,15 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Import our correlation analysis system
 from disease_water_correlation import IntegratedHealthAnalyzer
+from request_coalescing import SingleFlight, canonical_json_key
+from admission_control import AdmissionController, OverloadedError
+from batch_analysis import ParallelBatchAnalyzer
+from batch_upload import BatchUploadJobs
+from risk_grid import RiskGrid
+from response_cache import ResponseCache
+from tracing import get_tracer
+from outbreak_forecast import (MAX_HORIZON, check_outbreak_fields, check_water_params,
+                               forecast_scenarios, grid_summary)
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -51,12 +67,36 @@ CORS(app)  # Enable CORS for frontend integration
 # Global analyzer instance
 analyzer = None
 
+# Concurrent identical analyses share one computation
+analysis_flight = SingleFlight()
+
+# Bounds concurrent analyses; excess requests queue briefly, then get a 503
+# (limits from NIROGYA_ANALYSIS_MAX_CONCURRENT / _MAX_QUEUE / _QUEUE_TIMEOUT)
+analysis_admission = AdmissionController.from_env("NIROGYA_ANALYSIS")
+
+# Large batch analyses run chunked on a process pool
+# (NIROGYA_BATCH_WORKERS / _CHUNK_SIZE / _MIN_PARALLEL / _START_METHOD)
+batch_analyzer = ParallelBatchAnalyzer.from_env("NIROGYA_BATCH")
+
+# Uploaded CSV/Parquet files analyzed chunk by chunk in background jobs
+# (NIROGYA_UPLOAD_DIR / _CHUNK_ROWS / _MAX_RUNNING / _KEEP_JOBS)
+upload_jobs = BatchUploadJobs.from_env("NIROGYA_UPLOAD")
+
+# Results of repeated identical requests, per endpoint
+# (NIROGYA_RESPONSE_CACHE_SIZE / _TTL / _DECIMALS)
+response_cache = ResponseCache.from_env("NIROGYA_RESPONSE_CACHE")
+
+# Precomputed answers for on-grid /api/analyze requests, opened with the analyzer
+# (NIROGYA_RISK_GRID_ENABLED / _PATH / _AUTO_BUILD)
+risk_grid = None
+
 def initialize_analyzer():
     """Initialize the health analyzer"""
-    global analyzer
+    global analyzer, risk_grid
     try:
         analyzer = IntegratedHealthAnalyzer()
         print("✅ Integrated Health Analyzer initialized successfully!")
+        risk_grid = RiskGrid.from_env("NIROGYA_RISK_GRID", analyzer).open()
         return True
     except Exception as e:
         print(f"❌ Failed to initialize analyzer: {e}")
@@ -77,6 +117,42 @@ def health_check():
         "ml_models_loaded": analyzer is not None
     })
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Runtime counters for the analysis endpoints"""
+    return jsonify({
+        "analysis_coalescing": analysis_flight.get_stats(),
+        "analysis_admission": analysis_admission.get_stats(),
+        "batch_analysis": batch_analyzer.get_stats(),
+        "batch_uploads": upload_jobs.get_stats(),
+        "risk_grid": risk_grid.get_stats() if risk_grid is not None else None,
+        "response_cache": response_cache.get_stats(),
+        "tracing": get_tracer().get_stats(),
+        "prediction_cache": analyzer.disease_predictor.get_cache_stats()
+        if analyzer is not None and analyzer.disease_predictor is not None else None,
+        "timestamp": datetime.now().isoformat()
+    })
+
+def overloaded_response(error: OverloadedError):
+    """503 response telling the client when to retry"""
+    response = jsonify({
+        "success": False,
+        "error": str(error),
+        "retry_after": error.retry_after,
+        "timestamp": datetime.now().isoformat()
+    })
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 503
+
+def run_admitted_analysis(outbreak_data, water_params, include_future=True):
+    """Run one integrated analysis once admission control grants a slot"""
+    with analysis_admission.admit():
+        return analyzer.analyze_integrated_scenario(
+            outbreak_data,
+            water_params,
+            include_future=include_future
+        )
+
 @app.route('/api/analyze', methods=['POST'])
 def complete_analysis():
     """
@@ -131,12 +207,31 @@ def complete_analysis():
             if field not in water_params:
                 return jsonify({"error": f"Missing required water parameter: {field}"}), 400
         
-        # Perform analysis
-        analysis = analyzer.analyze_integrated_scenario(
-            outbreak_data, 
-            water_params, 
-            include_future=include_future
-        )
+        # Repeated submissions are answered from the response cache
+        request_key = {
+            "outbreak_data": outbreak_data,
+            "water_params": water_params,
+            "include_future": include_future
+        }
+        analysis, from_cache = response_cache.get('analyze', request_key)
+        from_risk_grid = False
+        
+        if not from_cache:
+            # On-grid requests are answered from the precomputed risk grid
+            analysis = risk_grid.lookup(outbreak_data, water_params, include_future) \
+                if risk_grid is not None else None
+            from_risk_grid = analysis is not None
+            
+            # Perform analysis (identical in-flight requests share one computation)
+            if analysis is None:
+                analysis = analysis_flight.do(
+                    canonical_json_key(request_key),
+                    run_admitted_analysis,
+                    outbreak_data, 
+                    water_params, 
+                    include_future=include_future
+                )
+            response_cache.put('analyze', request_key, analysis)
         
         # Format response
         response = {
@@ -149,12 +244,16 @@ def complete_analysis():
             "metadata": {
                 "analysis_timestamp": datetime.now().isoformat(),
                 "service_version": "1.0.0",
-                "include_future_predictions": include_future
+                "include_future_predictions": include_future,
+                "from_cache": from_cache,
+                "from_risk_grid": from_risk_grid
             }
         }
         
         return jsonify(response)
         
+    except OverloadedError as e:
+        return overloaded_response(e)
     except Exception as e:
         return jsonify({
             "success": False,
@@ -191,13 +290,17 @@ def water_quality_assessment():
         
         water_params = data['water_params']
         
-        # Perform water quality assessment
-        assessment = analyzer.assess_water_quality_risk(water_params)
+        # Perform water quality assessment (repeated inputs come from the response cache)
+        assessment, from_cache = response_cache.get_or_compute(
+            'water-quality', {"water_params": water_params},
+            analyzer.assess_water_quality_risk, water_params
+        )
         
         response = {
             "success": True,
             "water_assessment": assessment,
             "input_params": water_params,
+            "from_cache": from_cache,
             "timestamp": datetime.now().isoformat()
         }
         
@@ -235,13 +338,17 @@ def disease_prediction():
         
         outbreak_data = data['outbreak_data']
         
-        # Perform disease prediction
-        prediction = analyzer.predict_disease_from_outbreak(outbreak_data)
+        # Perform disease prediction (repeated inputs come from the response cache)
+        prediction, from_cache = response_cache.get_or_compute(
+            'disease-prediction', {"outbreak_data": outbreak_data},
+            analyzer.predict_disease_from_outbreak, outbreak_data
+        )
         
         response = {
             "success": True,
             "disease_prediction": prediction,
             "input_data": outbreak_data,
+            "from_cache": from_cache,
             "timestamp": datetime.now().isoformat()
         }
         
@@ -294,8 +401,15 @@ def future_trends():
         water_params = data['water_params']
         months_ahead = data.get('months_ahead', 3)
         
-        # Perform future trend prediction
-        future_predictions = analyzer.predict_future_outbreak_trend(
+        if not isinstance(months_ahead, int) or isinstance(months_ahead, bool) \
+                or not 1 <= months_ahead <= MAX_HORIZON:
+            return jsonify({"error": f"months_ahead must be an integer between 1 and {MAX_HORIZON}"}), 400
+        
+        # Perform future trend prediction (repeated inputs come from the response cache)
+        future_predictions, from_cache = response_cache.get_or_compute(
+            'future-trends',
+            {"outbreak_data": outbreak_data, "water_params": water_params, "months_ahead": months_ahead},
+            analyzer.predict_future_outbreak_trend,
             outbreak_data, 
             water_params, 
             months_ahead=months_ahead
@@ -309,6 +423,7 @@ def future_trends():
                 "water_params": water_params,
                 "months_ahead": months_ahead
             },
+            "from_cache": from_cache,
             "timestamp": datetime.now().isoformat()
         }
         
@@ -321,6 +436,98 @@ def future_trends():
             "timestamp": datetime.now().isoformat()
         }), 500
 
+@app.route('/api/future-trends/batch', methods=['POST'])
+def future_trends_batch():
+    """
+    Forecast many scenarios in one vectorized call
+    
+    Expected JSON payload:
+    {
+        "scenarios": [
+            {
+                "id": "kamrup_metro",
+                "outbreak_data": {...},
+                "water_params": {...}
+            }
+        ],
+        "months_ahead": 12
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'scenarios' not in data:
+            return jsonify({"error": "Missing required field: scenarios"}), 400
+        
+        scenarios = data['scenarios']
+        months_ahead = data.get('months_ahead', 12)
+        
+        if not isinstance(scenarios, list):
+            return jsonify({"error": "Scenarios must be a list"}), 400
+        if not isinstance(months_ahead, int) or isinstance(months_ahead, bool) \
+                or not 1 <= months_ahead <= MAX_HORIZON:
+            return jsonify({"error": f"months_ahead must be an integer between 1 and {MAX_HORIZON}"}), 400
+        
+        forecasts = [None] * len(scenarios)
+        valid = []
+        for i, scenario in enumerate(scenarios):
+            if isinstance(scenario, dict) and isinstance(scenario.get('outbreak_data'), dict) \
+                    and isinstance(scenario.get('water_params'), dict):
+                try:
+                    # Rejected here rather than coerced by the array forecast
+                    check_outbreak_fields(scenario['outbreak_data'])
+                    check_water_params(scenario['water_params'])
+                    valid.append(i)
+                except ValueError as e:
+                    forecasts[i] = {
+                        "scenario_id": scenario.get('id', f'scenario_{i+1}'),
+                        "success": False,
+                        "error": str(e)
+                    }
+            else:
+                forecasts[i] = {
+                    "scenario_id": scenario.get('id', f'scenario_{i+1}') if isinstance(scenario, dict) else f'scenario_{i+1}',
+                    "success": False,
+                    "error": "Scenario needs outbreak_data and water_params objects"
+                }
+        
+        def forecast_group(indices):
+            grid = forecast_scenarios([scenarios[i]['outbreak_data'] for i in indices],
+                                      [scenarios[i]['water_params'] for i in indices], months_ahead)
+            for row, i in enumerate(indices):
+                forecasts[i] = dict(scenario_id=scenarios[i].get('id', f'scenario_{i+1}'), success=True,
+                                    **grid_summary(grid, row))
+        
+        # All scenarios share one grid; bad values fall back to per-scenario forecasts
+        try:
+            forecast_group(valid)
+        except (TypeError, ValueError, KeyError, IndexError):
+            for i in valid:
+                try:
+                    forecast_group([i])
+                except (TypeError, ValueError, KeyError, IndexError) as e:
+                    forecasts[i] = {
+                        "scenario_id": scenarios[i].get('id', f'scenario_{i+1}'),
+                        "success": False,
+                        "error": str(e)
+                    }
+        
+        return jsonify({
+            "success": True,
+            "forecasts": forecasts,
+            "total_scenarios": len(scenarios),
+            "successful_forecasts": len([f for f in forecasts if f['success']]),
+            "months_ahead": months_ahead,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }), 500
+
 @app.route('/api/batch-analyze', methods=['POST'])
 def batch_analysis():
     """
@@ -358,43 +565,15 @@ def batch_analysis():
         if not isinstance(scenarios, list):
             return jsonify({"error": "Scenarios must be a list"}), 400
         
-        results = []
-        
-        for i, scenario in enumerate(scenarios):
-            try:
-                scenario_id = scenario.get('id', f'scenario_{i+1}')
-                outbreak_data = scenario['outbreak_data']
-                water_params = scenario['water_params']
-                
-                # Perform analysis for this scenario
-                analysis = analyzer.analyze_integrated_scenario(
-                    outbreak_data, 
-                    water_params, 
-                    include_future=include_future
-                )
-                
-                results.append({
-                    "scenario_id": scenario_id,
-                    "success": True,
-                    "analysis": analysis,
-                    "input_data": {
-                        "outbreak_data": outbreak_data,
-                        "water_params": water_params
-                    }
-                })
-                
-            except Exception as e:
-                results.append({
-                    "scenario_id": scenario.get('id', f'scenario_{i+1}'),
-                    "success": False,
-                    "error": str(e)
-                })
+        # Chunked, and spread over worker processes for large batches
+        results, execution = batch_analyzer.analyze(scenarios, include_future, analyzer)
         
         response = {
             "success": True,
             "batch_results": results,
             "total_scenarios": len(scenarios),
             "successful_analyses": len([r for r in results if r['success']]),
+            "execution": execution,
             "timestamp": datetime.now().isoformat()
         }
         
@@ -407,6 +586,90 @@ def batch_analysis():
             "timestamp": datetime.now().isoformat()
         }), 500
 
+def upload_job_response(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job status with the URLs to poll and to download the results"""
+    return dict(job,
+                status_url=f"/api/batch-analyze/jobs/{job['job_id']}",
+                download_url=f"/api/batch-analyze/jobs/{job['job_id']}/download")
+
+@app.route('/api/batch-analyze/upload', methods=['POST'])
+def batch_analysis_upload():
+    """
+    Batch analysis of an uploaded CSV or Parquet file
+    
+    Expected multipart/form-data:
+        file            CSV or Parquet file, one scenario per row with the
+                        outbreak and water parameter columns (optional id)
+        include_future  "true" or "false" (default: true)
+        output_format   "csv" or "jsonl" (default: csv)
+    
+    The file is analyzed chunk by chunk in a background job; poll the
+    returned status_url and fetch the results from download_url.
+    """
+    try:
+        if not analyzer:
+            return jsonify({"error": "Service not properly initialized"}), 500
+        
+        upload = request.files.get('file')
+        if upload is None or not upload.filename:
+            return jsonify({"error": "Missing required file: file"}), 400
+        
+        include_future = request.form.get('include_future', 'true').strip().lower() not in ('0', 'false', 'no')
+        output_format = request.form.get('output_format', 'csv').strip().lower()
+        
+        try:
+            job = upload_jobs.submit(upload.save, upload.filename, analyzer, batch_analyzer,
+                                     input_format=request.form.get('format') or None,
+                                     output_format=output_format,
+                                     include_future=include_future)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        return jsonify({
+            "success": True,
+            "job": upload_job_response(job),
+            "timestamp": datetime.now().isoformat()
+        }), 202
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }), 500
+
+@app.route('/api/batch-analyze/jobs/<job_id>', methods=['GET'])
+def batch_upload_status(job_id):
+    """Progress of a file batch analysis job"""
+    job = upload_jobs.status(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    
+    return jsonify({
+        "success": True,
+        "job": upload_job_response(job),
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.route('/api/batch-analyze/jobs/<job_id>/download', methods=['GET'])
+def batch_upload_download(job_id):
+    """Results file of a completed file batch analysis job"""
+    job = upload_jobs.status(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    
+    path = upload_jobs.result_path(job_id)
+    if path is None:
+        return jsonify({
+            "error": f"Job is {job['status']}, results are available once it has completed",
+            "job": upload_job_response(job)
+        }), 409
+    
+    stem = os.path.splitext(job['filename'])[0] or 'batch'
+    mimetype = 'text/csv' if job['output_format'] == 'csv' else 'application/x-ndjson'
+    return send_file(path, mimetype=mimetype, as_attachment=True,
+                     download_name=f"{stem}_results.{job['output_format']}")
+
 @app.route('/api/docs', methods=['GET'])
 def api_documentation():
     """API documentation endpoint"""
@@ -526,6 +789,24 @@ def api_documentation():
             </div>
         </div>
         
+        <div class="endpoint">
+            <h3><span class="method post">POST</span> /api/future-trends/batch</h3>
+            <p>Vectorized forecasts for many scenarios, up to 24 months ahead.</p>
+            <div class="example">
+                <strong>Request Body:</strong>
+                <pre>{
+  "scenarios": [
+    {
+      "id": "kamrup_metro",
+      "outbreak_data": {...},
+      "water_params": {...}
+    }
+  ],
+  "months_ahead": 12
+}</pre>
+            </div>
+        </div>
+        
         <div class="endpoint">
             <h3><span class="method post">POST</span> /api/batch-analyze</h3>
             <p>Batch analysis for multiple scenarios.</p>
@@ -549,6 +830,32 @@ def api_documentation():
             </div>
         </div>
         
+        <div class="endpoint">
+            <h3><span class="method post">POST</span> /api/batch-analyze/upload</h3>
+            <p>Batch analysis of a CSV or Parquet file (multipart/form-data), run in a background job.
+               Each row is one scenario with the outbreak and water quality parameter columns below
+               and an optional <code>id</code> column.</p>
+            <div class="example">
+                <strong>Example:</strong>
+                <pre>curl -F file=@history.csv -F output_format=csv -F include_future=true \
+     http://localhost:5000/api/batch-analyze/upload
+
+{"job": {"job_id": "...", "status": "queued", "progress": 0.0,
+         "status_url": "/api/batch-analyze/jobs/...",
+         "download_url": "/api/batch-analyze/jobs/.../download"}}</pre>
+            </div>
+        </div>
+        
+        <div class="endpoint">
+            <h3><span class="method get">GET</span> /api/batch-analyze/jobs/&lt;job_id&gt;</h3>
+            <p>Job status and progress (rows, failed rows, chunks, fraction of the file read).</p>
+        </div>
+        
+        <div class="endpoint">
+            <h3><span class="method get">GET</span> /api/batch-analyze/jobs/&lt;job_id&gt;/download</h3>
+            <p>Results file of a completed job (one CSV row or JSON line per scenario).</p>
+        </div>
+        
         <h2>🎯 Parameter Specifications</h2>
         
         <h3>Outbreak Data Parameters:</h3>
@@ -595,11 +902,16 @@ def not_found(error):
         "message": "Please check the API documentation at /api/docs",
         "available_endpoints": [
             "/api/health",
+            "/api/metrics",
             "/api/analyze", 
             "/api/water-quality",
             "/api/disease-prediction",
             "/api/future-trends",
+            "/api/future-trends/batch",
             "/api/batch-analyze",
+            "/api/batch-analyze/upload",
+            "/api/batch-analyze/jobs/<job_id>",
+            "/api/batch-analyze/jobs/<job_id>/download",
             "/api/docs"
         ]
     }), 404
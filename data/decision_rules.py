@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Compiled Decision Tables
+========================
+
+The correlation scoring, integrated recommendations and combined risk
+scoring of IntegratedHealthAnalyzer, expressed as data. The rules live in
+decision_rules.json (thresholds, points, factor texts and recommendation
+IDs) and are compiled once into condition functions that evaluate either
+one scenario's plain values or whole columns of scenarios, so a batch is
+scored with a few NumPy comparisons per rule instead of an if-chain per
+scenario.
+
+Rule format:
+    {"field": "fecal_coliform", "above": 50}      comparisons: above, at_least,
+                                                   below, at_most (combinable)
+    {"field": "ph", "outside": [6.0, 9.0]}        below low or above high
+    {"field": "disease", "in": ["Cholera"]}       membership
+    {"disease_watches": "bod"}                    bod is a critical parameter
+                                                   of the scenario's disease
+    A rule's "when" list is a conjunction; an empty list always fires.
+    Missing or NaN measurements never satisfy a condition.
+
+Fields: the water parameters, "wqi", "cases", "disease" and (for the
+recommendation rules) the capped "correlation_score".
+
+Features:
+- decide(): correlation analysis, recommendations and risk scores for one scenario
+- evaluate(): the same decisions for columns of scenarios, read back with row()
+- Rules are validated on load; unknown operators raise ValueError
+
+Configuration:
+    NIROGYA_DECISION_RULES   path of an alternative rules file (default: decision_rules.json)
+
+Usage:
+    tables = DecisionTables.load()
+    decision = tables.decide({**water_params, 'wqi': wqi, 'cases': 40, 'disease': 'Cholera'})
+    batch = tables.evaluate({'wqi': wqis, 'cases': cases, 'disease': diseases, 'ph': phs, ...})
+    batch.row(0)['alert_level']
+"""
+
+import json
+import operator
+import os
+from itertools import chain, compress
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'decision_rules.json')
+
+# Value of fields a scenario does not have (fails every condition)
+_MISSING = float('nan')
+
+# Context fields that are not water parameters
+SCENARIO_FIELDS = ('wqi', 'cases', 'disease', 'correlation_score')
+
+_COMPARISONS = {
+    'above': operator.gt,
+    'at_least': operator.ge,
+    'below': operator.lt,
+    'at_most': operator.le
+}
+
+
+def _is_column(value) -> bool:
+    return isinstance(value, np.ndarray)
+
+
+def _compile_test(op: str, argument, condition: Dict[str, Any]) -> Callable:
+    """One operator of a condition; works on plain values and on columns"""
+    if op in _COMPARISONS:
+        compare = _COMPARISONS[op]
+        return lambda v: compare(v, argument)
+    if op == 'outside':
+        low, high = argument
+        return lambda v: (v < low) | (v > high)
+    if op == 'in':
+        members = tuple(argument)
+        return lambda v: np.isin(v, members) if _is_column(v) else v in members
+    raise ValueError(f"Unknown operator '{op}' in decision rule condition {condition}")
+
+
+def _compile_condition(condition: Dict[str, Any], disease_parameters: Dict[str, List[str]]) -> Tuple[str, Callable]:
+    if 'disease_watches' in condition:
+        parameter = condition['disease_watches']
+        diseases = [disease for disease, parameters in disease_parameters.items() if parameter in parameters]
+        return _compile_condition({'field': 'disease', 'in': diseases}, disease_parameters)
+    if 'field' not in condition or len(condition) < 2:
+        raise ValueError(f"Decision rule condition needs a field and an operator: {condition}")
+    tests = [_compile_test(op, argument, condition) for op, argument in condition.items() if op != 'field']
+
+    if len(tests) == 1:
+        return condition['field'], tests[0]
+
+    def test(value):
+        result = tests[0](value)
+        for check in tests[1:]:
+            result = result & check(value)
+        return result
+
+    return condition['field'], test
+
+
+class CompiledRule:
+    """A conjunction of compiled conditions plus the rule's outcome"""
+
+    def __init__(self, rule: Dict[str, Any], disease_parameters: Dict[str, List[str]]):
+        self.rule = rule
+        self.conditions = [_compile_condition(condition, disease_parameters) for condition in rule.get('when', [])]
+        self.fields = {field for field, _ in self.conditions}
+        self.factor = rule.get('factor')
+
+    def matches(self, context: Dict[str, Any]) -> bool:
+        """Whether the rule fires for one scenario's values"""
+        for field, test in self.conditions:
+            if not test(context.get(field, _MISSING)):
+                return False
+        return True
+
+    def mask(self, columns: Dict[str, np.ndarray], n: int) -> np.ndarray:
+        """Where the rule fires for columns of n scenarios"""
+        result = np.ones(n, dtype=bool)
+        for field, test in self.conditions:
+            result &= test(columns[field])
+        return result
+
+
+def _thresholds(levels: List[Dict[str, Any]], payload: Callable) -> List[Tuple[Optional[float], Any]]:
+    """Descending 'at_least' levels; the last level (no threshold) is the fallback"""
+    compiled = [(level.get('at_least'), payload(level)) for level in levels]
+    if not compiled or compiled[-1][0] is not None or any(t is None for t, _ in compiled[:-1]):
+        raise ValueError("Decision levels need thresholds and one final fallback level")
+    return compiled
+
+
+def _level(levels: List[Tuple[Optional[float], Any]], value):
+    for threshold, payload in levels:
+        if threshold is None or value >= threshold:
+            return payload
+
+
+def _level_codes(levels: List[Tuple[Optional[float], Any]], values: np.ndarray) -> np.ndarray:
+    return np.select([values >= threshold for threshold, _ in levels[:-1]],
+                     list(range(len(levels) - 1)), len(levels) - 1)
+
+
+class DecisionTables:
+    """
+    Correlation, recommendation and risk rules compiled from decision_rules.json.
+    """
+
+    def __init__(self, rules: Dict[str, Any], source: str = '<dict>'):
+        self.source = source
+        self.version = rules.get('version')
+        self.disease_parameters = rules['disease_parameters']
+
+        correlation = rules['correlation']
+        self.correlation_rules = [CompiledRule(rule, self.disease_parameters) for rule in correlation['rules']]
+        self.correlation_points = np.array([rule.rule['points'] for rule in self.correlation_rules])
+        self.max_correlation_score = correlation['max_score']
+        self.correlation_levels = _thresholds(correlation['levels'],
+                                              lambda level: (level['strength'], level['risk_level']))
+        self.critical_intervention_at = correlation['critical_intervention_at_least']
+
+        recommendations = rules['recommendations']
+        self.recommendation_texts = recommendations['texts']
+        self.recommendation_rules = [CompiledRule(rule, self.disease_parameters)
+                                     for rule in recommendations['rules']]
+        for rule in self.recommendation_rules:
+            unknown = [rec_id for rec_id in rule.rule['ids'] if rec_id not in self.recommendation_texts]
+            if unknown:
+                raise ValueError(f"Unknown recommendation ids {unknown} in decision rules ({source})")
+        # Recommendation texts of each rule, in rule order
+        self.recommendation_outcomes = [[self.recommendation_texts[rec_id] for rec_id in rule.rule['ids']]
+                                        for rule in self.recommendation_rules]
+
+        risk = rules['risk']
+        disease_risk = risk['disease_risk']
+        self.cases_field = disease_risk['field']
+        self.risk_segments = disease_risk['segments']
+        if not self.risk_segments or 'at_most' in self.risk_segments[-1]:
+            raise ValueError("Disease risk segments need a final open-ended segment")
+        self.severity_multipliers = disease_risk['severity_multipliers']
+        self.default_severity = disease_risk.get('default_multiplier', 1.0)
+        self.max_disease_risk = disease_risk['max']
+        self.combined_weights = risk['combined_weights']
+        self.alert_levels = _thresholds(risk['alert_levels'], lambda level: level['label'])
+
+        rule_fields = set().union(*(rule.fields for rule in self.correlation_rules + self.recommendation_rules))
+        # Water parameters the rules read (the columns evaluate() needs)
+        self.parameters = sorted(rule_fields - set(SCENARIO_FIELDS))
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'DecisionTables':
+        """Load and compile a rules file (NIROGYA_DECISION_RULES overrides the default)"""
+        path = path or os.environ.get('NIROGYA_DECISION_RULES') or DEFAULT_RULES_PATH
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f), source=path)
+
+    # ---- single scenario -------------------------------------------------
+
+    def correlate(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Correlation analysis for one scenario (water parameters, wqi, disease)"""
+        score = 0
+        factors = []
+        for rule in self.correlation_rules:
+            if rule.matches(context):
+                score += rule.rule['points']
+                factors.append(rule.factor.format(**context))
+        strength, risk_level = _level(self.correlation_levels, score)
+        return {
+            'correlation_score': min(score, self.max_correlation_score),
+            'correlation_strength': strength,
+            'combined_risk_level': risk_level,
+            'correlation_factors': factors,
+            'disease_water_match': context.get('disease') in self.disease_parameters,
+            'critical_intervention_needed': score >= self.critical_intervention_at
+        }
+
+    def recommend(self, context: Dict[str, Any]) -> List[str]:
+        """Recommendations for one scenario (context includes correlation_score)"""
+        fired = [rule.matches(context) for rule in self.recommendation_rules]
+        return list(chain.from_iterable(compress(self.recommendation_outcomes, fired)))
+
+    def _disease_risk(self, cases):
+        for segment in self.risk_segments:
+            if 'at_most' not in segment or cases <= segment['at_most']:
+                if 'slope' not in segment:
+                    return segment['base']
+                return segment['base'] + (cases - segment['from']) * segment['slope']
+
+    def score_risk(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Disease, water, correlation and combined risk plus the alert level"""
+        multiplier = self.severity_multipliers.get(context.get('disease'), self.default_severity)
+        scores = {
+            'disease_risk': min(self._disease_risk(context[self.cases_field]) * multiplier, self.max_disease_risk),
+            'water_risk': context['wqi'],
+            'correlation_risk': context['correlation_score']
+        }
+        combined = 0.0
+        for name, weight in self.combined_weights.items():
+            combined = combined + scores[name] * weight
+        scores['combined_risk'] = combined
+        return {'risk_scores': scores, 'alert_level': _level(self.alert_levels, combined)}
+
+    def decide(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """All decisions for one scenario: water parameters plus wqi, cases and disease"""
+        correlation = self.correlate(context)
+        context = {**context, 'correlation_score': correlation['correlation_score']}
+        return {
+            'disease': context.get('disease'),
+            'correlation_analysis': correlation,
+            'recommendations': self.recommend(context),
+            **self.score_risk(context)
+        }
+
+    # ---- columns of scenarios --------------------------------------------
+
+    def evaluate(self, columns: Dict[str, Sequence]) -> 'DecisionBatch':
+        """
+        Evaluate every rule on columns of scenarios.
+
+        Args:
+            columns: wqi, cases, disease and water parameter columns of equal
+                length (missing water parameters count as not measured)
+
+        Returns:
+            DecisionBatch: rule masks and scores; row(i) gives decide()'s dict
+        """
+        wqi = np.asarray(columns['wqi'], dtype=float)
+        n = len(wqi)
+        context = {
+            'wqi': wqi,
+            self.cases_field: np.asarray(columns[self.cases_field], dtype=float),
+            'disease': np.asarray(columns['disease'], dtype=object).astype(str)
+        }
+        for parameter in self.parameters:
+            context[parameter] = np.asarray(columns[parameter], dtype=float) if parameter in columns \
+                else np.full(n, np.nan)
+
+        correlation_fired = np.array([rule.mask(context, n) for rule in self.correlation_rules],
+                                     dtype=bool).reshape(len(self.correlation_rules), n)
+        raw_score = self.correlation_points @ correlation_fired
+        context['correlation_score'] = np.minimum(raw_score, self.max_correlation_score)
+
+        recommendation_fired = np.array([rule.mask(context, n) for rule in self.recommendation_rules],
+                                        dtype=bool).reshape(len(self.recommendation_rules), n)
+
+        cases = context[self.cases_field]
+        segments = self.risk_segments
+        disease_risk = np.select(
+            [cases <= segment['at_most'] for segment in segments[:-1]],
+            [segment['base'] + (cases - segment['from']) * segment['slope'] if 'slope' in segment
+             else np.full(n, float(segment['base'])) for segment in segments[:-1]],
+            segments[-1]['base'])
+        severity = np.array([self.severity_multipliers.get(disease, self.default_severity)
+                             for disease in context['disease']], dtype=float)
+        disease_risk = np.minimum(disease_risk * severity, self.max_disease_risk)
+
+        scores = {'disease_risk': disease_risk, 'water_risk': wqi, 'correlation_risk': context['correlation_score']}
+        combined = np.zeros(n)
+        for name, weight in self.combined_weights.items():
+            combined = combined + scores[name] * weight
+
+        return DecisionBatch(self, context, correlation_fired, raw_score, recommendation_fired,
+                             disease_risk, combined)
+
+
+class DecisionBatch:
+    """Results of DecisionTables.evaluate() for n scenarios"""
+
+    def __init__(self, tables: DecisionTables, context: Dict[str, np.ndarray], correlation_fired: np.ndarray,
+                 raw_score: np.ndarray, recommendation_fired: np.ndarray, disease_risk: np.ndarray,
+                 combined_risk: np.ndarray):
+        self.tables = tables
+        self.context = context
+        self.correlation_fired = correlation_fired
+        self.correlation_score = context['correlation_score']
+        self.correlation_codes = _level_codes(tables.correlation_levels, raw_score)
+        self.critical_intervention = raw_score >= tables.critical_intervention_at
+        self.recommendation_fired = recommendation_fired
+        self.disease_risk = disease_risk
+        self.combined_risk = combined_risk
+        self.alert_codes = _level_codes(tables.alert_levels, combined_risk)
+        self._rows = None
+
+    def __len__(self) -> int:
+        return len(self.combined_risk)
+
+    @property
+    def alert_levels(self) -> np.ndarray:
+        labels = np.array([label for _, label in self.tables.alert_levels], dtype=object)
+        return labels[self.alert_codes]
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """The decide() dict of one scenario"""
+        if self._rows is None:
+            # Plain Python values, converted once per batch
+            self._rows = (
+                [dict(zip(self.context, values)) for values in zip(*(column.tolist()
+                                                                       for column in self.context.values()))],
+                self.correlation_fired.T.tolist(),
+                self.recommendation_fired.T.tolist(),
+                self.correlation_codes.tolist(),
+                self.critical_intervention.tolist(),
+                self.disease_risk.tolist(),
+                self.combined_risk.tolist(),
+                self.alert_codes.tolist()
+            )
+        contexts, correlation_fired, recommendation_fired, correlation_codes, critical, \
+            disease_risk, combined_risk, alert_codes = self._rows
+        tables = self.tables
+        row_context = contexts[index]
+        strength, risk_level = tables.correlation_levels[correlation_codes[index]][1]
+        correlation = {
+            'correlation_score': row_context['correlation_score'],
+            'correlation_strength': strength,
+            'combined_risk_level': risk_level,
+            'correlation_factors': [rule.factor.format(**row_context)
+                                    for rule in compress(tables.correlation_rules, correlation_fired[index])],
+            'disease_water_match': row_context['disease'] in tables.disease_parameters,
+            'critical_intervention_needed': critical[index]
+        }
+        recommendations = list(chain.from_iterable(compress(tables.recommendation_outcomes,
+                                                            recommendation_fired[index])))
+        return {
+            'disease': row_context['disease'],
+            'correlation_analysis': correlation,
+            'recommendations': recommendations,
+            'risk_scores': {
+                'disease_risk': disease_risk[index],
+                'water_risk': row_context['wqi'],
+                'correlation_risk': row_context['correlation_score'],
+                'combined_risk': combined_risk[index]
+            },
+            'alert_level': tables.alert_levels[alert_codes[index]][1]
+        }
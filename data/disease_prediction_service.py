@@ -9,7 +9,11 @@ batch prediction capabilities, plus disease type prediction and health recommend
 
 Features:
 - Case count prediction using trained ML model (91.6% accuracy)
-- Disease type prediction (Cholera, Typhoid, Diarrheal Disease, etc.)
+- Lean single-row path: dict input goes straight to a NumPy row, no pandas
+- Prediction cache keyed by feature vector and model version; batches only
+  run the model on uncached rows
+- Versions come from the model registry and can be swapped without a restart
+- Disease type prediction (Cholera, Typhoid, Diarrheal Disease, etc.), vectorized for batches
 - Health recommendations based on predictions
 - Interactive mode for user input
 - Command-line interface
@@ -29,27 +33,72 @@ Date: September 5, 2025
 """
 
 import os
-import sys
-import joblib
-import pickle
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from model_registry import get_registry
+from disease_type_rules import OUTBREAK_DISEASE_RULES
+from prediction_cache import PredictionCache
+
+# Registry service holding the GradientBoosting outbreak model
+MODEL_SERVICE = 'disease_outbreak'
+
+
+def default_feature_value(feature):
+    """Value used for a feature missing from the input"""
+    if 'lag' in feature.lower():
+        return 0.0  # Lag features default to 0
+    elif 'season' in feature.lower() or 'month' in feature.lower():
+        return 0  # Seasonal features default to 0
+    elif feature in ['ID', 'Source_Table']:
+        return 1  # Default categorical values
+    elif 'deaths' in feature.lower():
+        return 0.0  # Deaths default to 0
+    elif 'year' in feature.lower():
+        return datetime.now().year  # Current year for year features
+    else:
+        return 0.0  # General default
+
+
+class LoadedModel:
+    """
+    One model version with everything prediction needs from it.
+
+    Swapped as a unit when another version is activated, so a prediction
+    never mixes the model of one version with the features of another.
+    """
+
+    def __init__(self, version, model, metadata, preprocessors):
+        self.version = version
+        self.model = model
+        self.metadata = metadata
+        self.preprocessors = preprocessors
+        self.feature_names = metadata['feature_names']
+        self.feature_index = {feature: i for i, feature in enumerate(self.feature_names)}
+        self.build_default_vector()
+
+    def build_default_vector(self):
+        """Precompute the all-defaults feature row (rebuilt when the year changes)"""
+        self.default_vector_year = datetime.now().year
+        self.default_vector = np.array([default_feature_value(feature) for feature in self.feature_names],
+                                       dtype=np.float64)
+
 
 class DiseasePredictor:
     """
     A class to handle disease outbreak predictions using the trained GradientBoosting model.
     """
     
-    def __init__(self, models_dir="saved_models"):
+    def __init__(self, models_dir="saved_models", version=None):
         """
         Initialize the predictor with model files.
         
         Args:
             models_dir (str): Directory containing the saved model files
+            version (str): Model version to load (default: the registry's active version)
         """
         # Handle relative paths from project root
         if not os.path.isabs(models_dir):
@@ -59,60 +108,174 @@ class DiseasePredictor:
         else:
             self.models_dir = models_dir
         
-        self.model = None
-        self.metadata = None
-        self.preprocessors = None
-        self.feature_names = None
-        self.load_model_components()
+        self.registry = get_registry(self.models_dir)
+        self.loaded = None
+        self.prediction_cache = PredictionCache.from_env()
+        self.load_model_components(version)
+
+    # The active version's components
+    model = property(lambda self: self.loaded.model if self.loaded else None)
+    metadata = property(lambda self: self.loaded.metadata if self.loaded else None)
+    preprocessors = property(lambda self: self.loaded.preprocessors if self.loaded else None)
+    feature_names = property(lambda self: self.loaded.feature_names if self.loaded else None)
+    model_version = property(lambda self: self.loaded.version if self.loaded else None)
     
-    def load_model_components(self):
-        """Load the saved model, metadata, and preprocessors"""
+    def load_model_components(self, version=None):
+        """
+        Load the saved model, metadata, and preprocessors
+
+        Args:
+            version (str): Registry version (default: the active one)
+
+        Raises:
+            Exception: If the version cannot be found or loaded
+        """
         try:
-            # Find the latest model files (assuming timestamp format)
-            model_files = [f for f in os.listdir(self.models_dir) if f.startswith('gradient_boosting_model_') and f.endswith('.pkl')]
-            if not model_files:
-                raise FileNotFoundError("No gradient boosting model files found")
-            
-            # Use the latest model (sorted by filename which includes timestamp)
-            latest_model = sorted(model_files)[-1]
-            # Extract timestamp from filename: gradient_boosting_model_YYYYMMDD_HHMMSS.pkl
-            timestamp = latest_model.replace('gradient_boosting_model_', '').replace('.pkl', '')
-            
-            # Load model
-            model_path = os.path.join(self.models_dir, f"gradient_boosting_model_{timestamp}.pkl")
-            self.model = joblib.load(model_path)
-            
-            # Load metadata
-            metadata_path = os.path.join(self.models_dir, f"model_metadata_{timestamp}.pkl")
-            with open(metadata_path, "rb") as f:
-                self.metadata = pickle.load(f)
-            
-            # Load preprocessors
-            preprocessors_path = os.path.join(self.models_dir, f"preprocessors_{timestamp}.pkl")
-            with open(preprocessors_path, "rb") as f:
-                self.preprocessors = pickle.load(f)
-            
-            self.feature_names = self.metadata['feature_names']
-            print(f"✅ Model loaded successfully!")
+            self.loaded = self._load_version(self.registry.get_version(MODEL_SERVICE, version))
+            print(f"✅ Model loaded successfully! (version {self.loaded.version})")
             print(f"📊 Model Performance: R² = {self.metadata['performance_metrics']['test_r2']:.3f}")
             print(f"📈 RMSE: {self.metadata['performance_metrics']['test_rmse']:.3f}")
             print(f"🔢 Features: {len(self.feature_names)}")
             
         except Exception as e:
             print(f"❌ Error loading model: {str(e)}")
-            sys.exit(1)
+            raise
+
+    def _load_version(self, model_version):
+        """Build a LoadedModel from a registry version"""
+        return LoadedModel(model_version.version, model_version.get('model'),
+                           model_version.get('metadata'), model_version.get('preprocessors'))
+
+    def activate_version(self, version, persist=False, background=False):
+        """
+        Switch to another model version without a restart
+
+        The new version is loaded and warmed up with a test prediction while
+        the current one keeps serving, then swapped in with one assignment.
+
+        Args:
+            version (str): Registry version to activate
+            persist (bool): Also make it the manifest's active version
+            background (bool): Warm up on a background thread and return at once
+
+        Returns:
+            dict: Activation status, or an 'error' key if it failed
+        """
+        previous = self.model_version
+        candidate = {}
+
+        def warmup(model_version):
+            loaded = self._load_version(model_version)
+            loaded.model.predict(self.prepare_feature_row(self.create_sample_input(), loaded, quiet=True))
+            candidate['loaded'] = loaded
+
+        def swap(model_version):
+            self.loaded = candidate['loaded']
+
+        if background:
+            self.registry.activate_in_background(MODEL_SERVICE, version, warmup, persist, on_done=swap)
+            return {'status': 'warming', 'previous_version': previous, 'version': version}
+
+        try:
+            model_version = self.registry.activate(MODEL_SERVICE, version, warmup, persist)
+        except Exception as e:
+            return {'error': f"Activation failed: {str(e)}", 'version': previous}
+        swap(model_version)
+        return {'status': 'activated', 'previous_version': previous, 'version': version}
+
+    def list_versions(self):
+        """Registered versions of the outbreak model"""
+        return self.registry.list_versions(MODEL_SERVICE)[MODEL_SERVICE]
+
+    def prepare_feature_row(self, input_data, loaded=None, quiet=False):
+        """
+        Turn one input dict into a (1, n_features) array in model feature order.
+
+        Lean path for single predictions: starts from the precomputed default
+        row and writes the given features by index, without building a
+        DataFrame. Keys that are not model features are ignored.
+
+        Args:
+            input_data (dict): Feature values
+            loaded (LoadedModel): Model version to prepare for (default: active)
+            quiet (bool): Do not report defaulted features
+            
+        Returns:
+            ndarray: Contiguous float64 row ready for model.predict
+        """
+        loaded = loaded or self.loaded
+        if loaded is None:
+            raise ValueError("Model not properly loaded - feature names not available")
+
+        if datetime.now().year != loaded.default_vector_year:
+            loaded.build_default_vector()
+
+        row = loaded.default_vector.copy()
+        provided = 0
+        for feature, value in input_data.items():
+            i = loaded.feature_index.get(feature)
+            if i is not None:
+                row[i] = value
+                provided += 1
+
+        missing = len(loaded.feature_names) - provided
+        if missing and not quiet:
+            print(f"⚠️  Added default values for {missing} missing features")
+
+        return row.reshape(1, -1)
+
+    def prepare_feature_matrix(self, input_data, loaded=None, quiet=False):
+        """
+        Turn a DataFrame into a (rows, n_features) array in model feature order.
+        
+        Batch counterpart of prepare_feature_row: starts from the default row
+        repeated for every input and copies the provided columns in by index,
+        instead of inserting every missing feature into a DataFrame.
+        
+        Args:
+            input_data (DataFrame): Feature columns (extra columns are ignored)
+            loaded (LoadedModel): Model version to prepare for (default: active)
+            quiet (bool): Do not report defaulted features
+            
+        Returns:
+            ndarray: Contiguous float64 matrix ready for model.predict
+        """
+        loaded = loaded or self.loaded
+        if loaded is None:
+            raise ValueError("Model not properly loaded - feature names not available")
+        if not isinstance(input_data, pd.DataFrame):
+            raise ValueError("Input data must be a pandas DataFrame")
+        
+        if datetime.now().year != loaded.default_vector_year:
+            loaded.build_default_vector()
+        
+        matrix = np.tile(loaded.default_vector, (len(input_data), 1))
+        provided = 0
+        for feature in input_data.columns:
+            i = loaded.feature_index.get(feature)
+            if i is not None:
+                matrix[:, i] = input_data[feature].to_numpy(dtype=np.float64)
+                provided += 1
+        
+        missing = len(loaded.feature_names) - provided
+        if missing and not quiet:
+            print(f"⚠️  Added default values for {missing} missing features")
+        
+        return matrix
     
-    def validate_input_data(self, input_data):
+    def validate_input_data(self, input_data, loaded=None):
         """
         Validate and prepare input data for prediction.
         
         Args:
             input_data (dict or DataFrame): Input data for prediction
+            loaded (LoadedModel): Model version to prepare for (default: active)
             
         Returns:
             DataFrame: Validated and prepared data
         """
-        if self.feature_names is None:
+        loaded = loaded or self.loaded
+        if loaded is None:
             raise ValueError("Model not properly loaded - feature names not available")
             
         # Convert to DataFrame if dict
@@ -126,28 +289,17 @@ class DiseasePredictor:
         
         # Ensure all required features are present
         missing_features = []
-        for feature in self.feature_names:
+        for feature in loaded.feature_names:
             if feature not in df.columns:
                 # Set default values for missing features
-                if 'lag' in feature.lower():
-                    df[feature] = 0.0  # Lag features default to 0
-                elif 'season' in feature.lower() or 'month' in feature.lower():
-                    df[feature] = 0  # Seasonal features default to 0
-                elif feature in ['ID', 'Source_Table']:
-                    df[feature] = 1  # Default categorical values
-                elif 'deaths' in feature.lower():
-                    df[feature] = 0.0  # Deaths default to 0
-                elif 'year' in feature.lower():
-                    df[feature] = datetime.now().year  # Current year for year features
-                else:
-                    df[feature] = 0.0  # General default
+                df[feature] = default_feature_value(feature)
                 missing_features.append(feature)
         
         if missing_features:
             print(f"⚠️  Added default values for {len(missing_features)} missing features")
         
         # Select and order features correctly
-        df = df[self.feature_names]
+        df = df[loaded.feature_names]
         
         return df
     
@@ -162,60 +314,122 @@ class DiseasePredictor:
             dict: Prediction results with confidence information
         """
         try:
-            if self.model is None or self.metadata is None:
+            # One version for the whole prediction, even if another is activated meanwhile
+            loaded = self.loaded
+            if loaded is None:
                 return {'error': 'Model not properly loaded'}
                 
-            # Validate input
-            df = self.validate_input_data(input_data)
+            # Validate input (dicts skip pandas and go straight to a NumPy row)
+            if isinstance(input_data, dict):
+                features = self.prepare_feature_row(input_data, loaded)
+            else:
+                features = self.validate_input_data(input_data, loaded)
             
-            # Make prediction
-            prediction = self.model.predict(df)[0]
+            # Make prediction (served from the cache for a repeated feature row)
+            if isinstance(features, pd.DataFrame):
+                features = features.to_numpy(dtype=np.float64)
+            prediction = self._predict_matrix(loaded, features)[0]
             
-            # Calculate confidence (simplified approach for GradientBoosting)
-            confidence = "Medium"  # Default confidence
-            try:
-                if hasattr(self.model, 'estimators_') and len(self.model.estimators_) > 0:
-                    # For GradientBoosting, use prediction value to estimate confidence
-                    # Higher predictions from rolling means typically have higher confidence
-                    if prediction > 30:
-                        confidence = "High"
-                    elif prediction < 10:
-                        confidence = "Low"
-                    else:
-                        confidence = "Medium"
-            except Exception:
-                confidence = "Medium"  # Fallback
-            
-            return {
-                'predicted_cases': round(max(0, prediction), 2),  # Ensure non-negative
-                'confidence': confidence,
-                'model_r2': round(self.metadata['performance_metrics']['test_r2'], 3),
-                'model_rmse': round(self.metadata['performance_metrics']['test_rmse'], 3)
-            }
+            return self._prediction_result(loaded, prediction)
             
         except Exception as e:
             return {'error': f"Prediction failed: {str(e)}"}
     
-    def predict_batch(self, input_data):
+    def _predict_matrix(self, loaded, X):
+        """Raw predictions for a feature matrix, running the model only on cache misses"""
+        return self.prediction_cache.predict(X, loaded.version, loaded.model.predict)
+    
+    def get_cache_stats(self):
+        """Prediction cache hit rate and size"""
+        return self.prediction_cache.get_stats()
+    
+    def _prediction_result(self, loaded, prediction):
+        """Result dict for one raw model prediction"""
+        # Calculate confidence (simplified approach for GradientBoosting)
+        confidence = "Medium"  # Default confidence
+        try:
+            # Fitted sklearn ensemble, or its pickle-free FlatTreeEnsemble export
+            n_trees = getattr(loaded.model, 'n_trees', None) or len(getattr(loaded.model, 'estimators_', []))
+            if n_trees > 0:
+                # For GradientBoosting, use prediction value to estimate confidence
+                # Higher predictions from rolling means typically have higher confidence
+                if prediction > 30:
+                    confidence = "High"
+                elif prediction < 10:
+                    confidence = "Low"
+                else:
+                    confidence = "Medium"
+        except Exception:
+            confidence = "Medium"  # Fallback
+        
+        return {
+            'predicted_cases': round(max(0, prediction), 2),  # Ensure non-negative
+            'confidence': confidence,
+            'model_r2': round(loaded.metadata['performance_metrics']['test_r2'], 3),
+            'model_rmse': round(loaded.metadata['performance_metrics']['test_rmse'], 3),
+            'model_version': loaded.version
+        }
+    
+    def predict_rows(self, inputs):
+        """
+        Predict many single-row requests with one model call.
+        
+        Used by the micro-batching scheduler: each input dict gets the same
+        result predict_single would give it, and an input that cannot be
+        prepared gets its own error without failing the others.
+        
+        Args:
+            inputs (list): Input dicts, one per request
+            
+        Returns:
+            list: Prediction result dicts in input order
+        """
+        loaded = self.loaded
+        if loaded is None:
+            return [{'error': 'Model not properly loaded'} for _ in inputs]
+        
+        results = [None] * len(inputs)
+        rows, positions = [], []
+        for i, input_data in enumerate(inputs):
+            try:
+                rows.append(self.prepare_feature_row(input_data, loaded, quiet=True)[0])
+                positions.append(i)
+            except Exception as e:
+                results[i] = {'error': f"Prediction failed: {str(e)}"}
+        
+        if rows:
+            try:
+                predictions = self._predict_matrix(loaded, np.vstack(rows))
+                for i, prediction in zip(positions, predictions):
+                    results[i] = self._prediction_result(loaded, prediction)
+            except Exception as e:
+                for i in positions:
+                    results[i] = {'error': f"Prediction failed: {str(e)}"}
+        
+        return results
+    
+    def predict_batch(self, input_data, disease_rules=OUTBREAK_DISEASE_RULES):
         """
         Make predictions for multiple samples.
         
         Args:
             input_data (DataFrame): DataFrame with multiple rows of features
+            disease_rules (DiseaseTypeRules): Rules for the disease-type columns (None to skip)
             
         Returns:
-            DataFrame: Original data with predictions added
+            DataFrame: Original data with predictions and disease types added
         """
         try:
-            if self.model is None:
+            loaded = self.loaded
+            if loaded is None:
                 print("❌ Model not properly loaded")
                 return None
                 
-            # Validate input
-            df = self.validate_input_data(input_data)
+            # Validate input straight into a NumPy matrix
+            features = self.prepare_feature_matrix(input_data, loaded)
             
-            # Make predictions
-            predictions = self.model.predict(df)
+            # Make predictions (cached rows skip the model)
+            predictions = self._predict_matrix(loaded, features)
             predictions = np.maximum(0, predictions)  # Ensure non-negative
             
             # Add predictions to original data
@@ -223,6 +437,10 @@ class DiseasePredictor:
             result_df['predicted_cases'] = predictions.round(2)
             result_df['model_confidence'] = 'Medium'  # Default for batch
             
+            # Disease type for every row in one vectorized pass
+            if disease_rules is not None:
+                result_df = disease_rules.annotate(result_df)
+            
             return result_df
             
         except Exception as e:
@@ -260,98 +478,9 @@ class DiseasePredictor:
             dict: Disease prediction with probability and characteristics
         """
         try:
-            # Extract key characteristics
-            deaths = outbreak_data.get('No_of_Deaths', 0)
-            month = outbreak_data.get('Start_of_Outbreak_Month', 7)
-            season = outbreak_data.get('Start_of_Outbreak_Season', 2)
-            state = outbreak_data.get('Northeast_State', 1)
-            prev_cases = outbreak_data.get('Cases_Lag_1', 0)
-            
-            # Calculate mortality rate
-            mortality_rate = deaths / max(prev_cases, 1) if prev_cases > 0 else deaths / 10
-            
-            # Disease probability scoring based on characteristics
-            disease_scores = {}
-            
-            # Acute Diarrheal Disease (most common)
-            disease_scores['Acute Diarrheal Disease'] = 0.3
-            if season == 2:  # Monsoon
-                disease_scores['Acute Diarrheal Disease'] += 0.2
-            if month in [6, 7, 8, 9]:  # Monsoon months
-                disease_scores['Acute Diarrheal Disease'] += 0.15
-            if deaths < 5:
-                disease_scores['Acute Diarrheal Disease'] += 0.1
-            
-            # Cholera (high mortality, monsoon)
-            disease_scores['Cholera'] = 0.1
-            if mortality_rate > 0.1:  # High mortality
-                disease_scores['Cholera'] += 0.3
-            if season == 2:  # Monsoon
-                disease_scores['Cholera'] += 0.25
-            if month in [7, 8, 9]:  # Peak monsoon
-                disease_scores['Cholera'] += 0.2
-            if deaths > 5:
-                disease_scores['Cholera'] += 0.15
-            
-            # Typhoid (moderate mortality, any season)
-            disease_scores['Typhoid'] = 0.15
-            if mortality_rate > 0.05 and mortality_rate < 0.15:
-                disease_scores['Typhoid'] += 0.2
-            if deaths >= 3 and deaths <= 8:
-                disease_scores['Typhoid'] += 0.15
-            if season in [1, 3]:  # Pre/Post monsoon
-                disease_scores['Typhoid'] += 0.1
-            
-            # Dysentery (moderate symptoms)
-            disease_scores['Dysentery'] = 0.12
-            if season == 2:  # Monsoon
-                disease_scores['Dysentery'] += 0.15
-            if deaths < 8:
-                disease_scores['Dysentery'] += 0.1
-            if month in [6, 7, 8]:
-                disease_scores['Dysentery'] += 0.1
-            
-            # Hepatitis A (lower mortality, any season)
-            disease_scores['Hepatitis A'] = 0.08
-            if mortality_rate < 0.05:
-                disease_scores['Hepatitis A'] += 0.2
-            if deaths <= 3:
-                disease_scores['Hepatitis A'] += 0.15
-            if season == 4:  # Winter
-                disease_scores['Hepatitis A'] += 0.1
-            
-            # Food Poisoning (acute, low mortality)
-            disease_scores['Food Poisoning'] = 0.1
-            if deaths <= 2:
-                disease_scores['Food Poisoning'] += 0.2
-            if mortality_rate < 0.03:
-                disease_scores['Food Poisoning'] += 0.15
-            if month in [4, 5, 10, 11]:  # Hot/humid months
-                disease_scores['Food Poisoning'] += 0.1
-            
-            # Gastroenteritis (common, low mortality)
-            disease_scores['Gastroenteritis'] = 0.15
-            if deaths <= 4:
-                disease_scores['Gastroenteritis'] += 0.15
-            if season in [1, 2]:  # Pre-monsoon, monsoon
-                disease_scores['Gastroenteritis'] += 0.1
-            
-            # Normalize scores to probabilities
-            total_score = sum(disease_scores.values())
-            disease_probabilities = {disease: (score / total_score) * 100 
-                                   for disease, score in disease_scores.items()}
-            
-            # Get top prediction
-            top_disease = max(disease_probabilities.keys(), key=lambda k: disease_probabilities[k])
-            top_probability = disease_probabilities[top_disease]
-            
-            # Determine confidence
-            if top_probability > 40:
-                confidence = "High"
-            elif top_probability > 25:
-                confidence = "Medium"
-            else:
-                confidence = "Low"
+            # Same rule table as the batch path, evaluated for one record
+            prediction = OUTBREAK_DISEASE_RULES.predict_record(outbreak_data)
+            top_disease = prediction['most_likely']
             
             # Disease characteristics
             disease_info = {
@@ -401,16 +530,32 @@ class DiseasePredictor:
             
             return {
                 'predicted_disease': top_disease,
-                'probability': round(top_probability, 1),
-                'confidence': confidence,
-                'all_probabilities': {k: round(v, 1) for k, v in disease_probabilities.items()},
+                'probability': prediction['probability'],
+                'confidence': prediction['confidence'],
+                'all_probabilities': prediction['all_probabilities'],
                 'disease_info': disease_info.get(top_disease, {}),
-                'mortality_rate': round(mortality_rate * 100, 2)
+                'mortality_rate': round(prediction['mortality_rate'] * 100, 2)
             }
             
         except Exception as e:
             return {'error': f"Disease prediction failed: {str(e)}"}
     
+    def predict_disease_types(self, batch):
+        """
+        Predict disease types for many outbreaks at once.
+        
+        Args:
+            batch: DataFrame, list of outbreak dicts or dict of columns
+            
+        Returns:
+            dict: diseases, per-row probability matrix (percent), labels,
+                  top_probability, confidence and mortality_rate arrays
+        """
+        try:
+            return OUTBREAK_DISEASE_RULES.predict(batch)
+        except Exception as e:
+            return {'error': f"Disease prediction failed: {str(e)}"}
+    
     def get_disease_recommendations(self, disease_prediction, case_prediction):
         """
         Get health recommendations based on predicted disease and case count.
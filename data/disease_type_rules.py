@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Vectorized Disease Type Rules
+=============================
+
+Rule-based disease-type scoring for outbreak records, evaluated column-wise
+over a whole batch. Each disease has a base score plus weighted conditions on
+deaths, month, season, previous cases and the derived mortality rate; every
+condition is one NumPy comparison over the batch, so scoring thousands of
+historical outbreak rows is a single call instead of a Python loop per row.
+
+Conditions work on column arrays and on plain values alike, so the batch
+path and the single-record path share one rule table. Scores are
+accumulated in rule order in both, so probabilities, labels and confidence
+levels agree exactly (ties go to the first disease in rule order).
+
+Features:
+- Accepts a DataFrame, a list of outbreak dicts or a dict of columns
+- Per-row probability matrix, argmax labels and confidence levels
+- annotate() adds disease-type columns to a DataFrame in place of a loop
+- Rule tables for the prediction service and the quick_predict CLI
+
+Usage:
+    result = OUTBREAK_DISEASE_RULES.predict(df)
+    result['probabilities']   # (rows x diseases), percentages
+    result['labels']          # most likely disease per row
+
+    labelled = OUTBREAK_DISEASE_RULES.annotate(df)
+"""
+
+import numpy as np
+import pandas as pd
+
+# Input column and the value used when a record does not provide it (or leaves it blank)
+OUTBREAK_COLUMNS = {
+    'deaths': ('No_of_Deaths', 0),
+    'month': ('Start_of_Outbreak_Month', 7),
+    'season': ('Start_of_Outbreak_Season', 2),
+    'prev_cases': ('Cases_Lag_1', 0),
+}
+
+
+def outbreak_columns(batch):
+    """
+    Extract the rule inputs from a batch as float arrays.
+
+    Args:
+        batch: DataFrame, list of outbreak dicts, a single dict, or a dict of columns
+
+    Returns:
+        dict: deaths, month, season, prev_cases and mortality_rate arrays
+    """
+    if isinstance(batch, dict):
+        values = list(batch.values())
+        if values and all(np.ndim(value) == 0 for value in values):
+            batch = [batch]  # A single outbreak record
+
+    if isinstance(batch, pd.DataFrame):
+        n_rows = len(batch)
+        get_column = lambda column, default: batch[column].to_numpy(dtype=np.float64) \
+            if column in batch.columns else np.full(n_rows, default, dtype=np.float64)
+    elif isinstance(batch, dict):
+        n_rows = len(next(iter(batch.values()), []))
+        get_column = lambda column, default: np.asarray(batch[column], dtype=np.float64) \
+            if column in batch else np.full(n_rows, default, dtype=np.float64)
+    else:
+        get_column = lambda column, default: np.array([record.get(column, default) for record in batch],
+                                                      dtype=np.float64)
+
+    # Blank cells (NaN / None) get the default too, as a missing key does, so
+    # a DataFrame, a dict of columns and the records it came from agree
+    columns = {}
+    for name, (column, default) in OUTBREAK_COLUMNS.items():
+        values = get_column(column, default)
+        columns[name] = np.where(np.isnan(values), default, values)
+
+    # Deaths per previous case, or per 10 cases when there is no history
+    deaths, prev_cases = columns['deaths'], columns['prev_cases']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        columns['mortality_rate'] = np.where(prev_cases > 0, deaths / np.maximum(prev_cases, 1), deaths / 10)
+    return columns
+
+
+def outbreak_values(outbreak_data):
+    """Scalar counterpart of outbreak_columns() for one outbreak dict"""
+    values = {}
+    for name, (column, default) in OUTBREAK_COLUMNS.items():
+        value = outbreak_data.get(column)
+        values[name] = default if value is None or value != value else value
+    deaths, prev_cases = values['deaths'], values['prev_cases']
+    values['mortality_rate'] = deaths / max(prev_cases, 1) if prev_cases > 0 else deaths / 10
+    return values
+
+
+class DiseaseTypeRules:
+    """
+    A table of disease scoring rules evaluated over column arrays.
+
+    Each rule is (disease, base_score, [(condition, weight), ...]) where a
+    condition maps the outbreak_columns() dict to a boolean array (or the
+    outbreak_values() dict to a bool).
+    """
+
+    def __init__(self, rules, sort_probabilities=False):
+        """
+        Args:
+            rules (list): (disease, base_score, conditions) per disease, in tie-break order
+            sort_probabilities (bool): Order per-record probability dicts highest first
+        """
+        self.rules = rules
+        self.diseases = [disease for disease, _, _ in rules]
+        self.sort_probabilities = sort_probabilities
+
+    def scores(self, columns):
+        """Raw (rows x diseases) score matrix for extracted columns"""
+        n_rows = len(columns['deaths'])
+        scores = np.empty((n_rows, len(self.rules)))
+        for col, (_, base, conditions) in enumerate(self.rules):
+            score = np.full(n_rows, base, dtype=np.float64)
+            for condition, weight in conditions:
+                score += np.where(condition(columns), weight, 0.0)
+            scores[:, col] = score
+        return scores
+
+    def predict(self, batch):
+        """
+        Score a batch of outbreak records.
+
+        Args:
+            batch: DataFrame, list of outbreak dicts or a dict of columns
+
+        Returns:
+            dict: diseases, probabilities (rows x diseases, percent), labels,
+                  top_probability, confidence and mortality_rate arrays
+        """
+        columns = outbreak_columns(batch)
+        scores = self.scores(columns)
+
+        # Sum disease by disease so totals match the scalar sum() exactly
+        total = np.zeros(len(scores))
+        for col in range(scores.shape[1]):
+            total += scores[:, col]
+        probabilities = scores / total[:, None] * 100
+
+        top = probabilities.argmax(axis=1)
+        top_probability = probabilities[np.arange(len(top)), top]
+        confidence = np.select([top_probability > 40, top_probability > 25], ['High', 'Medium'], 'Low')
+
+        return {
+            'diseases': list(self.diseases),
+            'probabilities': probabilities,
+            'labels': np.array(self.diseases, dtype=object)[top],
+            'top_probability': top_probability,
+            'confidence': confidence,
+            'mortality_rate': columns['mortality_rate']
+        }
+
+    def predict_record(self, outbreak_data):
+        """
+        Score one outbreak dict.
+
+        Evaluates the same rules on plain Python values, which is much
+        cheaper than a one-row NumPy batch for single predictions.
+        """
+        values = outbreak_values(outbreak_data)
+        scores = []
+        for _, base, conditions in self.rules:
+            score = base
+            for condition, weight in conditions:
+                if condition(values):
+                    score += weight
+            scores.append(score)
+
+        total = sum(scores)
+        probabilities = [(disease, (score / total) * 100) for disease, score in zip(self.diseases, scores)]
+        top_disease, top_probability = max(probabilities, key=lambda item: item[1])
+        if self.sort_probabilities:
+            probabilities.sort(key=lambda item: item[1], reverse=True)
+
+        return {
+            'most_likely': top_disease,
+            'probability': round(top_probability, 1),
+            'confidence': 'High' if top_probability > 40 else 'Medium' if top_probability > 25 else 'Low',
+            'all_probabilities': {disease: round(prob, 1) for disease, prob in probabilities},
+            'mortality_rate': values['mortality_rate']
+        }
+
+    def annotate(self, df, include_probabilities=False):
+        """
+        Copy of a DataFrame with disease-type columns added.
+
+        Adds predicted_disease, disease_probability and disease_confidence,
+        plus one prob_<disease> column per disease when requested.
+        """
+        result = self.predict(df)
+        labelled = df.copy()
+        labelled['predicted_disease'] = result['labels']
+        labelled['disease_probability'] = result['top_probability'].round(1)
+        labelled['disease_confidence'] = result['confidence']
+        if include_probabilities:
+            for col, disease in enumerate(self.diseases):
+                labelled[f"prob_{disease.lower().replace(' ', '_')}"] = result['probabilities'][:, col].round(1)
+        return labelled
+
+
+def _is_in(values, options):
+    """Membership test for a column array or a single value"""
+    if isinstance(values, np.ndarray):
+        return np.isin(values, options)
+    return values in options
+
+
+def _month_in(*months):
+    return lambda c: _is_in(c['month'], months)
+
+
+def _season_in(*seasons):
+    return lambda c: _is_in(c['season'], seasons)
+
+
+# DiseasePredictor.predict_disease_type (prediction service and API)
+OUTBREAK_DISEASE_RULES = DiseaseTypeRules([
+    # Acute Diarrheal Disease (most common)
+    ('Acute Diarrheal Disease', 0.3, [
+        (_season_in(2), 0.2),                        # Monsoon
+        (_month_in(6, 7, 8, 9), 0.15),               # Monsoon months
+        (lambda c: c['deaths'] < 5, 0.1),
+    ]),
+    # Cholera (high mortality, monsoon)
+    ('Cholera', 0.1, [
+        (lambda c: c['mortality_rate'] > 0.1, 0.3),  # High mortality
+        (_season_in(2), 0.25),                       # Monsoon
+        (_month_in(7, 8, 9), 0.2),                   # Peak monsoon
+        (lambda c: c['deaths'] > 5, 0.15),
+    ]),
+    # Typhoid (moderate mortality, any season)
+    ('Typhoid', 0.15, [
+        (lambda c: (c['mortality_rate'] > 0.05) & (c['mortality_rate'] < 0.15), 0.2),
+        (lambda c: (c['deaths'] >= 3) & (c['deaths'] <= 8), 0.15),
+        (_season_in(1, 3), 0.1),                     # Pre/Post monsoon
+    ]),
+    # Dysentery (moderate symptoms)
+    ('Dysentery', 0.12, [
+        (_season_in(2), 0.15),                       # Monsoon
+        (lambda c: c['deaths'] < 8, 0.1),
+        (_month_in(6, 7, 8), 0.1),
+    ]),
+    # Hepatitis A (lower mortality, any season)
+    ('Hepatitis A', 0.08, [
+        (lambda c: c['mortality_rate'] < 0.05, 0.2),
+        (lambda c: c['deaths'] <= 3, 0.15),
+        (_season_in(4), 0.1),                        # Winter
+    ]),
+    # Food Poisoning (acute, low mortality)
+    ('Food Poisoning', 0.1, [
+        (lambda c: c['deaths'] <= 2, 0.2),
+        (lambda c: c['mortality_rate'] < 0.03, 0.15),
+        (_month_in(4, 5, 10, 11), 0.1),              # Hot/humid months
+    ]),
+    # Gastroenteritis (common, low mortality)
+    ('Gastroenteritis', 0.15, [
+        (lambda c: c['deaths'] <= 4, 0.15),
+        (_season_in(1, 2), 0.1),                     # Pre-monsoon, monsoon
+    ]),
+])
+
+# quick_predict.py command-line tool
+QUICK_DISEASE_RULES = DiseaseTypeRules([
+    # Food Poisoning - Usually acute, shorter duration, higher mortality
+    ('Food Poisoning', 30, [
+        (lambda c: c['deaths'] > 5, 20),
+        (lambda c: c['mortality_rate'] > 0.15, 25),  # High mortality rate
+        (_month_in(4, 5, 6, 7, 8), 15),              # Summer months
+    ]),
+    # Acute Diarrheal Disease - Most common, all seasons
+    ('Acute Diarrheal Disease', 40, [
+        (_season_in(2), 20),                         # Monsoon season
+        (lambda c: c['deaths'] <= 3, 15),            # Usually lower mortality
+        (lambda c: c['prev_cases'] > 20, 10),        # Can affect many people
+    ]),
+    # Typhoid - More severe, longer duration
+    ('Typhoid', 10, [
+        (lambda c: c['deaths'] >= 3, 20),
+        (lambda c: c['mortality_rate'] > 0.1, 15),
+        (_season_in(1, 2), 15),                      # Pre-monsoon and monsoon
+        (_month_in(4, 5, 6, 7, 8, 9), 10),
+    ]),
+    # Hepatitis A - Specific patterns
+    ('Hepatitis A', 5, [
+        (lambda c: c['deaths'] >= 2, 15),
+        (_season_in(2), 20),                         # Monsoon
+        (_month_in(6, 7, 8, 9), 15),
+    ]),
+    # Cholera - Epidemic potential, water-related
+    ('Cholera', 5, [
+        (lambda c: c['prev_cases'] > 30, 25),        # Epidemic potential
+        (_season_in(2), 20),                         # Monsoon
+        (lambda c: c['deaths'] >= 5, 15),
+        (lambda c: c['mortality_rate'] > 0.12, 10),
+    ]),
+    # Dysentery - Bacterial infection
+    ('Dysentery', 8, [
+        (lambda c: c['deaths'] >= 2, 15),
+        (_season_in(2, 3), 15),                      # Monsoon and post-monsoon
+        (lambda c: c['mortality_rate'] > 0.08, 10),
+    ]),
+], sort_probabilities=True)
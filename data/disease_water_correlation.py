@@ -8,7 +8,7 @@ to provide actionable health and environmental insights.
 Features:
 - Disease outbreak prediction using ML models
 - Water quality assessment using standardized WQI calculation
-- Correlation analysis between water quality and disease risk
+- Correlation analysis between water quality and disease risk (rules in decision_rules.json)
 - Integrated recommendations for health authorities
 - Risk mapping and alert system
 - Prevention strategies based on combined analysis
@@ -37,6 +37,10 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Import our existing services
 from disease_prediction_service import DiseasePredictor
+from wqi_engine import calculate_wqi, wqi_category
+from tracing import configure_tracing, trace_event, trace_span
+from outbreak_forecast import forecast_outbreak, forecast_records, future_recommendations, seasonal_disease
+from decision_rules import DecisionTables
 
 
 class IntegratedHealthAnalyzer:
@@ -60,36 +64,34 @@ class IntegratedHealthAnalyzer:
             'temperature': {'min': 15.0, 'max': 30.0}
         }
         
-        # Disease-Water Quality correlation patterns
+        # Correlation scoring, recommendation and risk rules (decision_rules.json)
+        self.decision_tables = DecisionTables.load()
+        
+        # Disease-Water Quality correlation patterns (critical parameters per
+        # disease are part of the decision rules)
         self.disease_water_correlations = {
             'Cholera': {
                 'high_risk_factors': ['high_fecal_coliform', 'high_total_coliform', 'low_ph'],
-                'critical_parameters': ['fecal_coliform', 'total_coliform'],
                 'seasonal_pattern': 'monsoon_peak'
             },
             'Typhoid': {
                 'high_risk_factors': ['high_fecal_coliform', 'high_nitrate', 'poor_sanitation'],
-                'critical_parameters': ['fecal_coliform', 'nitrate_n'],
                 'seasonal_pattern': 'pre_post_monsoon'
             },
             'Acute Diarrheal Disease': {
                 'high_risk_factors': ['bacterial_contamination', 'poor_water_quality'],
-                'critical_parameters': ['fecal_coliform', 'total_coliform', 'bod'],
                 'seasonal_pattern': 'year_round'
             },
             'Hepatitis A': {
                 'high_risk_factors': ['fecal_contamination', 'poor_sanitation'],
-                'critical_parameters': ['fecal_coliform', 'total_coliform'],
                 'seasonal_pattern': 'monsoon_peak'
             },
             'Dysentery': {
                 'high_risk_factors': ['bacterial_contamination', 'high_organic_load'],
-                'critical_parameters': ['fecal_coliform', 'bod'],
                 'seasonal_pattern': 'warm_months'
             },
             'Food Poisoning': {
                 'high_risk_factors': ['poor_hygiene', 'contaminated_water'],
-                'critical_parameters': ['fecal_coliform', 'temperature'],
                 'seasonal_pattern': 'summer_peak'
             }
         }
@@ -104,88 +106,17 @@ class IntegratedHealthAnalyzer:
             print("   Disease predictions will use rule-based approach")
     
     def calculate_wqi(self, water_params: Dict[str, float]) -> float:
-        """Calculate Water Quality Index using standardized formula"""
-        weights = {
-            'ph': 0.15,
-            'dissolved_oxygen': 0.20,
-            'bod': 0.15,
-            'nitrate_n': 0.15,
-            'fecal_coliform': 0.20,
-            'total_coliform': 0.15
-        }
-        
-        wqi = 0
-        
-        # pH scoring (optimal range: 6.5-8.5)
-        ph_val = water_params.get('ph', 7.0)
-        if 6.5 <= ph_val <= 8.5:
-            ph_score = 0
-        else:
-            ph_score = min(abs(ph_val - 7.0) * 15, 100)
-        wqi += weights['ph'] * ph_score
-        
-        # Dissolved Oxygen scoring (higher is better, >5 mg/L is good)
-        do_val = water_params.get('dissolved_oxygen', 5.0)
-        if do_val >= 5:
-            do_score = 0
-        else:
-            do_score = (5 - do_val) * 20
-        wqi += weights['dissolved_oxygen'] * min(do_score, 100)
-        
-        # BOD scoring (lower is better, <3 mg/L is good)
-        bod_val = water_params.get('bod', 3.0)
-        if bod_val <= 3:
-            bod_score = 0
-        else:
-            bod_score = (bod_val - 3) * 10
-        wqi += weights['bod'] * min(bod_score, 100)
-        
-        # Nitrate scoring (lower is better, <10 mg/L is good)
-        nitrate_val = water_params.get('nitrate_n', 5.0)
-        if nitrate_val <= 10:
-            nitrate_score = nitrate_val * 2
-        else:
-            nitrate_score = 20 + (nitrate_val - 10) * 8
-        wqi += weights['nitrate_n'] * min(nitrate_score, 100)
-        
-        # Fecal Coliform scoring (lower is better, <50 CFU/100mL is good)
-        fc_val = water_params.get('fecal_coliform', 20.0)
-        if fc_val <= 50:
-            fc_score = fc_val * 0.5
-        else:
-            fc_score = 25 + (fc_val - 50) * 0.1
-        wqi += weights['fecal_coliform'] * min(fc_score, 100)
-        
-        # Total Coliform scoring (lower is better, <500 CFU/100mL is good)
-        tc_val = water_params.get('total_coliform', 100.0)
-        if tc_val <= 500:
-            tc_score = tc_val * 0.05
-        else:
-            tc_score = 25 + (tc_val - 500) * 0.01
-        wqi += weights['total_coliform'] * min(tc_score, 100)
-        
-        return wqi
+        """Calculate Water Quality Index using standardized formula (defaults for missing parameters)"""
+        return calculate_wqi(water_params, use_defaults=True)
     
-    def assess_water_quality_risk(self, water_params: Dict[str, float]) -> Dict[str, Any]:
-        """Assess water quality and categorize risk factors"""
-        wqi = self.calculate_wqi(water_params)
+    def assess_water_quality_risk(self, water_params: Dict[str, float],
+                                  wqi: Optional[float] = None) -> Dict[str, Any]:
+        """Assess water quality and categorize risk factors (wqi: precomputed WQI, if known)"""
+        if wqi is None:
+            wqi = self.calculate_wqi(water_params)
         
         # Categorize overall water quality
-        if wqi <= 25:
-            quality_category = "Excellent"
-            quality_risk = "Low"
-        elif wqi <= 50:
-            quality_category = "Good"
-            quality_risk = "Low"
-        elif wqi <= 75:
-            quality_category = "Moderate"
-            quality_risk = "Medium"
-        elif wqi <= 100:
-            quality_category = "Poor"
-            quality_risk = "High"
-        else:
-            quality_category = "Very Poor"
-            quality_risk = "Very High"
+        quality_category, quality_risk = wqi_category(wqi)
         
         # Identify specific risk factors
         risk_factors = []
@@ -231,7 +162,8 @@ class IntegratedHealthAnalyzer:
     
     def predict_future_outbreak_trend(self, outbreak_data: Dict[str, Any], 
                                      water_params: Dict[str, float], 
-                                     months_ahead: int = 3) -> Dict[str, Any]:
+                                     months_ahead: int = 3,
+                                     wqi: Optional[float] = None) -> Dict[str, Any]:
         """
         Predict future outbreak trends based on current conditions and seasonal patterns
         
@@ -239,6 +171,7 @@ class IntegratedHealthAnalyzer:
             outbreak_data: Current outbreak information
             water_params: Current water quality parameters
             months_ahead: Number of months to predict ahead (default: 3)
+            wqi: Precomputed WQI of water_params (calculated when omitted)
             
         Returns:
             Dict with future predictions for each month
@@ -247,114 +180,16 @@ class IntegratedHealthAnalyzer:
         current_cases = outbreak_data.get('No_of_Cases', 0)
         current_state = outbreak_data.get('Northeast_State', 1)
         
-        future_predictions = {}
-        
-        # Seasonal risk factors (Northeast India patterns)
-        seasonal_multipliers = {
-            1: 0.6,   # January - Winter, lower risk
-            2: 0.6,   # February - Winter, lower risk  
-            3: 0.7,   # March - Pre-summer
-            4: 0.8,   # April - Summer onset
-            5: 0.9,   # May - Pre-monsoon
-            6: 1.4,   # June - Early monsoon, high risk
-            7: 1.6,   # July - Peak monsoon, highest risk
-            8: 1.5,   # August - Monsoon continues
-            9: 1.3,   # September - Late monsoon
-            10: 1.0,  # October - Post-monsoon
-            11: 0.8,  # November - Winter approach
-            12: 0.7   # December - Winter
-        }
-        
         # Water quality impact on future predictions
-        current_wqi = self.calculate_wqi(water_params)
-        
-        if current_wqi > 50:  # Poor water quality
-            water_risk_multiplier = 1.5
-        elif current_wqi > 30:  # Moderate water quality
-            water_risk_multiplier = 1.2
-        else:  # Good water quality
-            water_risk_multiplier = 0.8
-        
-        for month_offset in range(1, months_ahead + 1):
-            future_month = ((current_month + month_offset - 1) % 12) + 1
-            
-            # Base prediction using current trend
-            base_trend = current_cases * 0.85 ** month_offset  # Natural decay
-            
-            # Apply seasonal multiplier
-            seasonal_cases = base_trend * seasonal_multipliers[future_month]
-            
-            # Apply water quality impact
-            predicted_cases = seasonal_cases * water_risk_multiplier
-            
-            # Predict disease type for future month
-            future_outbreak_data = {
-                'No_of_Cases': int(predicted_cases),
-                'Northeast_State': current_state,
-                'Start_of_Outbreak_Month': future_month
-            }
-            
-            disease_prediction = self._rule_based_disease_prediction(future_outbreak_data)
-            
-            # Calculate risk level
-            if predicted_cases > 200:
-                risk_level = "Critical"
-            elif predicted_cases > 100:
-                risk_level = "High"
-            elif predicted_cases > 50:
-                risk_level = "Medium"
-            else:
-                risk_level = "Low"
-            
-            future_predictions[f"Month_{month_offset}"] = {
-                'month': future_month,
-                'predicted_cases': int(predicted_cases),
-                'seasonal_factor': seasonal_multipliers[future_month],
-                'water_impact': water_risk_multiplier,
-                'most_likely_disease': disease_prediction['most_likely_disease'],
-                'risk_level': risk_level,
-                'recommendations': self._get_future_recommendations(risk_level, future_month)
-            }
+        current_wqi = self.calculate_wqi(water_params) if wqi is None else wqi
         
-        return future_predictions
+        # Decay, seasonal and water-risk multipliers per month (outbreak_forecast.py)
+        forecast = forecast_outbreak(current_cases, current_month, current_wqi, current_state, months_ahead)
+        return forecast_records(forecast)
     
     def _get_future_recommendations(self, risk_level: str, month: int) -> List[str]:
         """Generate recommendations for future months based on risk and season"""
-        recommendations = []
-        
-        # Seasonal recommendations
-        if month in [6, 7, 8, 9]:  # Monsoon months
-            recommendations.extend([
-                "🌧️ Prepare for monsoon-related disease surge",
-                "🚰 Ensure water treatment capacity for increased demand",
-                "🏥 Stock additional medical supplies for waterborne diseases"
-            ])
-        elif month in [4, 5]:  # Pre-monsoon
-            recommendations.extend([
-                "🔧 Conduct preventive maintenance on water systems",
-                "📋 Train health workers for upcoming monsoon season",
-                "🚨 Establish early warning systems"
-            ])
-        else:  # Other months
-            recommendations.extend([
-                "📊 Conduct routine surveillance",
-                "🔍 Monitor water quality trends"
-            ])
-        
-        # Risk-based recommendations
-        if risk_level == "Critical":
-            recommendations.extend([
-                "🚨 Prepare emergency response protocols",
-                "🏥 Ensure hospital capacity expansion",
-                "📢 Launch preemptive public health campaigns"
-            ])
-        elif risk_level == "High":
-            recommendations.extend([
-                "⚠️ Increase surveillance frequency",
-                "💊 Ensure adequate medicine stockpiles"
-            ])
-        
-        return recommendations[:5]  # Limit to top 5 recommendations
+        return future_recommendations(risk_level, month)
     
     def predict_disease_from_outbreak(self, outbreak_data: Dict[str, Any]) -> Dict[str, Any]:
         """Predict disease using the ML model or enhanced rule-based approach"""
@@ -362,7 +197,8 @@ class IntegratedHealthAnalyzer:
         
         # Always use the enhanced rule-based prediction for better results
         # The ML model seems to have issues with the current data format
-        print(f"🔍 Using enhanced rule-based prediction for better accuracy")
+        trace_event("disease_method", "🔍 Using enhanced rule-based prediction for better accuracy",
+                    method="Enhanced_Rule_Based")
         return self._rule_based_disease_prediction(outbreak_data)
         
         # ML model prediction (commented out due to poor performance)
@@ -403,76 +239,15 @@ class IntegratedHealthAnalyzer:
         month = outbreak_data.get('Start_of_Outbreak_Month', 7)
         state = outbreak_data.get('Northeast_State', 1)
         
-        print(f"🔍 Rule-based prediction: {cases} cases, month {month}, state {state}")
-        
-        # Enhanced rule-based logic based on case severity and patterns
-        if month in [6, 7, 8, 9]:  # Monsoon months - higher risk
-            if cases > 200:
-                disease = "Cholera"
-                probability = 85
-                confidence = "High"
-            elif cases > 100:
-                disease = "Acute Diarrheal Disease" 
-                probability = 75
-                confidence = "Medium-High"
-            elif cases > 50:
-                disease = "Typhoid"
-                probability = 70
-                confidence = "Medium"
-            elif cases > 20:
-                disease = "Gastroenteritis"
-                probability = 65
-                confidence = "Medium"
-            else:
-                disease = "Viral Gastroenteritis"
-                probability = 60
-                confidence = "Medium"
-        elif month in [4, 5, 10, 11]:  # Pre/Post monsoon
-            if cases > 150:
-                disease = "Typhoid"
-                probability = 80
-                confidence = "High"
-            elif cases > 75:
-                disease = "Hepatitis A"
-                probability = 75
-                confidence = "Medium-High"
-            elif cases > 30:
-                disease = "Dysentery"
-                probability = 70
-                confidence = "Medium"
-            else:
-                disease = "Food Poisoning"
-                probability = 65
-                confidence = "Medium"
-        else:  # Winter months (Dec, Jan, Feb, Mar)
-            if cases > 100:
-                disease = "Viral Gastroenteritis"
-                probability = 80
-                confidence = "High"
-            elif cases > 50:
-                disease = "Food Poisoning"
-                probability = 75
-                confidence = "Medium-High"
-            elif cases > 20:
-                disease = "Acute Gastroenteritis"
-                probability = 70
-                confidence = "Medium"
-            else:
-                disease = "Minor Gastric Disorder"
-                probability = 65
-                confidence = "Medium"
-        
-        # State-specific adjustments (Northeast India patterns)
-        if state in [2, 3]:  # Assam, Manipur - higher waterborne disease risk
-            if "Gastroenteritis" in disease or "Food Poisoning" in disease:
-                disease = "Waterborne Gastroenteritis"
-                probability = min(probability + 10, 95)
-        
-        # Ensure minimum confidence for any prediction
-        if confidence == "Low":
-            confidence = "Medium"
-        
-        print(f"✅ Predicted: {disease} (confidence: {confidence}, probability: {probability}%)")
+        trace_event("rule_based_input", f"🔍 Rule-based prediction: {cases} cases, month {month}, state {state}",
+                    cases=cases, month=month, state=state)
+        
+        # Season and case-count rules with state adjustments (outbreak_forecast.py)
+        disease, probability, confidence = seasonal_disease(cases, month, state)
+        
+        trace_event("disease_predicted",
+                    f"✅ Predicted: {disease} (confidence: {confidence}, probability: {probability}%)",
+                    disease=disease, confidence=confidence, probability=probability)
         
         return {
             'predicted_cases': cases,  # Use actual reported cases
@@ -482,236 +257,99 @@ class IntegratedHealthAnalyzer:
             'method': 'Enhanced_Rule_Based'
         }
     
+    def decision_context(self, disease_prediction: Dict[str, Any], water_assessment: Dict[str, Any],
+                          water_params: Dict[str, float], **extra) -> Dict[str, Any]:
+        """Field values the decision rules are evaluated on"""
+        return {
+            **water_params,
+            'wqi': water_assessment['wqi'],
+            'cases': disease_prediction['predicted_cases'],
+            'disease': disease_prediction['most_likely_disease'],
+            **extra
+        }
+    
     def correlate_disease_water_quality(self, disease_prediction: Dict[str, Any], 
                                       water_assessment: Dict[str, Any],
                                       water_params: Dict[str, float]) -> Dict[str, Any]:
-        """Correlate disease prediction with water quality assessment"""
-        
-        disease = disease_prediction['most_likely_disease']
-        wqi = water_assessment['wqi']
-        quality_risk = water_assessment['quality_risk']
-        critical_violations = water_assessment['critical_violations']
-        
-        # Get disease-specific water quality correlations
-        disease_profile = self.disease_water_correlations.get(disease, {})
-        critical_params = disease_profile.get('critical_parameters', [])
-        
-        # Calculate correlation strength
-        correlation_score = 0
-        correlation_factors = []
-        
-        # Check if water quality supports disease risk
-        if quality_risk in ['High', 'Very High']:
-            correlation_score += 30
-            correlation_factors.append(f"Poor water quality (WQI: {wqi:.1f})")
-        
-        # Check critical parameters for this disease
-        for param in critical_params:
-            if param in water_params:
-                value = water_params[param]
-                standard = self.water_standards.get(param, {})
-                
-                if param == 'fecal_coliform' and value > 50:
-                    correlation_score += 25
-                    correlation_factors.append("High fecal contamination")
-                elif param == 'total_coliform' and value > 500:
-                    correlation_score += 20
-                    correlation_factors.append("High bacterial contamination")
-                elif param == 'nitrate_n' and value > 10:
-                    correlation_score += 15
-                    correlation_factors.append("Elevated nitrate levels")
-                elif param == 'bod' and value > 5:
-                    correlation_score += 15
-                    correlation_factors.append("High organic pollution")
-        
-        # Check for critical violations
-        for violation in critical_violations:
-            if 'fecal' in violation:
-                correlation_score += 20
-                correlation_factors.append("Critical bacterial contamination")
-            elif 'oxygen' in violation:
-                correlation_score += 15
-                correlation_factors.append("Oxygen depletion stress")
-            elif 'ph' in violation:
-                correlation_score += 10
-                correlation_factors.append("Extreme pH conditions")
-        
-        # Determine correlation strength
-        if correlation_score >= 60:
-            correlation_strength = "Very Strong"
-            risk_level = "Critical"
-        elif correlation_score >= 40:
-            correlation_strength = "Strong"
-            risk_level = "High"
-        elif correlation_score >= 20:
-            correlation_strength = "Moderate"
-            risk_level = "Medium"
-        else:
-            correlation_strength = "Weak"
-            risk_level = "Low"
-        
-        return {
-            'correlation_score': min(correlation_score, 100),
-            'correlation_strength': correlation_strength,
-            'combined_risk_level': risk_level,
-            'correlation_factors': correlation_factors,
-            'disease_water_match': disease in [d for d in self.disease_water_correlations.keys()],
-            'critical_intervention_needed': correlation_score >= 60
-        }
+        """Correlate disease prediction with water quality assessment (correlation rules)"""
+        return self.decision_tables.correlate(
+            self.decision_context(disease_prediction, water_assessment, water_params)
+        )
     
     def generate_integrated_recommendations(self, disease_prediction: Dict[str, Any],
                                           water_assessment: Dict[str, Any],
                                           correlation_analysis: Dict[str, Any],
                                           water_params: Dict[str, float]) -> List[str]:
-        """Generate comprehensive recommendations based on integrated analysis"""
-        recommendations = []
-        
-        disease = disease_prediction['most_likely_disease']
-        predicted_cases = disease_prediction['predicted_cases']
-        correlation_strength = correlation_analysis['correlation_strength']
-        risk_level = correlation_analysis['combined_risk_level']
-        
-        # Critical interventions
-        if correlation_analysis['critical_intervention_needed']:
-            recommendations.append("🚨 URGENT: Implement immediate water treatment and health interventions")
-            recommendations.append("📞 Alert district health authorities and water board immediately")
-            recommendations.append("🔒 Consider temporary water source restrictions until treatment")
-        
-        # Disease-specific recommendations
-        if disease == "Cholera":
-            recommendations.append("💧 Immediate chlorination of water sources")
-            recommendations.append("🏥 Prepare ORS and IV fluid supplies")
-            recommendations.append("🔬 Test all water sources for Vibrio cholerae")
-        elif disease == "Typhoid":
-            recommendations.append("💉 Consider mass vaccination in high-risk areas")
-            recommendations.append("🧪 Test water for Salmonella typhi contamination")
-            recommendations.append("🏥 Prepare antibiotic treatment protocols")
-        elif disease in ["Acute Diarrheal Disease", "Dysentery"]:
-            recommendations.append("🚿 Improve sanitation and hygiene facilities")
-            recommendations.append("💊 Ensure zinc and ORS availability")
-            recommendations.append("📚 Community education on handwashing")
-        
-        # Water quality specific recommendations
-        wqi = water_assessment['wqi']
-        if wqi > 75:
-            recommendations.append("⚗️ Implement comprehensive water treatment system")
-            recommendations.append("🔍 Conduct detailed water source investigation")
-        elif wqi > 50:
-            recommendations.append("🛠️ Upgrade existing water treatment facilities")
-            recommendations.append("📊 Increase water quality monitoring frequency")
-        
-        # Parameter-specific fixes
-        for factor in water_assessment['risk_factors']:
-            if 'pH' in factor:
-                recommendations.append("🔧 Install pH correction system (lime/acid dosing)")
-            elif 'oxygen' in factor:
-                recommendations.append("💨 Install aeration system to increase dissolved oxygen")
-            elif 'coliform' in factor:
-                recommendations.append("🦠 Implement UV disinfection or chlorination")
-            elif 'nitrate' in factor:
-                recommendations.append("🌱 Control agricultural runoff and fertilizer use")
-            elif 'BOD' in factor:
-                recommendations.append("🏭 Treat organic waste before discharge")
-        
-        # Prevention strategies
-        recommendations.append("📈 Establish integrated disease-water quality surveillance")
-        recommendations.append("👥 Train community health workers on water-disease connections")
-        recommendations.append("📱 Set up early warning system for water quality alerts")
-        
-        # Monitoring recommendations
-        if correlation_strength in ["Strong", "Very Strong"]:
-            recommendations.append("⏰ Daily water quality monitoring during outbreak")
-            recommendations.append("📊 Weekly disease surveillance reports")
-        else:
-            recommendations.append("📅 Weekly water quality monitoring")
-            recommendations.append("📈 Monthly disease trend analysis")
-        
-        return recommendations
+        """Generate comprehensive recommendations based on integrated analysis (recommendation rules)"""
+        return self.decision_tables.recommend(
+            self.decision_context(disease_prediction, water_assessment, water_params,
+                                   correlation_score=correlation_analysis['correlation_score'])
+        )
     
     def analyze_integrated_scenario(self, outbreak_data: Dict[str, Any], 
                                   water_params: Dict[str, float], 
-                                  include_future: bool = True) -> Dict[str, Any]:
-        """Perform complete integrated analysis including future predictions"""
+                                  include_future: bool = True,
+                                  wqi: Optional[float] = None,
+                                  decision: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Perform complete integrated analysis including future predictions
+        
+        The WQI is calculated once and shared by the assessment and the
+        forecast; batch callers pass it in from a vectorized WQI pass, and
+        may pass the scenario's row of a vectorized decision-table pass
+        (DecisionBatch.row) as decision. A decision made for a different
+        disease than the one predicted here is ignored.
+        Each call is one (sampled) trace with a span per analysis stage.
+        """
         
-        print("🔄 Performing integrated disease-water quality analysis...")
+        with trace_span("analyze_scenario", cases=outbreak_data.get('No_of_Cases', 0),
+                        month=outbreak_data.get('Start_of_Outbreak_Month', 7),
+                        include_future=include_future) as span:
+            trace_event("analysis_started", "🔄 Performing integrated disease-water quality analysis...")
+            analysis = self._run_analysis_stages(outbreak_data, water_params, include_future, wqi, decision)
+            span.set(alert_level=analysis['alert_level'],
+                     combined_risk=round(analysis['risk_scores']['combined_risk'], 2))
+            return analysis
+    
+    def _run_analysis_stages(self, outbreak_data: Dict[str, Any], water_params: Dict[str, float],
+                             include_future: bool, wqi: Optional[float],
+                             decision: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """The stages of analyze_integrated_scenario, each in its own span"""
         
         # Step 1: Disease prediction
-        disease_prediction = self.predict_disease_from_outbreak(outbreak_data)
+        with trace_span("disease_prediction"):
+            disease_prediction = self.predict_disease_from_outbreak(outbreak_data)
+        if decision is not None and decision['disease'] != disease_prediction['most_likely_disease']:
+            decision = None
         
         # Step 2: Water quality assessment
-        water_assessment = self.assess_water_quality_risk(water_params)
+        with trace_span("water_assessment", precomputed_wqi=wqi is not None):
+            water_assessment = self.assess_water_quality_risk(water_params, wqi=wqi)
         
-        # Step 3: Correlation analysis
-        correlation_analysis = self.correlate_disease_water_quality(
-            disease_prediction, water_assessment, water_params
-        )
+        # Step 3: Correlation, recommendations and risk scoring (decision rules)
+        with trace_span("decisions", precomputed=decision is not None):
+            if decision is None:
+                decision = self.decision_tables.decide(
+                    self.decision_context(disease_prediction, water_assessment, water_params)
+                )
+            correlation_analysis = decision['correlation_analysis']
         
         # Step 4: Future outbreak prediction
         future_predictions = None
         if include_future:
-            future_predictions = self.predict_future_outbreak_trend(
-                outbreak_data, water_params, months_ahead=3
-            )
-        
-        # Step 5: Generate recommendations (including future-based)
-        recommendations = self.generate_integrated_recommendations(
-            disease_prediction, water_assessment, correlation_analysis, water_params
-        )
-        
-        # Step 5: Risk scoring with improved algorithm
-        cases = disease_prediction['predicted_cases']
-        
-        # Logarithmic scaling for disease risk (handles large case numbers better)
-        if cases <= 10:
-            disease_risk_score = cases * 2  # 0-20 for small outbreaks
-        elif cases <= 50:
-            disease_risk_score = 20 + (cases - 10) * 1.5  # 20-80 for moderate outbreaks
-        elif cases <= 200:
-            disease_risk_score = 80 + (cases - 50) * 0.13  # 80-100 for large outbreaks
-        else:
-            disease_risk_score = 100  # Maximum for very large outbreaks
-        
-        # Disease severity factor based on type
-        disease_type = disease_prediction['most_likely_disease']
-        severity_multiplier = 1.0
-        if disease_type in ['Cholera', 'Typhoid']:
-            severity_multiplier = 1.3
-        elif disease_type in ['Hepatitis A', 'Dysentery']:
-            severity_multiplier = 1.2
-        elif disease_type in ['Acute Diarrheal Disease']:
-            severity_multiplier = 1.1
-        
-        disease_risk_score = min(disease_risk_score * severity_multiplier, 100)
-        
-        water_risk_score = water_assessment['wqi']
-        correlation_score = correlation_analysis['correlation_score']
-        
-        # Combined risk assessment
-        combined_risk_score = (disease_risk_score * 0.4 + water_risk_score * 0.3 + 
-                             correlation_score * 0.3)
-        
-        if combined_risk_score >= 80:
-            alert_level = "🔴 CRITICAL ALERT"
-        elif combined_risk_score >= 60:
-            alert_level = "🟠 HIGH ALERT"
-        elif combined_risk_score >= 40:
-            alert_level = "🟡 MEDIUM ALERT"
-        else:
-            alert_level = "🟢 LOW ALERT"
+            with trace_span("future_trend", months_ahead=3):
+                future_predictions = self.predict_future_outbreak_trend(
+                    outbreak_data, water_params, months_ahead=3, wqi=water_assessment['wqi']
+                )
         
         return {
             'disease_prediction': disease_prediction,
             'water_assessment': water_assessment,
             'correlation_analysis': correlation_analysis,
             'future_predictions': future_predictions,
-            'recommendations': recommendations,
-            'risk_scores': {
-                'disease_risk': disease_risk_score,
-                'water_risk': water_risk_score,
-                'correlation_risk': correlation_score,
-                'combined_risk': combined_risk_score
-            },
-            'alert_level': alert_level,
+            'recommendations': decision['recommendations'],
+            'risk_scores': decision['risk_scores'],
+            'alert_level': decision['alert_level'],
             'analysis_timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
     
@@ -922,6 +560,10 @@ def main():
     parser = create_parser()
     args = parser.parse_args()
     
+    # Status lines on the terminal unless a trace output is configured
+    if not os.environ.get("NIROGYA_TRACE_OUTPUT"):
+        configure_tracing(output='console', sample_rate=1.0)
+    
     # Initialize analyzer
     analyzer = IntegratedHealthAnalyzer()
     
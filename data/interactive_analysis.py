@@ -12,6 +12,7 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from disease_water_correlation import IntegratedHealthAnalyzer
+from tracing import configure_tracing
 
 def get_outbreak_data():
     """Get disease outbreak data from user"""
@@ -138,6 +139,10 @@ def main():
     """Main interactive loop"""
     print("🚀 STARTING INTEGRATED HEALTH ANALYSIS SYSTEM...")
     
+    # Status lines on the terminal unless a trace output is configured
+    if not os.environ.get("NIROGYA_TRACE_OUTPUT"):
+        configure_tracing(output='console', sample_rate=1.0)
+    
     # Initialize analyzer
     try:
         analyzer = IntegratedHealthAnalyzer()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Micro-Batching Inference Scheduler
+==================================
+
+Collects concurrent single-row prediction requests for a short window and
+runs them as one batched model call. Each caller blocks on its own request
+and receives its own result; a scheduler thread gathers requests until the
+window since the first one expires or the batch is full, calls the batch
+function once, and hands the results back. Clients keep the simple
+single-row API while the model sees batches under load.
+
+The window is adaptive: it is only waited when the previous batch held
+more than one request (or others are already queued). A lone client is
+dispatched immediately, and requests that arrive while a batch runs form
+the next batch, which turns the window back on as soon as load appears.
+Under load the per-call overhead of the model is paid once per batch
+instead of once per request.
+
+Configuration (environment variables, <PREFIX> is e.g. NIROGYA_PREDICT):
+    <PREFIX>_MAX_BATCH_SIZE    requests per model call         (default: 32, 1 disables batching)
+    <PREFIX>_BATCH_WINDOW_MS   wait after the first request    (default: 2.0)
+    <PREFIX>_BATCH_TIMEOUT     seconds a caller waits at most  (default: 30.0)
+
+Used by:
+- api_service.py  /predict  (Flask worker threads)
+"""
+
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+
+def load_batching_settings(prefix: str) -> Dict[str, Any]:
+    """Read the batching limits for one scheduler from the environment"""
+    max_batch_size = int(os.environ.get(f"{prefix}_MAX_BATCH_SIZE", 32))
+    window_ms = float(os.environ.get(f"{prefix}_BATCH_WINDOW_MS", 2.0))
+    timeout = float(os.environ.get(f"{prefix}_BATCH_TIMEOUT", 30.0))
+    return {
+        'max_batch_size': max(1, max_batch_size),
+        'max_wait': max(0.0, window_ms) / 1000,
+        'timeout': max(0.001, timeout)
+    }
+
+
+class _PendingRequest:
+    """One caller's request waiting for its batch"""
+
+    __slots__ = ('item', 'enqueued', 'done', 'result', 'error')
+
+    def __init__(self, item):
+        self.item = item
+        self.enqueued = time.monotonic()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Thread-based micro-batching for synchronous servers such as Flask.
+
+    ``batch_fn`` takes a list of items and returns a list of results in the
+    same order. An exception from ``batch_fn`` is re-raised in every caller
+    of that batch, so per-item failures should be returned as results.
+
+    Usage:
+        batcher = MicroBatcher(predictor.predict_rows, max_batch_size=32, max_wait=0.002)
+        result = batcher.submit(input_data)
+    """
+
+    # Upper bounds of the batch-size histogram buckets
+    SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 32,
+                 max_wait: float = 0.002, timeout: float = 30.0):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait))
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._last_batch_size = 0
+
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._batches = 0
+        self._full_batches = 0
+        self._failed_batches = 0
+        self._windowed_batches = 0
+        self._timeouts = 0
+        self._largest_batch = 0
+        self._total_queue_wait = 0.0
+        self._total_batch_time = 0.0
+        self._size_histogram = {f"<={bucket}": 0 for bucket in self.SIZE_BUCKETS}
+        self._size_histogram[f">{self.SIZE_BUCKETS[-1]}"] = 0
+
+    @classmethod
+    def from_env(cls, batch_fn: Callable[[List[Any]], List[Any]], prefix: str) -> 'MicroBatcher':
+        return cls(batch_fn, **load_batching_settings(prefix))
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_batch_size > 1
+
+    def start(self) -> 'MicroBatcher':
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the scheduler after the current batch"""
+        self._stop.set()
+
+    def submit(self, item: Any) -> Any:
+        """
+        Queue one item and block until its batch has run.
+
+        Raises the batch function's exception, or TimeoutError when no
+        result arrives within the configured timeout.
+        """
+        if not self.enabled:
+            return self._run_batch([_PendingRequest(item)])[0]
+
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+
+        pending = _PendingRequest(item)
+        self._queue.put(pending)
+        if not pending.done.wait(self.timeout):
+            with self._stats_lock:
+                self._timeouts += 1
+            raise TimeoutError(f"Prediction not scheduled within {self.timeout:.1f}s")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            # Only wait for company when the last batch had some
+            batch = [first]
+            waiting = self._last_batch_size > 1 or not self._queue.empty()
+            deadline = first.enqueued + (self.max_wait if waiting else 0.0)
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    # Past the window, still take whatever is already queued
+                    pending = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(pending)
+            self._last_batch_size = len(batch)
+            if waiting:
+                with self._stats_lock:
+                    self._windowed_batches += 1
+
+            try:
+                results = self._run_batch(batch)
+                for pending, result in zip(batch, results):
+                    pending.result = result
+            except BaseException as e:
+                for pending in batch:
+                    pending.error = e
+            finally:
+                for pending in batch:
+                    pending.done.set()
+
+    def _run_batch(self, batch: List[_PendingRequest]) -> List[Any]:
+        """Call the batch function once and record batch metrics"""
+        started = time.monotonic()
+        failed = False
+        try:
+            results = self.batch_fn([pending.item for pending in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Batch function returned {len(results)} results for {len(batch)} items")
+            return results
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            finished = time.monotonic()
+            size = len(batch)
+            with self._stats_lock:
+                self._requests += size
+                self._batches += 1
+                self._full_batches += size >= self.max_batch_size
+                self._failed_batches += failed
+                self._largest_batch = max(self._largest_batch, size)
+                self._total_queue_wait += sum(started - pending.enqueued for pending in batch)
+                self._total_batch_time += finished - started
+                bucket = next((b for b in self.SIZE_BUCKETS if size <= b), None)
+                self._size_histogram[f"<={bucket}" if bucket else f">{self.SIZE_BUCKETS[-1]}"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Batch fill and latency counters for the metrics endpoints"""
+        with self._stats_lock:
+            requests, batches = self._requests, self._batches
+            avg_batch_size = requests / batches if batches else 0.0
+            return {
+                'enabled': self.enabled,
+                'max_batch_size': self.max_batch_size,
+                'batch_window_ms': round(self.max_wait * 1000, 3),
+                'requests': requests,
+                'batches': batches,
+                'windowed_batches': self._windowed_batches,
+                'avg_batch_size': round(avg_batch_size, 2),
+                'fill_ratio': round(avg_batch_size / self.max_batch_size, 4),
+                'full_batches': self._full_batches,
+                'largest_batch': self._largest_batch,
+                'failed_batches': self._failed_batches,
+                'timeouts': self._timeouts,
+                'queue_depth': self._queue.qsize(),
+                'avg_queue_wait_ms': round(self._total_queue_wait / requests * 1000, 3) if requests else 0.0,
+                'avg_batch_time_ms': round(self._total_batch_time / batches * 1000, 3) if batches else 0.0,
+                'batch_size_histogram': dict(self._size_histogram)
+            }
@@ -0,0 +1,553 @@
+#!/usr/bin/env python3
+"""
+Pickle-Free Model Bundles
+=========================
+
+Exports every component of a model version (tree ensembles, scalers, label
+encoders, logistic regression, metadata and preprocessor dicts) into one
+NumPy .npz file with a JSON header, and loads it back without pickle and
+without scikit-learn.
+
+Pickled sklearn objects are slow to load (sklearn and its object graph are
+imported and rebuilt), can execute code when loaded from an untrusted
+source, and tie the artifact to one sklearn version. A bundle holds only
+plain arrays and JSON: it is opened with allow_pickle=False, and the
+components come back as small NumPy evaluators with the same predict /
+predict_proba / transform / inverse_transform methods the services call.
+
+Format:
+    __header__            UTF-8 JSON (uint8 array): format, service, version,
+                          source files and the encoded component tree
+    <component>/<field>   Plain numeric or fixed-width string arrays
+
+    In the header, {"__array__": name} references an array and
+    {"__estimator__": kind, ...} a model rebuilt on load:
+    tree_ensemble (tree_ensemble.FlatTreeEnsemble), standard_scaler,
+    label_encoder, logistic_regression.
+
+Features:
+- One compressed file per version; the registry prefers it over the pickles
+- Loads with allow_pickle=False and imports only NumPy
+- Export refuses objects it cannot represent instead of guessing
+- Export verifies every model against the pickled original
+- Cold-start benchmark (fresh interpreter per format)
+
+Usage:
+    python model_bundle.py export                        # active version of every service
+    python model_bundle.py export --service water_quality --version 20250905_215908
+    python model_bundle.py info saved_models/disease_outbreak_20250905_152526.npz
+    python model_bundle.py benchmark
+
+    bundle = load_bundle(path)
+    model = bundle.components['model']
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import warnings
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from model_registry import BUNDLE_TEMPLATE, DEFAULT_MODELS_DIR, ModelRegistry
+from tree_ensemble import FlatTreeEnsemble, make_benchmark_rows
+
+BUNDLE_FORMAT = 'nirogya-model-bundle'
+BUNDLE_FORMAT_VERSION = 1
+HEADER_KEY = '__header__'
+
+# Canonical FlatTreeEnsemble arrays stored in a bundle
+ENSEMBLE_ARRAYS = ['feature', 'threshold', 'children', 'missing_go_to_left', 'value',
+                   'roots', 'tree_depths', 'base_score']
+
+
+class BundleStandardScaler:
+    """NumPy StandardScaler: (X - mean_) / scale_"""
+
+    def __init__(self, mean_, scale_, var_, n_features_in_, feature_names_in_=None):
+        self.mean_ = mean_
+        self.scale_ = scale_
+        self.var_ = var_
+        self.n_features_in_ = n_features_in_
+        if feature_names_in_ is not None:
+            self.feature_names_in_ = feature_names_in_
+
+    def transform(self, X):
+        X = np.array(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[-1]} features, but StandardScaler is expecting "
+                             f"{self.n_features_in_} features as input.")
+        if self.mean_ is not None:
+            X -= self.mean_
+        if self.scale_ is not None:
+            X /= self.scale_
+        return X
+
+    def inverse_transform(self, X):
+        X = np.array(X, dtype=np.float64)
+        if self.scale_ is not None:
+            X *= self.scale_
+        if self.mean_ is not None:
+            X += self.mean_
+        return X
+
+
+class BundleLabelEncoder:
+    """NumPy LabelEncoder over a sorted classes_ array"""
+
+    def __init__(self, classes_):
+        self.classes_ = classes_
+
+    def transform(self, y):
+        y = np.asarray(y)
+        indices = np.searchsorted(self.classes_, y)
+        found = (indices < len(self.classes_)) & (self.classes_[np.minimum(indices, len(self.classes_) - 1)] == y)
+        if not np.all(found):
+            raise ValueError(f"y contains previously unseen labels: {np.unique(y[~found]).tolist()}")
+        return indices
+
+    def inverse_transform(self, y):
+        y = np.asarray(y)
+        if y.size and (y.min() < 0 or y.max() >= len(self.classes_)):
+            raise ValueError(f"y contains previously unseen labels: {np.setdiff1d(y, np.arange(len(self.classes_))).tolist()}")
+        return self.classes_[y]
+
+
+class BundleLogisticRegression:
+    """NumPy LogisticRegression inference (decision function, sigmoid or softmax)"""
+
+    def __init__(self, coef_, intercept_, classes_, ovr, n_features_in_):
+        self.coef_ = coef_
+        self.intercept_ = intercept_
+        self.classes_ = classes_
+        self.ovr = ovr
+        self.n_features_in_ = n_features_in_
+
+    def decision_function(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        scores = X @ self.coef_.T + self.intercept_
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def predict_proba(self, X):
+        scores = self.decision_function(X)
+        if scores.ndim == 1:
+            positive = 1.0 / (1.0 + np.exp(-scores))
+            return np.vstack([1 - positive, positive]).T
+        if self.ovr:
+            probabilities = 1.0 / (1.0 + np.exp(-scores))
+            return probabilities / probabilities.sum(axis=1, keepdims=True)
+        scores = scores - scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        return scores / scores.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        scores = self.decision_function(X)
+        if scores.ndim == 1:
+            return self.classes_[(scores > 0).astype(int)]
+        return self.classes_[scores.argmax(axis=1)]
+
+
+class ModelBundle:
+    """A loaded bundle: header information plus the decoded components"""
+
+    def __init__(self, path: str, header: Dict, components: Dict[str, Any]):
+        self.path = path
+        self.header = header
+        self.components = components
+        self.service = header.get('service')
+        self.version = header.get('version')
+
+    def get_info(self) -> Dict:
+        return {
+            'path': self.path,
+            'service': self.service,
+            'version': self.version,
+            'created_at': self.header.get('created_at'),
+            'source_files': self.header.get('source_files', {}),
+            'components': {name: type(component).__name__ for name, component in self.components.items()},
+            'size_bytes': os.path.getsize(self.path) if os.path.exists(self.path) else None
+        }
+
+
+# ----------------------------------------------------------------------
+# Encoding (export side; sklearn objects are only inspected, never imported)
+# ----------------------------------------------------------------------
+
+def _store_array(array: np.ndarray, name: str, arrays: Dict[str, np.ndarray]) -> Dict:
+    """Add an array to the bundle and return its header reference"""
+    array = np.asarray(array)
+    reference = {'__array__': name}
+    if array.dtype == object:
+        if not all(isinstance(item, str) for item in array.ravel()):
+            raise TypeError(f"{name}: object arrays are only supported for strings")
+        array = array.astype(str)
+        reference['object'] = True  # sklearn keeps labels in object arrays
+    elif array.dtype.kind not in 'biufU':
+        raise TypeError(f"{name}: unsupported array dtype {array.dtype}")
+    arrays[name] = np.ascontiguousarray(array)
+    return reference
+
+
+def _encode_tree_ensemble(model, name: str, arrays: Dict[str, np.ndarray]) -> Dict:
+    ensemble = FlatTreeEnsemble.from_sklearn(model)
+    fields = {
+        'kind': ensemble.kind,
+        'n_features': ensemble.n_features,
+        'scale': ensemble.scale,
+        'feature_importances': _store_array(ensemble.feature_importances_, f"{name}/feature_importances", arrays)
+    }
+    for field in ENSEMBLE_ARRAYS:
+        array = getattr(ensemble, field)
+        if array.dtype == np.int64:
+            array = array.astype(np.int32)  # Node ids and depths fit; widened again on load
+        fields[field] = _store_array(array, f"{name}/{field}", arrays)
+    if ensemble.classes is not None:
+        fields['classes'] = _store_array(ensemble.classes, f"{name}/classes", arrays)
+    return fields
+
+
+def _encode_standard_scaler(scaler, name: str, arrays: Dict[str, np.ndarray]) -> Dict:
+    fields = {'n_features_in_': int(scaler.n_features_in_)}
+    for field in ['mean_', 'scale_', 'var_']:
+        value = getattr(scaler, field, None)
+        fields[field] = None if value is None else _store_array(value, f"{name}/{field}", arrays)
+    if hasattr(scaler, 'feature_names_in_'):
+        fields['feature_names_in_'] = _store_array(scaler.feature_names_in_, f"{name}/feature_names_in_", arrays)
+    return fields
+
+
+def _encode_label_encoder(encoder, name: str, arrays: Dict[str, np.ndarray]) -> Dict:
+    return {'classes_': _store_array(encoder.classes_, f"{name}/classes_", arrays)}
+
+
+def _encode_logistic_regression(model, name: str, arrays: Dict[str, np.ndarray]) -> Dict:
+    # Same one-vs-rest rule as LogisticRegression.predict_proba
+    multi_class = getattr(model, 'multi_class', 'auto')
+    ovr = multi_class in ('ovr', 'warn') or (
+        multi_class in ('auto', 'deprecated') and (len(model.classes_) <= 2 or model.solver == 'liblinear'))
+    return {
+        'coef_': _store_array(model.coef_, f"{name}/coef_", arrays),
+        'intercept_': _store_array(model.intercept_, f"{name}/intercept_", arrays),
+        'classes_': _store_array(model.classes_, f"{name}/classes_", arrays),
+        'ovr': bool(ovr),
+        'n_features_in_': int(model.n_features_in_)
+    }
+
+
+ESTIMATOR_ENCODERS = {
+    'GradientBoostingRegressor': ('tree_ensemble', _encode_tree_ensemble),
+    'RandomForestRegressor': ('tree_ensemble', _encode_tree_ensemble),
+    'RandomForestClassifier': ('tree_ensemble', _encode_tree_ensemble),
+    'StandardScaler': ('standard_scaler', _encode_standard_scaler),
+    'LabelEncoder': ('label_encoder', _encode_label_encoder),
+    'LogisticRegression': ('logistic_regression', _encode_logistic_regression)
+}
+
+
+def encode_component(obj, name: str, arrays: Dict[str, np.ndarray]):
+    """
+    JSON-compatible description of obj; arrays are added to ``arrays``
+
+    Raises:
+        TypeError: For objects a bundle cannot represent
+    """
+    if obj is None or isinstance(obj, (str, bool, int, float)):
+        return obj
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return _store_array(obj, name, arrays)
+    if isinstance(obj, dict):
+        if not all(isinstance(key, str) for key in obj):
+            raise TypeError(f"{name}: only string dict keys are supported")
+        if '__array__' in obj or '__estimator__' in obj:
+            raise TypeError(f"{name}: reserved key in dict")
+        return {key: encode_component(value, f"{name}/{key}", arrays) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [encode_component(value, f"{name}/{i}", arrays) for i, value in enumerate(obj)]
+
+    model_type = type(obj).__name__
+    if model_type not in ESTIMATOR_ENCODERS:
+        raise TypeError(f"{name}: {model_type} cannot be stored in a model bundle")
+    kind, encoder = ESTIMATOR_ENCODERS[model_type]
+    if model_type == 'StandardScaler' and not hasattr(obj, 'n_features_in_'):
+        raise TypeError(f"{name}: StandardScaler is not fitted")
+    return {'__estimator__': kind, 'source_type': model_type, **encoder(obj, name, arrays)}
+
+
+def write_bundle(path: str, service: str, version: str, components: Dict[str, Any],
+                 source_files: Optional[Dict[str, str]] = None, compress: bool = True) -> Dict:
+    """
+    Encode components and write them atomically as one .npz bundle
+
+    Returns:
+        dict: The bundle header
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    header = {
+        'format': BUNDLE_FORMAT,
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'service': service,
+        'version': version,
+        'created_at': datetime.now().isoformat(),
+        'source_files': source_files or {},
+        'components': {name: encode_component(component, name, arrays) for name, component in components.items()}
+    }
+    arrays[HEADER_KEY] = np.frombuffer(json.dumps(header).encode('utf-8'), dtype=np.uint8)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        (np.savez_compressed if compress else np.savez)(f, **arrays)
+    os.replace(tmp_path, path)
+    return header
+
+
+# ----------------------------------------------------------------------
+# Decoding (inference side; NumPy only)
+# ----------------------------------------------------------------------
+
+def _load_array(reference: Dict, arrays) -> np.ndarray:
+    array = arrays[reference['__array__']]
+    return array.astype(object) if reference.get('object') else array
+
+
+def _decode_estimator(node: Dict, arrays):
+    kind = node['__estimator__']
+    field = lambda name: None if node.get(name) is None else _load_array(node[name], arrays)
+
+    if kind == 'tree_ensemble':
+        ensemble_arrays = {name: field(name) for name in ENSEMBLE_ARRAYS}
+        for name in ['feature', 'children', 'roots', 'tree_depths']:
+            ensemble_arrays[name] = ensemble_arrays[name].astype(np.int64)
+        return FlatTreeEnsemble(node['kind'], node['n_features'], scale=node['scale'],
+                                classes=field('classes'), feature_importances=field('feature_importances'),
+                                **ensemble_arrays)
+    if kind == 'standard_scaler':
+        return BundleStandardScaler(field('mean_'), field('scale_'), field('var_'), node['n_features_in_'],
+                                    field('feature_names_in_'))
+    if kind == 'label_encoder':
+        return BundleLabelEncoder(field('classes_'))
+    if kind == 'logistic_regression':
+        return BundleLogisticRegression(field('coef_'), field('intercept_'), field('classes_'), node['ovr'],
+                                        node['n_features_in_'])
+    raise ValueError(f"Unknown estimator kind in bundle: {kind}")
+
+
+def decode_component(node, arrays):
+    """Rebuild a component from its header description"""
+    if isinstance(node, list):
+        return [decode_component(value, arrays) for value in node]
+    if isinstance(node, dict):
+        if '__array__' in node:
+            return _load_array(node, arrays)
+        if '__estimator__' in node:
+            return _decode_estimator(node, arrays)
+        return {key: decode_component(value, arrays) for key, value in node.items()}
+    return node
+
+
+def read_header(path: str) -> Dict:
+    """Bundle header without decoding the components"""
+    with np.load(path, allow_pickle=False) as arrays:
+        header = json.loads(arrays[HEADER_KEY].tobytes().decode('utf-8'))
+    if header.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f"{path} is not a model bundle")
+    if header.get('format_version', 0) > BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"{path} uses bundle format {header['format_version']}, "
+                         f"this loader supports up to {BUNDLE_FORMAT_VERSION}")
+    return header
+
+
+def load_bundle(path: str) -> ModelBundle:
+    """Load a bundle (allow_pickle=False; no sklearn needed)"""
+    header = read_header(path)
+    with np.load(path, allow_pickle=False) as npz:
+        arrays = {name: npz[name] for name in npz.files if name != HEADER_KEY}
+    components = {name: decode_component(node, arrays) for name, node in header['components'].items()}
+    return ModelBundle(path, header, components)
+
+
+# ----------------------------------------------------------------------
+# Verification and CLI
+# ----------------------------------------------------------------------
+
+def _sample_rows(source, bundled, n_rows: int) -> np.ndarray:
+    if isinstance(bundled, FlatTreeEnsemble):
+        return make_benchmark_rows(bundled, n_rows)
+    rng = np.random.default_rng(42)
+    return rng.normal(size=(n_rows, bundled.n_features_in_))
+
+
+def verify_components(original: Dict[str, Any], bundled: Dict[str, Any], n_rows: int = 1000) -> Dict[str, Dict]:
+    """
+    Compare bundled components against the pickled originals
+
+    Returns:
+        dict: Per component, max abs difference of the numeric output and
+              whether labels / transforms agree
+    """
+    report = {}
+    # Sample rows are plain arrays; sklearn would warn about missing feature names
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        for name, component in bundled.items():
+            report[name] = _verify_component(original[name], component, n_rows)
+    return report
+
+
+def _verify_component(source, component, n_rows: int) -> Dict:
+    """Verification result for one component"""
+    if isinstance(component, (FlatTreeEnsemble, BundleLogisticRegression)):
+        X = _sample_rows(source, component, n_rows)
+        if hasattr(source, 'predict_proba'):
+            diff = np.abs(source.predict_proba(X) - component.predict_proba(X)).max()
+            agree = bool(np.array_equal(source.predict(X), component.predict(X)))
+        else:
+            diff = np.abs(source.predict(X) - component.predict(X)).max()
+            agree = True
+        return {'max_abs_diff': float(diff), 'ok': agree and diff < 1e-9}
+    if isinstance(component, BundleStandardScaler):
+        X = _sample_rows(source, component, n_rows)
+        return {'ok': bool(np.array_equal(source.transform(X), component.transform(X)))}
+    if isinstance(component, BundleLabelEncoder):
+        return {'ok': bool(np.array_equal(source.classes_, component.classes_))}
+    return {'ok': _same_plain(source, component)}
+
+
+def _same_plain(source, component) -> bool:
+    """Plain data equality, walking into dicts/lists (estimators checked by type only)"""
+    if isinstance(source, dict):
+        return isinstance(component, dict) and source.keys() == component.keys() and \
+            all(_same_plain(source[key], component[key]) for key in source)
+    if isinstance(source, (list, tuple)):
+        return len(source) == len(component) and all(_same_plain(a, b) for a, b in zip(source, component))
+    if isinstance(source, np.ndarray):
+        return np.array_equal(source, component)
+    if type(source).__name__ in ESTIMATOR_ENCODERS:
+        return True
+    return source == component
+
+
+def export_version(registry, service: str, version: Optional[str] = None, compress: bool = True,
+                   register: bool = True) -> Dict:
+    """
+    Export one registry version to a bundle next to its pickles and verify it
+
+    Returns:
+        dict: Bundle path, sizes and the verification report
+    """
+    model_version = registry.get_version(service, version)
+    original = model_version.load_pickles()
+    filename = BUNDLE_TEMPLATE.format(service=service, version=model_version.version)
+    path = os.path.join(registry.models_dir, filename)
+
+    write_bundle(path, service, model_version.version, original, dict(model_version.files), compress)
+    report = verify_components(original, load_bundle(path).components)
+    if not all(result['ok'] for result in report.values()):
+        os.remove(path)
+        raise ValueError(f"Bundle does not reproduce the pickled models: {report}")
+
+    if register:
+        registry.register_bundle(service, model_version.version, filename)
+    pickle_bytes = sum(os.path.getsize(model_version.path(component)) for component in model_version.files)
+    return {
+        'service': service,
+        'version': model_version.version,
+        'path': path,
+        'bundle_bytes': os.path.getsize(path),
+        'pickle_bytes': pickle_bytes,
+        'verification': report
+    }
+
+
+COLD_START_SCRIPT = """
+import resource, sys, time
+sys.path.insert(0, {data_dir!r})
+started = time.perf_counter()
+from model_registry import ModelRegistry
+version = ModelRegistry({models_dir!r}).get_version({service!r}, {version!r})
+components = version.load_all()
+elapsed = time.perf_counter() - started
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, 'sklearn' in sys.modules, version.format)
+"""
+
+
+def cold_start(models_dir: str, service: str, version: str, model_format: str) -> Dict:
+    """Import + load time and peak memory of a fresh interpreter loading one version"""
+    script = COLD_START_SCRIPT.format(data_dir=os.path.dirname(os.path.abspath(__file__)),
+                                      models_dir=models_dir, service=service, version=version)
+    env = dict(os.environ, NIROGYA_MODEL_FORMAT=model_format)
+    output = subprocess.run([sys.executable, '-c', script], env=env, capture_output=True, text=True, check=True)
+    elapsed, max_rss_kb, sklearn_imported, used_format = output.stdout.split()[-4:]
+    return {
+        'format': used_format,
+        'load_seconds': float(elapsed),
+        'peak_rss_mb': int(max_rss_kb) / 1024,
+        'sklearn_imported': sklearn_imported == 'True'
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export and inspect pickle-free model bundles",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python model_bundle.py export
+  python model_bundle.py export --service water_quality --no-compress
+  python model_bundle.py info saved_models/water_quality_20250905_215908.npz
+  python model_bundle.py benchmark --service disease_outbreak
+        """
+    )
+    parser.add_argument('--models-dir', default=DEFAULT_MODELS_DIR, help='Directory with the saved models')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export = subparsers.add_parser('export', help='Write, verify and register bundles')
+    export.add_argument('--service', action='append', help='Service to export (default: all)')
+    export.add_argument('--version', help='Version to export (default: active)')
+    export.add_argument('--no-compress', action='store_true', help='Store arrays uncompressed')
+    export.add_argument('--no-register', action='store_true', help='Do not add the bundle to the manifest')
+    info = subparsers.add_parser('info', help='Show a bundle header')
+    info.add_argument('path')
+    benchmark = subparsers.add_parser('benchmark', help='Compare cold start of pickles and bundles')
+    benchmark.add_argument('--service', action='append', help='Service to benchmark (default: all)')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'info':
+            bundle = load_bundle(args.path)
+            print(json.dumps(bundle.get_info(), indent=2))
+            return
+
+        registry = ModelRegistry(args.models_dir)
+        services = args.service or list(registry.manifest['services'])
+
+        if args.command == 'export':
+            for service in services:
+                result = export_version(registry, service, args.version, compress=not args.no_compress,
+                                        register=not args.no_register)
+                print(f"✅ {service} {result['version']}: {result['path']}")
+                print(f"   {result['pickle_bytes'] / 1024:.0f} KB of pickles -> "
+                      f"{result['bundle_bytes'] / 1024:.0f} KB bundle")
+                for component, check in result['verification'].items():
+                    diff = f" (max diff {check['max_abs_diff']:.2e})" if 'max_abs_diff' in check else ""
+                    print(f"   {'✓' if check['ok'] else '✗'} {component}{diff}")
+
+        elif args.command == 'benchmark':
+            print(f"{'service':<18} {'format':<8} {'load s':>8} {'peak MB':>8}  sklearn")
+            for service in services:
+                version = registry.active_version(service)
+                for model_format in ['pickle', 'bundle']:
+                    result = cold_start(args.models_dir, service, version, model_format)
+                    print(f"{service:<18} {result['format']:<8} {result['load_seconds']:>8.3f} "
+                          f"{result['peak_rss_mb']:>8.1f}  {'yes' if result['sklearn_imported'] else 'no'}")
+    except Exception as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
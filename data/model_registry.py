@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Versioned Model Registry
+========================
+
+Keeps track of every saved model version in saved_models/ through a
+manifest (saved_models/manifest.json) and loads versions on demand.
+
+Features:
+- Manifest of services, their versions and component files; built from the
+  file names when no manifest exists yet
+- Lazy loading: a component is unpickled the first time it is used
+- joblib memory mapping (mmap_mode='r'): NumPy arrays stay in the page
+  cache, shared by every process and version that maps the same file
+- Pickle-free bundles (model_bundle.py): a version with a registered .npz
+  bundle loads from it without pickle or sklearn; NIROGYA_MODEL_FORMAT
+  chooses 'auto' (bundle when present, default), 'bundle' or 'pickle'.
+  In 'auto' a bundled tree ensemble still loads its pickle on its first
+  large batch, where sklearn's compiled traversal is faster
+  (tree_ensemble.SKLEARN_BATCH_ROWS); 'bundle' never reads a pickle
+- Loaded versions are cached per registry, so predictors in one process
+  share a version instead of loading it twice
+- Per-service version pinning with NIROGYA_MODEL_VERSION_<SERVICE>
+- Warm a version (load all components, run a warm-up) before it becomes
+  active, then switch with a single reference assignment
+
+Services:
+    disease_outbreak   GradientBoosting case-count model (disease_prediction_service.py)
+    water_quality      RandomForest / LogisticRegression WQI models (quick_predict_water_quality.py)
+
+Usage:
+    registry = get_registry()
+    version = registry.get_version('disease_outbreak')      # active version
+    model = version.get('model')
+
+    python model_registry.py list
+    python model_registry.py activate disease_outbreak 20250905_152526
+    python model_registry.py write-manifest
+"""
+
+import argparse
+import functools
+import json
+import os
+import re
+import sys
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+DEFAULT_MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'saved_models')
+MANIFEST_FILE = 'manifest.json'
+
+# Pin a service to a version, e.g. NIROGYA_MODEL_VERSION_DISEASE_OUTBREAK=20250905_152526
+VERSION_PIN_ENV_PREFIX = "NIROGYA_MODEL_VERSION_"
+
+# Component file name templates per service; the first component identifies a version
+SERVICE_COMPONENTS = {
+    'disease_outbreak': {
+        'model': 'gradient_boosting_model_{version}.pkl',
+        'metadata': 'model_metadata_{version}.pkl',
+        'preprocessors': 'preprocessors_{version}.pkl'
+    },
+    'water_quality': {
+        'rf_regressor': 'randomforest_regressor_{version}.pkl',
+        'rf_classifier': 'randomforest_classifier_{version}.pkl',
+        'lr_classifier': 'logistic_regression_{version}.pkl',
+        'scaler': 'standard_scaler_{version}.pkl',
+        'state_encoder': 'state_label_encoder_{version}.pkl',
+        'category_encoder': 'category_label_encoder_{version}.pkl',
+        'metadata': 'model_metadata_{version}.pkl'
+    }
+}
+
+VERSION_PATTERN = r'(\d{8}_\d{6})'
+
+# 'auto' (bundle when registered, else pickles), 'bundle' or 'pickle'
+MODEL_FORMAT_ENV = "NIROGYA_MODEL_FORMAT"
+BUNDLE_TEMPLATE = '{service}_{version}.npz'
+
+
+def model_format_preference() -> str:
+    preference = os.environ.get(MODEL_FORMAT_ENV, 'auto').lower()
+    if preference not in ('auto', 'bundle', 'pickle'):
+        raise ValueError(f"{MODEL_FORMAT_ENV} must be auto, bundle or pickle (got '{preference}')")
+    return preference
+
+
+class ModelVersion:
+    """One version of a service; components load lazily and are then cached"""
+
+    def __init__(self, service: str, version: str, files: Dict[str, str], models_dir: str,
+                 bundle: Optional[str] = None):
+        self.service = service
+        self.version = version
+        self.files = files
+        self.models_dir = models_dir
+        self.bundle = bundle
+        self.loaded_at = None
+        self._components: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def path(self, component: str) -> str:
+        return os.path.join(self.models_dir, self.files[component])
+
+    @property
+    def bundle_path(self) -> Optional[str]:
+        return os.path.join(self.models_dir, self.bundle) if self.bundle else None
+
+    @property
+    def format(self) -> str:
+        """'bundle' or 'pickle', following NIROGYA_MODEL_FORMAT"""
+        preference = model_format_preference()
+        has_bundle = self.bundle_path is not None and os.path.exists(self.bundle_path)
+        if preference == 'bundle' and not has_bundle:
+            raise FileNotFoundError(f"{self.service} {self.version} has no model bundle "
+                                    f"(run: python model_bundle.py export --service {self.service})")
+        return 'bundle' if has_bundle and preference != 'pickle' else 'pickle'
+
+    def get(self, component: str):
+        """Load a component on first use (a bundle loads all of them at once)"""
+        if component not in self._components:
+            if component not in self.files:
+                raise KeyError(f"{self.service} {self.version} has no component '{component}'")
+            with self._lock:
+                if component not in self._components:
+                    if self.format == 'bundle':
+                        from model_bundle import load_bundle
+                        components = load_bundle(self.bundle_path).components
+                        if model_format_preference() == 'auto':
+                            self._attach_large_batch_models(components)
+                        self._components.update(components)
+                    else:
+                        self._components[component] = self._load_pickle(component)
+                    self.loaded_at = datetime.now().isoformat()
+        return self._components[component]
+
+    def _load_pickle(self, component: str):
+        import joblib  # Only the pickle path needs joblib (and sklearn to unpickle)
+        # Memory-mapped arrays are shared through the page cache
+        return joblib.load(self.path(component), mmap_mode='r')
+
+    def _attach_large_batch_models(self, components: Dict[str, object]):
+        """Let bundled tree ensembles load their sklearn pickle for large batches"""
+        for component, model in components.items():
+            if hasattr(model, 'source_loader') and os.path.exists(self.path(component)):
+                model.source_loader = functools.partial(self._load_pickle, component)
+
+    def load_pickles(self) -> Dict[str, object]:
+        """Every component from its pickle, bypassing the cache (used for bundle export)"""
+        return {component: self._load_pickle(component) for component in self.files}
+
+    def load_all(self) -> Dict[str, object]:
+        """All components, loading the ones not used yet"""
+        return {component: self.get(component) for component in self.files}
+
+    def warm(self, warmup: Optional[Callable[['ModelVersion'], None]] = None):
+        """Load every component and run an optional warm-up (e.g. a test prediction)"""
+        self.load_all()
+        if warmup:
+            warmup(self)
+
+    @property
+    def is_loaded(self) -> bool:
+        return len(self._components) == len(self.files)
+
+    def get_info(self) -> Dict:
+        return {
+            'version': self.version,
+            'files': dict(self.files),
+            'bundle': self.bundle,
+            'loaded_components': sorted(self._components),
+            'loaded_at': self.loaded_at
+        }
+
+
+class ModelRegistry:
+    """Manifest-backed registry of model versions in one models directory"""
+
+    def __init__(self, models_dir: str = DEFAULT_MODELS_DIR):
+        self.models_dir = models_dir
+        self.manifest_path = os.path.join(models_dir, MANIFEST_FILE)
+        self._lock = threading.RLock()
+        self._loaded: Dict[tuple, ModelVersion] = {}
+        self._active: Dict[str, str] = {}
+        self.manifest = self._load_manifest()
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+
+    def discover_versions(self) -> Dict[str, Dict]:
+        """Build manifest entries from the file names in models_dir"""
+        try:
+            filenames = set(os.listdir(self.models_dir))
+        except OSError:
+            filenames = set()
+
+        services = {}
+        for service, components in SERVICE_COMPONENTS.items():
+            primary = next(iter(components.values()))
+            pattern = re.compile('^' + re.escape(primary).replace(re.escape('{version}'), VERSION_PATTERN) + '$')
+            versions = {}
+            for filename in filenames:
+                match = pattern.match(filename)
+                if not match:
+                    continue
+                version = match.group(1)
+                files = {component: template.format(version=version) for component, template in components.items()}
+                if all(name in filenames for name in files.values()):
+                    versions[version] = {'files': files}
+                    bundle = BUNDLE_TEMPLATE.format(service=service, version=version)
+                    if bundle in filenames:
+                        versions[version]['bundle'] = bundle
+            if versions:
+                # Timestamped versions sort chronologically
+                services[service] = {'active': sorted(versions)[-1], 'versions': versions}
+        return {'services': services}
+
+    def _load_manifest(self) -> Dict:
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                if not isinstance(manifest.get('services'), dict):
+                    raise ValueError("manifest needs a 'services' object")
+                return manifest
+            except Exception as e:
+                print(f"⚠️ Invalid model manifest ({e}), discovering versions from file names")
+        return self.discover_versions()
+
+    def reload_manifest(self) -> Dict:
+        """Re-read the manifest, e.g. after a retrained version was registered"""
+        with self._lock:
+            self.manifest = self._load_manifest()
+        return self.list_versions()
+
+    def write_manifest(self):
+        """Write the manifest atomically (readers never see a partial file)"""
+        with self._lock:
+            tmp_path = self.manifest_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.manifest_path)
+
+    def register_version(self, service: str, version: str, files: Optional[Dict[str, str]] = None,
+                         persist: bool = True) -> Dict:
+        """Add a version to the manifest (files default to the standard names)"""
+        if service not in SERVICE_COMPONENTS:
+            raise ValueError(f"Unknown service: {service}")
+        files = files or {component: template.format(version=version)
+                          for component, template in SERVICE_COMPONENTS[service].items()}
+        missing = [name for name in files.values() if not os.path.exists(os.path.join(self.models_dir, name))]
+        if missing:
+            raise FileNotFoundError(f"Missing model files: {', '.join(missing)}")
+
+        with self._lock:
+            entry = self.manifest['services'].setdefault(service, {'active': version, 'versions': {}})
+            entry['versions'][version] = {'files': files, 'registered_at': datetime.now().isoformat()}
+            if persist:
+                self.write_manifest()
+        return entry['versions'][version]
+
+    def register_bundle(self, service: str, version: str, filename: str, persist: bool = True) -> Dict:
+        """Attach an exported bundle to a registered version"""
+        if not os.path.exists(os.path.join(self.models_dir, filename)):
+            raise FileNotFoundError(f"Missing bundle file: {filename}")
+        with self._lock:
+            entry = self._service_entry(service)
+            if version not in entry['versions']:
+                raise ValueError(f"Unknown {service} version '{version}'")
+            entry['versions'][version]['bundle'] = filename
+            loaded = self._loaded.get((service, version))
+            if loaded is not None and not loaded._components:
+                loaded.bundle = filename
+            if persist:
+                self.write_manifest()
+        return entry['versions'][version]
+
+    # ------------------------------------------------------------------
+    # Versions
+    # ------------------------------------------------------------------
+
+    def _service_entry(self, service: str) -> Dict:
+        entry = self.manifest['services'].get(service)
+        if not entry or not entry.get('versions'):
+            raise FileNotFoundError(f"No model versions registered for '{service}' in {self.models_dir}")
+        return entry
+
+    def pinned_version(self, service: str) -> Optional[str]:
+        return os.environ.get(VERSION_PIN_ENV_PREFIX + service.upper())
+
+    def active_version(self, service: str) -> str:
+        """Pinned version, else the one activated here, else the manifest's"""
+        entry = self._service_entry(service)
+        return self.pinned_version(service) or self._active.get(service) or entry['active']
+
+    def get_version(self, service: str, version: Optional[str] = None) -> ModelVersion:
+        """A version of a service (the active one by default); components are not loaded yet"""
+        with self._lock:
+            entry = self._service_entry(service)
+            version = version or self.active_version(service)
+            if version not in entry['versions']:
+                raise ValueError(f"Unknown {service} version '{version}' "
+                                 f"(available: {', '.join(sorted(entry['versions']))})")
+            key = (service, version)
+            if key not in self._loaded:
+                info = entry['versions'][version]
+                self._loaded[key] = ModelVersion(service, version, info['files'], self.models_dir,
+                                                 info.get('bundle'))
+            return self._loaded[key]
+
+    def activate(self, service: str, version: str, warmup: Optional[Callable[[ModelVersion], None]] = None,
+                 persist: bool = False) -> ModelVersion:
+        """
+        Warm a version and make it the active one
+
+        The version is fully loaded (and warmed up) before the switch; if
+        that fails the current version stays active.
+        """
+        pinned = self.pinned_version(service)
+        if pinned and pinned != version:
+            raise ValueError(f"{service} is pinned to {pinned} by {VERSION_PIN_ENV_PREFIX + service.upper()}")
+
+        model_version = self.get_version(service, version)
+        model_version.warm(warmup)
+
+        with self._lock:
+            self._active[service] = version
+            if persist:
+                self.manifest['services'][service]['active'] = version
+                self.write_manifest()
+        print(f"✅ Activated {service} model version {version}")
+        return model_version
+
+    def activate_in_background(self, service: str, version: str,
+                               warmup: Optional[Callable[[ModelVersion], None]] = None,
+                               persist: bool = False,
+                               on_done: Optional[Callable[[ModelVersion], None]] = None) -> threading.Thread:
+        """activate() on a daemon thread; on_done runs with the version once it is live"""
+        def run():
+            try:
+                model_version = self.activate(service, version, warmup, persist)
+                if on_done:
+                    on_done(model_version)
+            except Exception as e:
+                print(f"❌ Background activation of {service} {version} failed: {e}")
+
+        thread = threading.Thread(target=run, name=f"model-activate-{service}-{version}", daemon=True)
+        thread.start()
+        return thread
+
+    def unload(self, service: str, version: str) -> bool:
+        """Drop a cached version (never the active one)"""
+        with self._lock:
+            if version == self.active_version(service):
+                return False
+            return self._loaded.pop((service, version), None) is not None
+
+    def list_versions(self, service: Optional[str] = None) -> Dict:
+        """Versions per service with the active one and what is loaded"""
+        services = [service] if service else list(self.manifest['services'])
+        result = {}
+        for name in services:
+            entry = self.manifest['services'].get(name, {'versions': {}})
+            active = self.active_version(name) if entry.get('versions') else None
+            result[name] = {
+                'active': active,
+                'pinned': self.pinned_version(name),
+                'versions': [
+                    {
+                        'version': version,
+                        'active': version == active,
+                        'loaded': (name, version) in self._loaded and self._loaded[(name, version)].is_loaded,
+                        'bundle': info.get('bundle'),
+                        'registered_at': info.get('registered_at')
+                    }
+                    for version, info in sorted(entry['versions'].items(), reverse=True)
+                ]
+            }
+        return result
+
+
+_registries: Dict[str, ModelRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(models_dir: Optional[str] = None) -> ModelRegistry:
+    """Shared registry per models directory, so loaded versions are reused process-wide"""
+    models_dir = os.path.abspath(models_dir or DEFAULT_MODELS_DIR)
+    with _registries_lock:
+        if models_dir not in _registries:
+            _registries[models_dir] = ModelRegistry(models_dir)
+        return _registries[models_dir]
+
+
+def print_versions(registry: ModelRegistry):
+    for service, info in registry.list_versions().items():
+        pinned = " (pinned by environment)" if info['pinned'] else ""
+        print(f"📦 {service}{pinned}")
+        for version in info['versions']:
+            marker = "▶" if version['active'] else " "
+            print(f"   {marker} {version['version']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Manage saved model versions",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python model_registry.py list
+  python model_registry.py write-manifest
+  python model_registry.py register water_quality 20251001_120000
+  python model_registry.py activate disease_outbreak 20250905_152526
+        """
+    )
+    parser.add_argument('--models-dir', default=DEFAULT_MODELS_DIR, help='Directory with the saved models')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('list', help='List services and versions')
+    subparsers.add_parser('write-manifest', help='Write manifest.json from the current state')
+    register = subparsers.add_parser('register', help='Add a version with the standard file names')
+    register.add_argument('service', choices=sorted(SERVICE_COMPONENTS))
+    register.add_argument('version')
+    activate = subparsers.add_parser('activate', help='Load, warm and activate a version (persisted)')
+    activate.add_argument('service', choices=sorted(SERVICE_COMPONENTS))
+    activate.add_argument('version')
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.models_dir)
+    try:
+        if args.command == 'list':
+            print_versions(registry)
+        elif args.command == 'write-manifest':
+            registry.write_manifest()
+            print(f"✅ Manifest written to {registry.manifest_path}")
+        elif args.command == 'register':
+            registry.register_version(args.service, args.version)
+            print(f"✅ Registered {args.service} version {args.version}")
+        elif args.command == 'activate':
+            registry.activate(args.service, args.version, persist=True)
+    except Exception as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
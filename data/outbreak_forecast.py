@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Vectorized Multi-Horizon Outbreak Forecast
+==========================================
+
+Seasonal outbreak forecasts for many scenarios and up to 24 months at once.
+Each scenario's current cases decay by 15% a month, are scaled by the
+seasonal multiplier of every future month and by a water-risk multiplier
+from the scenario's WQI. All three factors are broadcast NumPy operations
+over a (scenarios x months) grid, so a yearly forecast for every district
+is one call instead of a Python loop per scenario and month.
+
+The most likely disease of each forecast month comes from the seasonal
+rule table shared with IntegratedHealthAnalyzer's rule-based prediction,
+evaluated on the same grid. forecast_outbreak() runs the same constants on
+plain values for one scenario (the per-analysis path), and
+forecast_records() turns a grid row into the per-month dicts returned by
+predict_future_outbreak_trend and /api/future-trends.
+
+Features:
+- forecast_outbreak_grid(): arrays of cases / months / WQI -> grids
+- forecast_scenarios(): outbreak and water dicts (WQI via wqi_engine)
+- Risk levels, seasonal factors and disease labels per scenario and month
+- Horizons from 1 to MAX_HORIZON (24) months
+- grid_summary(): compact month lists and peak month per scenario
+
+Usage:
+    grid = forecast_scenarios(outbreaks, water_samples, horizon=12)
+    grid['predicted_cases']    # (scenarios x 12) floats
+    grid['risk_levels']        # (scenarios x 12) 'Low' ... 'Critical'
+"""
+
+import math
+import numbers
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from wqi_engine import WQI_WEIGHTS, calculate_wqi_batch
+
+MAX_HORIZON = 24
+
+# Month-over-month decay of the current outbreak
+MONTHLY_DECAY = 0.85
+
+# Seasonal risk factors (Northeast India patterns), indexed by month 1-12
+SEASONAL_MULTIPLIERS = {
+    1: 0.6,   # January - Winter, lower risk
+    2: 0.6,   # February - Winter, lower risk
+    3: 0.7,   # March - Pre-summer
+    4: 0.8,   # April - Summer onset
+    5: 0.9,   # May - Pre-monsoon
+    6: 1.4,   # June - Early monsoon, high risk
+    7: 1.6,   # July - Peak monsoon, highest risk
+    8: 1.5,   # August - Monsoon continues
+    9: 1.3,   # September - Late monsoon
+    10: 1.0,  # October - Post-monsoon
+    11: 0.8,  # November - Winter approach
+    12: 0.7   # December - Winter
+}
+_SEASONAL_TABLE = np.array([np.nan] + [SEASONAL_MULTIPLIERS[month] for month in range(1, 13)])
+
+# (WQI above, multiplier) checked in order; better water gets the last value
+WATER_RISK_MULTIPLIERS = [(50, 1.5), (30, 1.2)]   # Poor, moderate water quality
+GOOD_WATER_MULTIPLIER = 0.8
+
+# (cases above, risk level) checked in order
+RISK_LEVELS = [(200, 'Critical'), (100, 'High'), (50, 'Medium')]
+LOWEST_RISK = 'Low'
+
+# Rule-based disease by season and outbreak size:
+# (months or None for the rest, [(cases above, disease, probability, confidence), ...], fallback)
+SEASONAL_DISEASE_RULES = [
+    # Monsoon months - higher risk
+    ((6, 7, 8, 9), [
+        (200, 'Cholera', 85, 'High'),
+        (100, 'Acute Diarrheal Disease', 75, 'Medium-High'),
+        (50, 'Typhoid', 70, 'Medium'),
+        (20, 'Gastroenteritis', 65, 'Medium'),
+    ], ('Viral Gastroenteritis', 60, 'Medium')),
+    # Pre/Post monsoon
+    ((4, 5, 10, 11), [
+        (150, 'Typhoid', 80, 'High'),
+        (75, 'Hepatitis A', 75, 'Medium-High'),
+        (30, 'Dysentery', 70, 'Medium'),
+    ], ('Food Poisoning', 65, 'Medium')),
+    # Winter months (Dec, Jan, Feb, Mar)
+    (None, [
+        (100, 'Viral Gastroenteritis', 80, 'High'),
+        (50, 'Food Poisoning', 75, 'Medium-High'),
+        (20, 'Acute Gastroenteritis', 70, 'Medium'),
+    ], ('Minor Gastric Disorder', 65, 'Medium')),
+]
+
+# Assam, Manipur - higher waterborne disease risk
+WATERBORNE_STATES = (2, 3)
+WATERBORNE_DISEASE = 'Waterborne Gastroenteritis'
+
+
+def _is_waterborne_candidate(disease: str) -> bool:
+    return "Gastroenteritis" in disease or "Food Poisoning" in disease
+
+
+def seasonal_disease(cases, month, state) -> Tuple[str, int, str]:
+    """
+    Rule-based (disease, probability, confidence) for one outbreak.
+
+    Args:
+        cases: Reported (or forecast) cases
+        month: Outbreak month (1-12)
+        state: Northeast state code
+    """
+    for months, tiers, fallback in SEASONAL_DISEASE_RULES:
+        if months is None or month in months:
+            disease, probability, confidence = next(
+                ((d, p, c) for threshold, d, p, c in tiers if cases > threshold), fallback)
+            break
+
+    # State-specific adjustments (Northeast India patterns)
+    if state in WATERBORNE_STATES and _is_waterborne_candidate(disease):
+        disease = WATERBORNE_DISEASE
+        probability = min(probability + 10, 95)
+    return disease, probability, confidence
+
+
+def _build_disease_outcomes():
+    """Flat outcome list for the array rules plus the state-adjustment map"""
+    outcomes = []
+    for _, tiers, fallback in SEASONAL_DISEASE_RULES:
+        outcomes.extend((d, p, c) for _, d, p, c in tiers)
+        outcomes.append(fallback)
+    adjusted = list(range(len(outcomes)))
+    for code, (disease, probability, confidence) in enumerate(list(outcomes)):
+        if _is_waterborne_candidate(disease):
+            outcomes.append((WATERBORNE_DISEASE, min(probability + 10, 95), confidence))
+            adjusted[code] = len(outcomes) - 1
+    adjusted.extend(range(len(adjusted), len(outcomes)))
+    return outcomes, np.array(adjusted)
+
+
+_DISEASE_OUTCOMES, _WATERBORNE_CODES = _build_disease_outcomes()
+_DISEASE_NAMES = np.array([disease for disease, _, _ in _DISEASE_OUTCOMES], dtype=object)
+_DISEASE_PROBABILITIES = np.array([probability for _, probability, _ in _DISEASE_OUTCOMES])
+
+
+def seasonal_disease_codes(cases: np.ndarray, months: np.ndarray, states: np.ndarray) -> np.ndarray:
+    """
+    Array form of seasonal_disease(): outcome codes for broadcastable arrays.
+
+    Use disease_labels() / disease_probabilities() to read the codes.
+    """
+    cases, months, states = np.broadcast_arrays(cases, months, states)
+    codes = np.full(cases.shape, -1)
+    first_code = 0
+    for group_months, tiers, _ in SEASONAL_DISEASE_RULES:
+        in_group = codes < 0 if group_months is None else (codes < 0) & np.isin(months, group_months)
+        tier_codes = np.select([cases > threshold for threshold, _, _, _ in tiers],
+                               list(range(first_code, first_code + len(tiers))),
+                               first_code + len(tiers))
+        codes = np.where(in_group, tier_codes, codes)
+        first_code += len(tiers) + 1
+    return np.where(np.isin(states, WATERBORNE_STATES), _WATERBORNE_CODES[codes], codes)
+
+
+def disease_labels(codes: np.ndarray) -> np.ndarray:
+    return _DISEASE_NAMES[codes]
+
+
+def disease_probabilities(codes: np.ndarray) -> np.ndarray:
+    return _DISEASE_PROBABILITIES[codes]
+
+
+def water_risk_multiplier(wqi):
+    """Forecast multiplier for one WQI value or an array of them (NaN raises ValueError)"""
+    if isinstance(wqi, np.ndarray):
+        if np.isnan(wqi).any():
+            raise ValueError("WQI is NaN (a water parameter is missing or not a number)")
+        return np.select([wqi > above for above, _ in WATER_RISK_MULTIPLIERS],
+                         [multiplier for _, multiplier in WATER_RISK_MULTIPLIERS], GOOD_WATER_MULTIPLIER)
+    if wqi != wqi:
+        raise ValueError("WQI is NaN (a water parameter is missing or not a number)")
+    return next((multiplier for above, multiplier in WATER_RISK_MULTIPLIERS if wqi > above), GOOD_WATER_MULTIPLIER)
+
+
+def _check_horizon(horizon: int) -> int:
+    if isinstance(horizon, bool) or int(horizon) != horizon or not 1 <= horizon <= MAX_HORIZON:
+        raise ValueError(f"months_ahead must be an integer between 1 and {MAX_HORIZON}")
+    return int(horizon)
+
+
+def forecast_outbreak_grid(cases, months, wqi, states=None, horizon: int = 3) -> Dict[str, Any]:
+    """
+    Forecast many scenarios over the next `horizon` months.
+
+    Args:
+        cases: Current cases per scenario
+        months: Current outbreak month (1-12) per scenario
+        wqi: Water Quality Index per scenario
+        states: Northeast state code per scenario (default: 1)
+        horizon (int): Months ahead, 1 to MAX_HORIZON
+
+    Returns:
+        dict: months, predicted_cases (float), cases (int), seasonal_factor,
+              risk_levels and diseases as (scenarios x horizon) arrays, plus
+              water_impact per scenario
+    """
+    horizon = _check_horizon(horizon)
+    cases = np.asarray(cases, dtype=np.float64).reshape(-1)
+    months = np.asarray(months, dtype=np.int64).reshape(-1)
+    wqi = np.asarray(wqi, dtype=np.float64).reshape(-1)
+    states = np.ones(len(cases), dtype=np.int64) if states is None else np.asarray(states).reshape(-1)
+
+    offsets = np.arange(1, horizon + 1)
+    future_months = (months[:, None] + offsets[None, :] - 1) % 12 + 1
+    seasonal = _SEASONAL_TABLE[future_months]
+    water_impact = water_risk_multiplier(wqi)
+
+    # Same operation order as the scalar forecast: decay, season, water
+    predicted = cases[:, None] * MONTHLY_DECAY ** offsets[None, :] * seasonal * water_impact[:, None]
+    whole_cases = np.trunc(predicted).astype(np.int64)
+
+    risk_levels = np.select([predicted > above for above, _ in RISK_LEVELS],
+                            [level for _, level in RISK_LEVELS], LOWEST_RISK).astype(object)
+    codes = seasonal_disease_codes(whole_cases, future_months, states[:, None])
+
+    return {
+        'horizon': horizon,
+        'months': future_months,
+        'predicted_cases': predicted,
+        'cases': whole_cases,
+        'seasonal_factor': seasonal,
+        'water_impact': water_impact,
+        'risk_levels': risk_levels,
+        'diseases': disease_labels(codes)
+    }
+
+
+# Outbreak fields read by the forecast, with the analyzer's defaults for missing ones
+OUTBREAK_FIELD_DEFAULTS = {'No_of_Cases': 0, 'Start_of_Outbreak_Month': 7, 'Northeast_State': 1}
+
+
+def _is_finite_number(value: Any) -> bool:
+    return isinstance(value, numbers.Real) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def check_outbreak_fields(outbreak: Dict[str, Any]):
+    """
+    Raise ValueError unless the forecast fields that are present are finite
+    numbers (not bools, strings or null) and the month is a whole month 1-12.
+    The array forecast would otherwise coerce them silently.
+    """
+    for field in OUTBREAK_FIELD_DEFAULTS:
+        if field in outbreak and not _is_finite_number(outbreak[field]):
+            raise ValueError(f"{field} must be a finite number (got {outbreak[field]!r})")
+    month = outbreak.get('Start_of_Outbreak_Month', OUTBREAK_FIELD_DEFAULTS['Start_of_Outbreak_Month'])
+    if month != int(month) or not 1 <= month <= 12:
+        raise ValueError(f"Start_of_Outbreak_Month must be a whole month between 1 and 12 (got {month!r})")
+
+
+def check_water_params(water_params: Dict[str, Any]):
+    """
+    Raise ValueError unless every WQI parameter that is present is a finite
+    number (not a bool, string or null); calculate_wqi_batch would turn
+    them into NaN or parse them silently.
+    """
+    for parameter in WQI_WEIGHTS:
+        if parameter in water_params and not _is_finite_number(water_params[parameter]):
+            raise ValueError(f"{parameter} must be a finite number (got {water_params[parameter]!r})")
+
+
+def forecast_scenarios(outbreaks: Sequence[Dict[str, Any]], water_samples: Sequence[Dict[str, float]],
+                       horizon: int = 3, wqi: Optional[Sequence[float]] = None) -> Dict[str, Any]:
+    """
+    forecast_outbreak_grid() for outbreak / water parameter dicts.
+
+    Missing outbreak fields default like the analyzer (0 cases, month 7,
+    state 1); the WQI is computed in one wqi_engine pass unless given.
+    Raises ValueError if any outbreak fails check_outbreak_fields() or, when
+    the WQI is computed here, any water sample fails check_water_params().
+    """
+    for outbreak in outbreaks:
+        check_outbreak_fields(outbreak)
+    cases = [outbreak.get('No_of_Cases', 0) for outbreak in outbreaks]
+    months = [outbreak.get('Start_of_Outbreak_Month', 7) for outbreak in outbreaks]
+    states = [outbreak.get('Northeast_State', 1) for outbreak in outbreaks]
+    if wqi is None:
+        for water_params in water_samples:
+            check_water_params(water_params)
+        wqi = calculate_wqi_batch(list(water_samples), use_defaults=True)
+    return forecast_outbreak_grid(cases, months, wqi, states, horizon)
+
+
+def forecast_outbreak(cases, month, wqi, state=1, horizon: int = 3) -> List[Dict[str, Any]]:
+    """
+    Forecast one scenario with plain Python values.
+
+    Returns the same numbers as one row of forecast_outbreak_grid(), without
+    array overhead, for the per-analysis path.
+
+    Returns:
+        list: One dict per month (month, predicted_cases, seasonal_factor,
+              water_impact, most_likely_disease, risk_level)
+    """
+    horizon = _check_horizon(horizon)
+    water_impact = water_risk_multiplier(wqi)
+    forecast = []
+    for month_offset in range(1, horizon + 1):
+        future_month = ((month + month_offset - 1) % 12) + 1
+        predicted = cases * MONTHLY_DECAY ** month_offset * SEASONAL_MULTIPLIERS[future_month] * water_impact
+        forecast.append({
+            'month': future_month,
+            'predicted_cases': int(predicted),
+            'seasonal_factor': SEASONAL_MULTIPLIERS[future_month],
+            'water_impact': water_impact,
+            'most_likely_disease': seasonal_disease(int(predicted), future_month, state)[0],
+            'risk_level': next((level for above, level in RISK_LEVELS if predicted > above), LOWEST_RISK)
+        })
+    return forecast
+
+
+@lru_cache(maxsize=None)
+def _future_recommendations(risk_level: str, month: int) -> Tuple[str, ...]:
+    recommendations = []
+
+    # Seasonal recommendations
+    if month in [6, 7, 8, 9]:  # Monsoon months
+        recommendations.extend([
+            "🌧️ Prepare for monsoon-related disease surge",
+            "🚰 Ensure water treatment capacity for increased demand",
+            "🏥 Stock additional medical supplies for waterborne diseases"
+        ])
+    elif month in [4, 5]:  # Pre-monsoon
+        recommendations.extend([
+            "🔧 Conduct preventive maintenance on water systems",
+            "📋 Train health workers for upcoming monsoon season",
+            "🚨 Establish early warning systems"
+        ])
+    else:  # Other months
+        recommendations.extend([
+            "📊 Conduct routine surveillance",
+            "🔍 Monitor water quality trends"
+        ])
+
+    # Risk-based recommendations
+    if risk_level == "Critical":
+        recommendations.extend([
+            "🚨 Prepare emergency response protocols",
+            "🏥 Ensure hospital capacity expansion",
+            "📢 Launch preemptive public health campaigns"
+        ])
+    elif risk_level == "High":
+        recommendations.extend([
+            "⚠️ Increase surveillance frequency",
+            "💊 Ensure adequate medicine stockpiles"
+        ])
+
+    return tuple(recommendations[:5])  # Limit to top 5 recommendations
+
+
+def future_recommendations(risk_level: str, month: int) -> List[str]:
+    """Preparation advice for a forecast month (at most 5 items)"""
+    return list(_future_recommendations(risk_level, int(month)))
+
+
+def forecast_records(months: Sequence[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Month_1 ... Month_N dicts with recommendations, as returned by the analyzer"""
+    return {
+        f"Month_{offset}": dict(month, recommendations=future_recommendations(month['risk_level'], month['month']))
+        for offset, month in enumerate(months, 1)
+    }
+
+
+def grid_row(grid: Dict[str, Any], index: int) -> List[Dict[str, Any]]:
+    """One scenario of a forecast grid in forecast_outbreak() form"""
+    water_impact = float(grid['water_impact'][index])
+    return [
+        {
+            'month': int(grid['months'][index, col]),
+            'predicted_cases': int(grid['cases'][index, col]),
+            'seasonal_factor': float(grid['seasonal_factor'][index, col]),
+            'water_impact': water_impact,
+            'most_likely_disease': grid['diseases'][index, col],
+            'risk_level': grid['risk_levels'][index, col]
+        }
+        for col in range(grid['horizon'])
+    ]
+
+
+def grid_summary(grid: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """Compact per-scenario view of a forecast grid (parallel month lists)"""
+    cases = grid['cases'][index]
+    peak = int(np.argmax(cases))
+    return {
+        'water_impact': float(grid['water_impact'][index]),
+        'months': grid['months'][index].tolist(),
+        'predicted_cases': cases.tolist(),
+        'risk_levels': grid['risk_levels'][index].tolist(),
+        'most_likely_diseases': grid['diseases'][index].tolist(),
+        'peak': {
+            'month': int(grid['months'][index, peak]),
+            'months_ahead': peak + 1,
+            'predicted_cases': int(cases[peak]),
+            'risk_level': grid['risk_levels'][index, peak]
+        }
+    }
+
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Prediction Cache
+================
+
+Bounded LRU cache of raw model outputs keyed by the exact feature vector and
+the model version. Dashboards ask for the same state / month / lag
+combinations over and over; with the cache a repeated row skips the model
+entirely, and a batch only sends its uncached rows to model.predict.
+
+Keys are the model version plus the canonical float64 bytes of the row,
+hashed by the dict itself, so two inputs share an entry only when the model
+would see exactly the same row, and activating another version can never
+serve a stale value (old entries simply age out). Keys for a whole batch
+come from one NumPy view, so a lookup costs well under a microsecond per
+row - cheaper than even a batched model.predict. An entry takes roughly
+8 bytes per feature plus ~150 bytes of overhead.
+
+Configuration (environment variables):
+    NIROGYA_PREDICTION_CACHE_SIZE   entries kept (default: 10000, 0 disables)
+
+Usage:
+    cache = PredictionCache.from_env()
+    predictions = cache.predict(X, version, model.predict)
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+CACHE_SIZE_ENV = "NIROGYA_PREDICTION_CACHE_SIZE"
+DEFAULT_CACHE_SIZE = 10000
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of per-row model predictions.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE):
+        self.max_entries = max(0, int(max_entries))
+        self._entries: 'OrderedDict[Tuple[str, bytes], float]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @classmethod
+    def from_env(cls) -> 'PredictionCache':
+        return cls(int(os.environ.get(CACHE_SIZE_ENV, DEFAULT_CACHE_SIZE)))
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def row_keys(X: np.ndarray, version: str) -> List[Tuple[str, bytes]]:
+        """
+        One (version, row bytes) key per row of a 2-D feature matrix.
+
+        Rows are canonicalized to contiguous float64 (adding 0.0 folds -0.0
+        into 0.0) so equal feature values always give equal keys.
+        """
+        rows = np.ascontiguousarray(X, dtype=np.float64) + 0.0
+        row_bytes = rows.view(np.dtype((np.void, rows.shape[1] * rows.itemsize))).ravel().tolist()
+        version = str(version)
+        return [(version, row) for row in row_bytes]
+
+    def predict(self, X: np.ndarray, version: str, predict_fn: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        """
+        Predictions for every row of X, calling predict_fn only for the misses.
+
+        Args:
+            X: (rows x features) matrix in model feature order
+            version: Model version the predictions belong to
+            predict_fn: The model's predict, called once with the uncached rows
+
+        Returns:
+            ndarray: One prediction per row, in row order
+        """
+        if not self.enabled:
+            return np.asarray(predict_fn(X))
+
+        keys = self.row_keys(X, version)
+        predictions = np.empty(len(keys), dtype=np.float64)
+        missing = []
+        entries = self._entries
+        with self._lock:
+            for i, key in enumerate(keys):
+                value = entries.get(key)
+                if value is None:
+                    missing.append(i)
+                else:
+                    entries.move_to_end(key)
+                    predictions[i] = value
+            self._hits += len(keys) - len(missing)
+            self._misses += len(missing)
+
+        if missing:
+            # Duplicate rows inside one batch are still computed only once
+            first_index = {}
+            unique = [i for i in missing if first_index.setdefault(keys[i], i) == i]
+            computed = np.asarray(predict_fn(X[unique]), dtype=np.float64)
+            values = dict(zip((keys[i] for i in unique), computed))
+            for i in missing:
+                predictions[i] = values[keys[i]]
+            self._store(values)
+
+        return predictions
+
+    def _store(self, values: Dict[Tuple[str, bytes], float]):
+        with self._lock:
+            for key, value in values.items():
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rate and size counters for the metrics endpoints"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'evictions': self._evictions
+            }
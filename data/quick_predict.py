@@ -25,6 +25,7 @@ import argparse
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from disease_prediction_service import DiseasePredictor
+from disease_type_rules import QUICK_DISEASE_RULES
 
 
 def predict_disease_type(outbreak_data):
@@ -37,100 +38,30 @@ def predict_disease_type(outbreak_data):
     Returns:
         dict: Disease prediction with probability scores
     """
-    
     # Disease classification rules based on medical knowledge and data patterns
-    diseases = {
-        'Food Poisoning': 0.0,
-        'Acute Diarrheal Disease': 0.0,
-        'Typhoid': 0.0,
-        'Hepatitis A': 0.0,
-        'Cholera': 0.0,
-        'Dysentery': 0.0
-    }
-    
-    deaths = outbreak_data.get('No_of_Deaths', 0)
-    month = outbreak_data.get('Start_of_Outbreak_Month', 7)
-    season = outbreak_data.get('Start_of_Outbreak_Season', 2)
-    prev_cases = outbreak_data.get('Cases_Lag_1', 0)
-    
-    # Calculate death ratio
-    death_ratio = deaths / max(prev_cases, 1) if prev_cases > 0 else deaths / 10
-    
-    # Food Poisoning - Usually acute, shorter duration, higher mortality
-    diseases['Food Poisoning'] += 30  # Base probability
-    if deaths > 5:
-        diseases['Food Poisoning'] += 20
-    if death_ratio > 0.15:  # High mortality rate
-        diseases['Food Poisoning'] += 25
-    if month in [4, 5, 6, 7, 8]:  # Summer months
-        diseases['Food Poisoning'] += 15
-    
-    # Acute Diarrheal Disease - Most common, all seasons
-    diseases['Acute Diarrheal Disease'] += 40  # Base probability (most common)
-    if season == 2:  # Monsoon season
-        diseases['Acute Diarrheal Disease'] += 20
-    if deaths <= 3:  # Usually lower mortality
-        diseases['Acute Diarrheal Disease'] += 15
-    if prev_cases > 20:  # Can affect many people
-        diseases['Acute Diarrheal Disease'] += 10
-    
-    # Typhoid - More severe, longer duration
-    diseases['Typhoid'] += 10  # Base probability
-    if deaths >= 3:
-        diseases['Typhoid'] += 20
-    if death_ratio > 0.1:
-        diseases['Typhoid'] += 15
-    if season in [1, 2]:  # Pre-monsoon and monsoon
-        diseases['Typhoid'] += 15
-    if month in [4, 5, 6, 7, 8, 9]:
-        diseases['Typhoid'] += 10
-    
-    # Hepatitis A - Specific patterns
-    diseases['Hepatitis A'] += 5  # Base probability
-    if deaths >= 2:
-        diseases['Hepatitis A'] += 15
-    if season == 2:  # Monsoon
-        diseases['Hepatitis A'] += 20
-    if month in [6, 7, 8, 9]:
-        diseases['Hepatitis A'] += 15
-    
-    # Cholera - Epidemic potential, water-related
-    diseases['Cholera'] += 5  # Base probability
-    if prev_cases > 30:  # Epidemic potential
-        diseases['Cholera'] += 25
-    if season == 2:  # Monsoon
-        diseases['Cholera'] += 20
-    if deaths >= 5:
-        diseases['Cholera'] += 15
-    if death_ratio > 0.12:
-        diseases['Cholera'] += 10
-    
-    # Dysentery - Bacterial infection
-    diseases['Dysentery'] += 8  # Base probability
-    if deaths >= 2:
-        diseases['Dysentery'] += 15
-    if season in [2, 3]:  # Monsoon and post-monsoon
-        diseases['Dysentery'] += 15
-    if death_ratio > 0.08:
-        diseases['Dysentery'] += 10
-    
-    # Normalize probabilities
-    total_score = sum(diseases.values())
-    if total_score > 0:
-        for disease in diseases:
-            diseases[disease] = (diseases[disease] / total_score) * 100
-    
-    # Sort by probability
-    sorted_diseases = sorted(diseases.items(), key=lambda x: x[1], reverse=True)
-    
+    # (QUICK_DISEASE_RULES, shared with the vectorized batch path)
+    prediction = QUICK_DISEASE_RULES.predict_record(outbreak_data)
     return {
-        'most_likely': sorted_diseases[0][0],
-        'probability': round(sorted_diseases[0][1], 1),
-        'all_probabilities': {disease: round(prob, 1) for disease, prob in sorted_diseases},
-        'confidence': 'High' if sorted_diseases[0][1] > 40 else 'Medium' if sorted_diseases[0][1] > 25 else 'Low'
+        'most_likely': prediction['most_likely'],
+        'probability': prediction['probability'],
+        'all_probabilities': prediction['all_probabilities'],
+        'confidence': prediction['confidence']
     }
 
 
+def predict_disease_types(batch):
+    """
+    Vectorized predict_disease_type for many outbreaks.
+    
+    Args:
+        batch: DataFrame, list of outbreak dicts or dict of columns
+        
+    Returns:
+        dict: Per-row probability matrix (percent), labels and confidence
+    """
+    return QUICK_DISEASE_RULES.predict(batch)
+
+
 def get_disease_info(disease_name):
     """Get information about a specific disease"""
     disease_info = {
@@ -339,8 +270,8 @@ def batch_predict(csv_file, predictor):
         df = pd.read_csv(csv_file)
         print(f"📊 Processing {len(df)} outbreaks from {csv_file}")
         
-        # Make batch predictions
-        results = predictor.predict_batch(df)
+        # Make batch predictions (disease types in one vectorized pass)
+        results = predictor.predict_batch(df, disease_rules=QUICK_DISEASE_RULES)
         
         if results is not None:
             # Save results
@@ -357,6 +288,10 @@ def batch_predict(csv_file, predictor):
             print(f"  Average predicted cases: {avg_cases:.2f}")
             print(f"  Range: {min_cases:.2f} - {max_cases:.2f}")
             
+            print(f"\n🦠 Most Likely Diseases:")
+            for disease, count in results['predicted_disease'].value_counts().items():
+                print(f"  {disease}: {count}")
+            
         else:
             print(f"❌ Batch prediction failed")
             
@@ -9,37 +9,28 @@ Purpose: Quick testing of water quality models with user input
 Models: RandomForest Regressor/Classifier, Logistic Regression
 """
 
-import joblib
-import pickle
 import pandas as pd
 import numpy as np
 import os
 import sys
 from datetime import datetime
 
-def load_models(model_timestamp="20250905_215908"):
-    """Load all saved models and preprocessors"""
-    base_path = "saved_models"
+from model_registry import get_registry
+from wqi_engine import calculate_wqi
+
+def load_models(model_timestamp=None):
+    """Load all saved models and preprocessors (default: the registry's active version)"""
     models = {}
     
     try:
         print("🔄 Loading water quality models...")
         
-        # Load models
-        models['rf_regressor'] = joblib.load(f"{base_path}/randomforest_regressor_{model_timestamp}.pkl")
-        models['rf_classifier'] = joblib.load(f"{base_path}/randomforest_classifier_{model_timestamp}.pkl")
-        models['lr_classifier'] = joblib.load(f"{base_path}/logistic_regression_{model_timestamp}.pkl")
-        
-        # Load preprocessors
-        models['scaler'] = joblib.load(f"{base_path}/standard_scaler_{model_timestamp}.pkl")
-        models['state_encoder'] = joblib.load(f"{base_path}/state_label_encoder_{model_timestamp}.pkl")
-        models['category_encoder'] = joblib.load(f"{base_path}/category_label_encoder_{model_timestamp}.pkl")
-        
-        # Load metadata
-        with open(f"{base_path}/model_metadata_{model_timestamp}.pkl", 'rb') as f:
-            models['metadata'] = pickle.load(f)
+        # Models, preprocessors and metadata of one registry version
+        model_version = get_registry().get_version('water_quality', model_timestamp)
+        models.update(model_version.load_all())
+        models['version'] = model_version.version
         
-        print("✅ Models loaded successfully!")
+        print(f"✅ Models loaded successfully! (version {model_version.version})")
         return models
         
     except Exception as e:
@@ -47,69 +38,6 @@ def load_models(model_timestamp="20250905_215908"):
         print("Please ensure model files are present in 'saved_models' directory")
         return None
 
-def calculate_wqi(water_params):
-    """Calculate Water Quality Index using standardized formula"""
-    weights = {
-        'ph': 0.15,
-        'dissolved_oxygen': 0.20,
-        'bod': 0.15,
-        'nitrate_n': 0.15,
-        'fecal_coliform': 0.20,
-        'total_coliform': 0.15
-    }
-    
-    wqi = 0
-    
-    # pH scoring
-    ph_val = water_params['ph']
-    if 6.5 <= ph_val <= 8.5:
-        ph_score = 0
-    else:
-        ph_score = min(abs(ph_val - 7.0) * 15, 100)
-    wqi += weights['ph'] * ph_score
-    
-    # Dissolved Oxygen scoring
-    do_val = water_params['dissolved_oxygen']
-    if do_val >= 5:
-        do_score = 0
-    else:
-        do_score = (5 - do_val) * 20
-    wqi += weights['dissolved_oxygen'] * min(do_score, 100)
-    
-    # BOD scoring
-    bod_val = water_params['bod']
-    if bod_val <= 3:
-        bod_score = 0
-    else:
-        bod_score = (bod_val - 3) * 10
-    wqi += weights['bod'] * min(bod_score, 100)
-    
-    # Nitrate scoring
-    nitrate_val = water_params['nitrate_n']
-    if nitrate_val <= 10:
-        nitrate_score = nitrate_val * 2
-    else:
-        nitrate_score = 20 + (nitrate_val - 10) * 8
-    wqi += weights['nitrate_n'] * min(nitrate_score, 100)
-    
-    # Fecal Coliform scoring
-    fc_val = water_params['fecal_coliform']
-    if fc_val <= 50:
-        fc_score = fc_val * 0.5
-    else:
-        fc_score = 25 + (fc_val - 50) * 0.1
-    wqi += weights['fecal_coliform'] * min(fc_score, 100)
-    
-    # Total Coliform scoring
-    tc_val = water_params['total_coliform']
-    if tc_val <= 500:
-        tc_score = tc_val * 0.05
-    else:
-        tc_score = 25 + (tc_val - 500) * 0.01
-    wqi += weights['total_coliform'] * min(tc_score, 100)
-    
-    return wqi
-
 def get_sample_inputs():
     """Provide some sample water quality scenarios"""
     samples = {
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Request Coalescing (Single-Flight)
+==================================
+
+Collapses concurrent identical requests into one unit of work. The first
+caller for a key runs the computation; callers that arrive with the same key
+while it is still running wait for that result instead of starting their own.
+Once the computation finishes the key is released, so this is not a cache.
+
+Used by:
+- correlation_api.py  /api/analyze          (Flask worker threads)
+- backend/api_server.py  /analyze-symptoms  (asyncio event loop)
+"""
+
+import asyncio
+import json
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+def canonical_json_key(payload: Any) -> str:
+    """Build a stable key for a JSON payload (sorted keys, compact separators)"""
+    return json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+
+
+class _InFlightCall:
+    """A computation that other callers can wait on"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Thread-based single-flight group for synchronous servers such as Flask.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _InFlightCall] = {}
+        self._executions = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run ``fn(*args, **kwargs)`` once per in-flight ``key``.
+
+        Followers receive the leader's return value or re-raise its exception.
+        The result object is shared, so callers must treat it as read-only.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlightCall()
+                self._calls[key] = call
+                self._executions += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoints"""
+        with self._lock:
+            in_flight = len(self._calls)
+            executions = self._executions
+            coalesced = self._coalesced
+        total = executions + coalesced
+        return {
+            'executions': executions,
+            'coalesced_requests': coalesced,
+            'in_flight': in_flight,
+            'coalescing_ratio': round(coalesced / total, 4) if total else 0.0
+        }
+
+
+class AsyncSingleFlight:
+    """
+    asyncio single-flight group for FastAPI handlers.
+
+    The computation runs as its own task and every caller awaits it through
+    ``asyncio.shield``, so a client that disconnects does not cancel the work
+    for the others waiting on the same key.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._executions = 0
+        self._coalesced = 0
+
+    async def do(self, key: Hashable, coro_fn: Callable, *args, **kwargs) -> Any:
+        """Await ``coro_fn(*args, **kwargs)`` once per in-flight ``key``"""
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coro_fn(*args, **kwargs))
+            self._tasks[key] = task
+            self._executions += 1
+            task.add_done_callback(lambda _task, key=key: self._release(key, _task))
+        else:
+            self._coalesced += 1
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every waiter went away
+            task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoints"""
+        total = self._executions + self._coalesced
+        return {
+            'executions': self._executions,
+            'coalesced_requests': self._coalesced,
+            'in_flight': len(self._tasks),
+            'coalescing_ratio': round(self._coalesced / total, 4) if total else 0.0
+        }
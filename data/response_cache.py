@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Response Cache
+==============
+
+LRU + TTL cache of correlation API results keyed by canonicalized input.
+The frontend resubmits the same form again and again while users try
+what-if variations; with the cache a repeated submission is answered from
+memory instead of running the analysis again.
+
+Keys are the endpoint name plus the request payload with sorted keys,
+numbers rounded to a fixed number of decimals (so 8.5, 8.50 and
+8.500000001 share an entry) and timestamp fields removed. Only the
+computed result is cached; each endpoint still builds its response
+envelope (input echo, timestamps) per request, and an 'analysis_timestamp'
+in a cached result is refreshed on every hit. Failed computations are not
+cached. SingleFlight (request_coalescing.py) still collapses concurrent
+misses, so the cache and coalescing complement each other.
+
+Configuration (environment variables, <PREFIX> is e.g. NIROGYA_RESPONSE_CACHE):
+    <PREFIX>_SIZE       entries kept across all endpoints   (default: 1024, 0 disables)
+    <PREFIX>_TTL        seconds an entry stays valid        (default: 300)
+    <PREFIX>_DECIMALS   decimals numbers are rounded to     (default: 6)
+
+Usage:
+    response_cache = ResponseCache.from_env("NIROGYA_RESPONSE_CACHE")
+    result, hit = response_cache.get_or_compute('water-quality', {'water_params': params},
+                                                analyzer.assess_water_quality_risk, params)
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Tuple
+
+from request_coalescing import canonical_json_key
+
+
+def load_response_cache_settings(prefix: str) -> Dict[str, Any]:
+    """Read the cache limits from the environment"""
+    return {
+        'max_entries': int(os.environ.get(f"{prefix}_SIZE", 1024)),
+        'ttl': float(os.environ.get(f"{prefix}_TTL", 300.0)),
+        'decimals': int(os.environ.get(f"{prefix}_DECIMALS", 6))
+    }
+
+
+def _is_timestamp_field(key: Any) -> bool:
+    return isinstance(key, str) and (key == 'timestamp' or key.endswith('_timestamp'))
+
+
+def canonicalize(payload: Any, decimals: int = 6) -> Any:
+    """Payload with numbers rounded and timestamp fields removed (keys are sorted by the key function)"""
+    if isinstance(payload, dict):
+        return {key: canonicalize(value, decimals) for key, value in payload.items()
+                if not _is_timestamp_field(key)}
+    if isinstance(payload, (list, tuple)):
+        return [canonicalize(value, decimals) for value in payload]
+    if isinstance(payload, (int, float)) and not isinstance(payload, bool):
+        # 150 and 150.0 share a key; + 0.0 turns -0.0 into 0.0
+        return round(float(payload), decimals) + 0.0
+    return payload
+
+
+def _refreshed(result: Any) -> Any:
+    """A cached result with a current analysis_timestamp (the cached object is never modified)"""
+    if isinstance(result, dict) and 'analysis_timestamp' in result:
+        return dict(result, analysis_timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    return result
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with a TTL and per-endpoint hit counters.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0, decimals: int = 6):
+        self.max_entries = max(0, int(max_entries))
+        self.ttl = float(ttl)
+        self.decimals = int(decimals)
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict[str, int]] = {}
+        self._evictions = 0
+        self._expirations = 0
+
+    @classmethod
+    def from_env(cls, prefix: str) -> 'ResponseCache':
+        return cls(**load_response_cache_settings(prefix))
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def key(self, endpoint: str, payload: Any) -> Tuple[str, str]:
+        return endpoint, canonical_json_key(canonicalize(payload, self.decimals))
+
+    def _count(self, endpoint: str, outcome: str):
+        counters = self._endpoints.setdefault(endpoint, {'hits': 0, 'misses': 0})
+        counters[outcome] += 1
+
+    def get(self, endpoint: str, payload: Any) -> Tuple[Any, bool]:
+        """(cached result, True) or (None, False); counts a hit or miss for the endpoint"""
+        if not self.enabled:
+            return None, False
+        key = self.key(endpoint, payload)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._count(endpoint, 'misses')
+                return None, False
+            self._entries.move_to_end(key)
+            self._count(endpoint, 'hits')
+        return _refreshed(entry[1]), True
+
+    def put(self, endpoint: str, payload: Any, result: Any):
+        """Store a result; callers must treat results as read-only once stored"""
+        if not self.enabled:
+            return
+        key = self.key(endpoint, payload)
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires_at, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def get_or_compute(self, endpoint: str, payload: Any, fn: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Cached result for the payload, or ``fn(*args, **kwargs)`` stored for next time.
+
+        Returns:
+            tuple: (result, served from cache)
+        """
+        result, hit = self.get(endpoint, payload)
+        if hit:
+            return result, True
+        result = fn(*args, **kwargs)
+        self.put(endpoint, payload, result)
+        return result, False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Size, eviction and per-endpoint hit counters for the metrics endpoint"""
+        with self._lock:
+            endpoints = {}
+            for endpoint, counters in self._endpoints.items():
+                lookups = counters['hits'] + counters['misses']
+                endpoints[endpoint] = dict(counters, hit_rate=round(counters['hits'] / lookups, 4))
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'decimals': self.decimals,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'endpoints': endpoints
+            }
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Precomputed Risk Lookup Grid
+============================
+
+Most /api/analyze requests (including every default submission of the
+frontend Prediction form) use values from a small space: 8 states, 12
+months, a few case counts and a few values per water parameter. This
+module evaluates IntegratedHealthAnalyzer once over a quantized grid of
+that space, stores the results in a SQLite file and answers on-grid
+requests with dictionary lookups instead of a full analysis.
+
+The grid is stored factorized so it stays small:
+- outbreak cells   (state, month, cases, water impact) -> disease prediction
+                   and 3-month forecast (the forecast only sees the WQI
+                   through its water-impact multiplier)
+- water cells      (ph, dissolved_oxygen, ..., temperature) -> water assessment
+The correlation, recommendations and risk scores are then made by the
+compiled decision tables (decision_rules.py) in a few microseconds, so
+edits to decision_rules.json apply to grid answers immediately.
+
+A request is answered from the grid when its state, month and case count
+are exactly grid values; the water assessment is read from the grid too
+when every parameter is a grid value and they come in grid order (the
+assessment lists risk factors in input order), and computed otherwise.
+Answers are identical to a full analysis. Off-grid outbreaks return None
+and the caller runs the full analysis.
+
+The grid file records a fingerprint of the analysis code (analyzer, WQI
+and forecast modules) and of the grid axes. A missing or stale grid is
+rebuilt when it is opened (about a second), so changed rules never
+serve old answers.
+
+Configuration (environment variables, <PREFIX> is e.g. NIROGYA_RISK_GRID):
+    <PREFIX>_ENABLED      serve on-grid requests from the grid   (default: 1)
+    <PREFIX>_PATH         SQLite file                            (default: risk_grid.sqlite next to this module)
+    <PREFIX>_AUTO_BUILD   rebuild a missing or stale grid on open (default: 1)
+
+Usage:
+    grid = RiskGrid.from_env("NIROGYA_RISK_GRID", analyzer).open()
+    analysis = grid.lookup(outbreak_data, water_params)   # None when off-grid
+
+    python risk_grid.py            # offline (re)build
+    python risk_grid.py --check    # report whether the stored grid is current
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from outbreak_forecast import water_risk_multiplier
+
+GRID_FORMAT = 1
+
+DEFAULT_GRID_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'risk_grid.sqlite')
+
+# Outbreak axes with the analyzer's defaults for missing fields
+OUTBREAK_AXES = {
+    'Northeast_State': tuple(range(1, 9)),
+    'Start_of_Outbreak_Month': tuple(range(1, 13)),
+    'No_of_Cases': (0, 5, 10, 20, 30, 50, 75, 100, 150, 200, 300, 500)
+}
+OUTBREAK_DEFAULTS = {'Northeast_State': 1, 'Start_of_Outbreak_Month': 7, 'No_of_Cases': 0}
+
+# Water axes, in the order requests must list the parameters
+WATER_AXES = {
+    'ph': (6.0, 6.5, 7.0, 7.5, 8.0, 8.5, 9.0),
+    'dissolved_oxygen': (1.0, 3.0, 5.0, 8.0),
+    'bod': (2.0, 3.0, 5.0, 10.0),
+    'nitrate_n': (5.0, 10.0, 12.0, 20.0),
+    'fecal_coliform': (0.0, 20.0, 50.0, 80.0, 200.0, 500.0),
+    'total_coliform': (100.0, 450.0, 500.0, 1000.0, 5000.0),
+    'temperature': (25.0, 28.0)
+}
+WATER_PARAMETERS = tuple(WATER_AXES)
+
+# Axis values as sets for constant-time on-grid checks
+_OUTBREAK_VALUES = [(field, OUTBREAK_DEFAULTS[field], frozenset(axis)) for field, axis in OUTBREAK_AXES.items()]
+_WATER_VALUES = [frozenset(axis) for axis in WATER_AXES.values()]
+
+FORECAST_MONTHS = 3
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE outbreak_cells (
+    state REAL, month REAL, cases REAL, water_impact REAL,
+    disease_prediction TEXT NOT NULL, future_predictions TEXT NOT NULL,
+    PRIMARY KEY (state, month, cases, water_impact)
+);
+CREATE TABLE water_cells (cell TEXT PRIMARY KEY, water_assessment TEXT NOT NULL);
+"""
+
+
+def load_grid_settings(prefix: str) -> Dict[str, Any]:
+    """Read the grid location and switches from the environment"""
+    def flag(name: str) -> bool:
+        return os.environ.get(f"{prefix}_{name}", "1").strip().lower() not in ("0", "false", "no", "off")
+
+    return {
+        'enabled': flag("ENABLED"),
+        'path': os.environ.get(f"{prefix}_PATH", DEFAULT_GRID_PATH),
+        'auto_build': flag("AUTO_BUILD")
+    }
+
+
+def rules_fingerprint(analyzer) -> str:
+    """Hash of the code the grid answers depend on, plus the grid axes"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps({'format': GRID_FORMAT, 'outbreak': OUTBREAK_AXES, 'water': WATER_AXES,
+                              'forecast_months': FORECAST_MONTHS}, sort_keys=True).encode())
+    for module_name in (type(analyzer).__module__, 'wqi_engine', 'outbreak_forecast'):
+        with open(sys.modules[module_name].__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _on_axis(value, axis: frozenset) -> bool:
+    return value.__class__ in (int, float) and value in axis
+
+
+class RiskGrid:
+    """
+    On-grid /api/analyze answers from a precomputed SQLite grid.
+    """
+
+    def __init__(self, analyzer, path: str = DEFAULT_GRID_PATH, enabled: bool = True, auto_build: bool = True):
+        self.analyzer = analyzer
+        self.path = path
+        self.enabled = enabled
+        self.auto_build = auto_build
+
+        # Raw JSON per cell; replaced as a whole when the grid is (re)loaded
+        self._outbreak_cells: Dict[Tuple, Tuple[str, str]] = {}
+        self._water_cells: Dict[Tuple, str] = {}
+        self.fingerprint = None
+        self.built_at = None
+        self.build_seconds = None
+        self.status = 'not loaded'
+
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._water_hits = 0
+        self._misses = 0
+
+    @classmethod
+    def from_env(cls, prefix: str, analyzer) -> 'RiskGrid':
+        return cls(analyzer, **load_grid_settings(prefix))
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._outbreak_cells) and bool(self._water_cells)
+
+    # ---- building ----------------------------------------------------------
+
+    def build(self) -> 'RiskGrid':
+        """Evaluate the analyzer over the grid and write the SQLite file"""
+        started = time.perf_counter()
+        fingerprint = rules_fingerprint(self.analyzer)
+
+        # Stage outputs of the analyzer itself; its progress messages are not wanted here
+        with contextlib.redirect_stdout(io.StringIO()):
+            water_rows = []
+            impact_wqi = {}
+            for values in itertools.product(*WATER_AXES.values()):
+                water_params = dict(zip(WATER_PARAMETERS, values))
+                assessment = self.analyzer.assess_water_quality_risk(water_params)
+                impact_wqi.setdefault(water_risk_multiplier(assessment['wqi']), assessment['wqi'])
+                water_rows.append((json.dumps(values), json.dumps(assessment)))
+
+            outbreak_rows = []
+            for state, month, cases in itertools.product(*OUTBREAK_AXES.values()):
+                outbreak_data = {'No_of_Cases': cases, 'Northeast_State': state, 'Start_of_Outbreak_Month': month}
+                prediction = json.dumps(self.analyzer.predict_disease_from_outbreak(outbreak_data))
+                for impact, wqi in impact_wqi.items():
+                    future = self.analyzer.predict_future_outbreak_trend(
+                        outbreak_data, {}, months_ahead=FORECAST_MONTHS, wqi=wqi)
+                    outbreak_rows.append((state, month, cases, impact, prediction, json.dumps(future)))
+
+        built_at = datetime.now().isoformat()
+        build_seconds = time.perf_counter() - started
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        connection = sqlite3.connect(tmp_path)
+        try:
+            with connection:
+                connection.executescript(_SCHEMA)
+                connection.executemany("INSERT INTO meta VALUES (?, ?)", [
+                    ('fingerprint', fingerprint),
+                    ('built_at', built_at),
+                    ('build_seconds', f"{build_seconds:.3f}")
+                ])
+                connection.executemany("INSERT INTO water_cells VALUES (?, ?)", water_rows)
+                connection.executemany("INSERT INTO outbreak_cells VALUES (?, ?, ?, ?, ?, ?)", outbreak_rows)
+        finally:
+            connection.close()
+        # Readers never see a half-written grid
+        os.replace(tmp_path, self.path)
+        return self
+
+    # ---- loading -----------------------------------------------------------
+
+    def _read(self) -> Optional[str]:
+        """Load the grid file into memory; returns its fingerprint (None if unreadable)"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            try:
+                meta = dict(connection.execute("SELECT key, value FROM meta"))
+                water_cells = {tuple(json.loads(cell)): assessment
+                               for cell, assessment in connection.execute("SELECT * FROM water_cells")}
+                outbreak_cells = {(state, month, cases, impact): (prediction, future)
+                                  for state, month, cases, impact, prediction, future
+                                  in connection.execute("SELECT * FROM outbreak_cells")}
+            finally:
+                connection.close()
+        except sqlite3.DatabaseError:
+            return None
+        self._water_cells, self._outbreak_cells = water_cells, outbreak_cells
+        self.fingerprint = meta.get('fingerprint')
+        self.built_at = meta.get('built_at')
+        self.build_seconds = float(meta['build_seconds']) if 'build_seconds' in meta else None
+        return self.fingerprint
+
+    def is_current(self) -> bool:
+        """Whether the stored grid matches the current rules"""
+        return self.fingerprint is not None and self.fingerprint == rules_fingerprint(self.analyzer)
+
+    def open(self) -> 'RiskGrid':
+        """Load the grid, rebuilding it first when it is missing or stale"""
+        if not self.enabled:
+            self.status = 'disabled'
+            return self
+        current = rules_fingerprint(self.analyzer)
+        if self._read() != current:
+            if not self.auto_build:
+                self._water_cells, self._outbreak_cells = {}, {}
+                self.status = 'stale' if self.fingerprint else 'missing'
+                print(f"⚠️ Risk grid {self.status} at {self.path}; on-grid requests use full analysis")
+                return self
+            try:
+                self.build()
+            except (OSError, sqlite3.Error) as e:
+                self.status = 'build failed'
+                print(f"⚠️ Could not build risk grid at {self.path}: {e}")
+                return self
+            self._read()
+            print(f"✅ Risk grid rebuilt ({len(self._outbreak_cells)} outbreak cells, "
+                  f"{len(self._water_cells)} water cells, {self.build_seconds:.2f}s)")
+        self.status = 'ready'
+        return self
+
+    # ---- serving -----------------------------------------------------------
+
+    def outbreak_key(self, outbreak_data: Dict[str, Any]) -> Optional[Tuple]:
+        """(state, month, cases) of an on-grid outbreak, else None"""
+        key = tuple(outbreak_data.get(field, default) for field, default, _ in _OUTBREAK_VALUES)
+        if all(_on_axis(value, axis) for value, (_, _, axis) in zip(key, _OUTBREAK_VALUES)):
+            return key
+        return None
+
+    def water_key(self, water_params: Dict[str, Any]) -> Optional[Tuple]:
+        """Parameter values of an on-grid water sample in grid order, else None"""
+        if tuple(water_params) != WATER_PARAMETERS:
+            return None
+        key = tuple(water_params.values())
+        if all(_on_axis(value, axis) for value, axis in zip(key, _WATER_VALUES)):
+            return key
+        return None
+
+    def lookup(self, outbreak_data: Dict[str, Any], water_params: Dict[str, Any],
+               include_future: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        The integrated analysis of a request with an on-grid outbreak.
+
+        The water assessment comes from the grid too when the sample is
+        on-grid; otherwise it is computed (a few microseconds).
+
+        Returns:
+            dict: Same structure and values as analyze_integrated_scenario(),
+                  or None when the outbreak is off-grid (or no grid is loaded)
+        """
+        outbreak_key = self.outbreak_key(outbreak_data) if self.ready else None
+        if outbreak_key is None:
+            with self._stats_lock:
+                self._misses += 1
+            return None
+
+        water_key = self.water_key(water_params)
+        assessment_json = self._water_cells.get(water_key) if water_key is not None else None
+        if assessment_json is not None:
+            water_assessment = json.loads(assessment_json)
+        else:
+            water_assessment = self.analyzer.assess_water_quality_risk(water_params)
+        try:
+            water_impact = water_risk_multiplier(water_assessment['wqi'])
+        except (KeyError, TypeError, ValueError):
+            # Unusable water values: the full analysis reports them
+            with self._stats_lock:
+                self._misses += 1
+            return None
+        prediction_json, future_json = self._outbreak_cells[outbreak_key + (water_impact,)]
+        with self._stats_lock:
+            self._hits += 1
+            self._water_hits += assessment_json is not None
+
+        disease_prediction = json.loads(prediction_json)
+        # Report the cases as given (e.g. 150.0 rather than the grid's 150)
+        disease_prediction['predicted_cases'] = outbreak_key[2]
+        decision = self.analyzer.decision_tables.decide(
+            self.analyzer.decision_context(disease_prediction, water_assessment, water_params)
+        )
+        return {
+            'disease_prediction': disease_prediction,
+            'water_assessment': water_assessment,
+            'correlation_analysis': decision['correlation_analysis'],
+            'future_predictions': json.loads(future_json) if include_future else None,
+            'recommendations': decision['recommendations'],
+            'risk_scores': decision['risk_scores'],
+            'alert_level': decision['alert_level'],
+            'analysis_timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Grid state and hit counters for the metrics endpoint"""
+        with self._stats_lock:
+            lookups = self._hits + self._misses
+            return {
+                'enabled': self.enabled,
+                'status': self.status,
+                'path': self.path,
+                'outbreak_cells': len(self._outbreak_cells),
+                'water_cells': len(self._water_cells),
+                'built_at': self.built_at,
+                'build_seconds': self.build_seconds,
+                'hits': self._hits,
+                'water_hits': self._water_hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the precomputed /api/analyze risk grid")
+    parser.add_argument('--path', default=load_grid_settings("NIROGYA_RISK_GRID")['path'],
+                        help="SQLite file (default: NIROGYA_RISK_GRID_PATH or risk_grid.sqlite)")
+    parser.add_argument('--check', action='store_true',
+                        help="Only report whether the stored grid matches the current rules")
+    args = parser.parse_args()
+
+    from disease_water_correlation import IntegratedHealthAnalyzer
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer = IntegratedHealthAnalyzer()
+    grid = RiskGrid(analyzer, path=args.path)
+
+    if args.check:
+        grid._read()
+        if grid.is_current():
+            print(f"✅ Risk grid at {args.path} is current (built {grid.built_at})")
+            return 0
+        print(f"⚠️ Risk grid at {args.path} is {'stale' if grid.fingerprint else 'missing'}")
+        return 1
+
+    try:
+        grid.build()._read()
+    except (OSError, sqlite3.Error) as e:
+        print(f"❌ Error building risk grid: {str(e)}")
+        return 1
+    print(f"✅ Built risk grid at {args.path}: {len(grid._outbreak_cells)} outbreak cells, "
+          f"{len(grid._water_cells)} water cells in {grid.build_seconds:.2f}s "
+          f"({os.path.getsize(args.path) / 1e6:.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
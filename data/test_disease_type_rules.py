@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Disease Type Rules Parity Test
+==============================
+
+Checks that the vectorized disease-type rules give the same answer whatever
+container the outbreak records come in (list of dicts, DataFrame, dict of
+columns, one record at a time), including sparse records with missing keys
+and blank cells as found in historical CSVs.
+
+Usage:
+    python test_disease_type_rules.py
+    python -m pytest test_disease_type_rules.py
+"""
+
+import numpy as np
+import pandas as pd
+
+from disease_type_rules import OUTBREAK_COLUMNS, OUTBREAK_DISEASE_RULES, QUICK_DISEASE_RULES
+
+
+def sparse_records(n_records=5000, seed=42):
+    """Random outbreak records; each field is present, missing or blank (None / NaN)"""
+    rng = np.random.default_rng(seed)
+    ranges = {
+        'No_of_Deaths': (0, 12),
+        'Start_of_Outbreak_Month': (1, 13),
+        'Start_of_Outbreak_Season': (1, 5),
+        'Cases_Lag_1': (0, 60)
+    }
+    records = []
+    for _ in range(n_records):
+        record = {}
+        for column, (low, high) in ranges.items():
+            draw = rng.random()
+            if draw < 0.6:
+                record[column] = float(rng.integers(low, high))
+            elif draw < 0.7:
+                record[column] = None
+            elif draw < 0.8:
+                record[column] = float('nan')
+        records.append(record)
+    return records
+
+
+def test_sparse_record_parity():
+    """Lists, DataFrames, dicts of columns and single records agree on sparse records"""
+    records = sparse_records()
+    frame = pd.DataFrame(records)
+    columns = {column: frame[column].tolist() for column in frame.columns}
+
+    for rules in (OUTBREAK_DISEASE_RULES, QUICK_DISEASE_RULES):
+        expected = rules.predict(records)
+        for batch in (frame, columns):
+            result = rules.predict(batch)
+            assert np.array_equal(result['probabilities'], expected['probabilities'])
+            assert list(result['labels']) == list(expected['labels'])
+
+        for i, record in enumerate(records[:500]):
+            single = rules.predict_record(record)
+            assert single['most_likely'] == expected['labels'][i]
+            assert single['probability'] == round(expected['top_probability'][i], 1)
+
+
+def test_blank_cells_use_defaults():
+    """A blank cell scores like a record without that field"""
+    missing = [{'No_of_Deaths': 1, 'Start_of_Outbreak_Month': 7}]
+    blank = pd.DataFrame([{'No_of_Deaths': 1, 'Start_of_Outbreak_Month': 7, 'Start_of_Outbreak_Season': 2},
+                          {'No_of_Deaths': 1, 'Start_of_Outbreak_Month': 7}])
+    expected = OUTBREAK_DISEASE_RULES.predict(missing)['probabilities'][0]
+    assert np.array_equal(OUTBREAK_DISEASE_RULES.predict(blank)['probabilities'][1], expected)
+
+    default_record = {column: default for column, default in OUTBREAK_COLUMNS.values()}
+    assert np.array_equal(OUTBREAK_DISEASE_RULES.predict([{}])['probabilities'],
+                          OUTBREAK_DISEASE_RULES.predict([default_record])['probabilities'])
+
+
+def main():
+    """Run all parity checks"""
+    print("🧪 Disease Type Rules Parity Test")
+    print("=" * 40)
+    tests = [test_sparse_record_parity, test_blank_cells_use_defaults]
+    failures = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {test.__name__}: {str(e) or 'values differ'}")
+    print(f"\n{len(tests) - failures}/{len(tests)} checks passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
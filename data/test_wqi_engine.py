@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+WQI Engine Parity Test
+======================
+
+Checks the vectorized WQI engine against the original scalar calculate_wqi
+(the if/else chain that used to be copied into disease_water_correlation.py,
+water_quality_assessment.py and quick_predict_water_quality.py) on random
+samples, threshold boundaries, NaN values and the northeast dataset.
+
+Usage:
+    python test_wqi_engine.py
+    python -m pytest test_wqi_engine.py
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from wqi_engine import (WQI_DEFAULTS, assess_wqi, calculate_wqi, calculate_wqi_batch,
+                        categorize_wqi, wqi_category)
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'northeast_water_quality_data.csv')
+
+
+def legacy_calculate_wqi(water_params, use_defaults=False):
+    """The original scalar implementation, kept verbatim as the reference"""
+    get = (lambda key, default: water_params.get(key, default)) if use_defaults \
+        else (lambda key, default: water_params[key])
+    weights = {
+        'ph': 0.15,
+        'dissolved_oxygen': 0.20,
+        'bod': 0.15,
+        'nitrate_n': 0.15,
+        'fecal_coliform': 0.20,
+        'total_coliform': 0.15
+    }
+
+    wqi = 0
+
+    ph_val = get('ph', 7.0)
+    if 6.5 <= ph_val <= 8.5:
+        ph_score = 0
+    else:
+        ph_score = min(abs(ph_val - 7.0) * 15, 100)
+    wqi += weights['ph'] * ph_score
+
+    do_val = get('dissolved_oxygen', 5.0)
+    if do_val >= 5:
+        do_score = 0
+    else:
+        do_score = (5 - do_val) * 20
+    wqi += weights['dissolved_oxygen'] * min(do_score, 100)
+
+    bod_val = get('bod', 3.0)
+    if bod_val <= 3:
+        bod_score = 0
+    else:
+        bod_score = (bod_val - 3) * 10
+    wqi += weights['bod'] * min(bod_score, 100)
+
+    nitrate_val = get('nitrate_n', 5.0)
+    if nitrate_val <= 10:
+        nitrate_score = nitrate_val * 2
+    else:
+        nitrate_score = 20 + (nitrate_val - 10) * 8
+    wqi += weights['nitrate_n'] * min(nitrate_score, 100)
+
+    fc_val = get('fecal_coliform', 20.0)
+    if fc_val <= 50:
+        fc_score = fc_val * 0.5
+    else:
+        fc_score = 25 + (fc_val - 50) * 0.1
+    wqi += weights['fecal_coliform'] * min(fc_score, 100)
+
+    tc_val = get('total_coliform', 100.0)
+    if tc_val <= 500:
+        tc_score = tc_val * 0.05
+    else:
+        tc_score = 25 + (tc_val - 500) * 0.01
+    wqi += weights['total_coliform'] * min(tc_score, 100)
+
+    return wqi
+
+
+def legacy_category(wqi):
+    """The original assess_water_quality_risk categorization"""
+    if wqi <= 25:
+        return "Excellent", "Low"
+    elif wqi <= 50:
+        return "Good", "Low"
+    elif wqi <= 75:
+        return "Moderate", "Medium"
+    elif wqi <= 100:
+        return "Poor", "High"
+    return "Very Poor", "Very High"
+
+
+def random_samples(n_samples=5000, seed=42):
+    """Random samples spanning every branch, plus exact threshold values"""
+    rng = np.random.default_rng(seed)
+    ranges = {
+        'ph': (0.0, 14.0),
+        'dissolved_oxygen': (-1.0, 15.0),
+        'bod': (0.0, 30.0),
+        'nitrate_n': (0.0, 40.0),
+        'fecal_coliform': (0.0, 2000.0),
+        'total_coliform': (0.0, 20000.0)
+    }
+    boundaries = {
+        'ph': [6.5, 8.5, 7.0, 0.3333333333333, 13.6666666667],
+        'dissolved_oxygen': [5.0, 0.0, 4.999999, 0.1],
+        'bod': [3.0, 13.0, 3.0000001],
+        'nitrate_n': [10.0, 20.0, 0.1],
+        'fecal_coliform': [50.0, 800.0, 0.1],
+        'total_coliform': [500.0, 8000.0, 0.1]
+    }
+    samples = []
+    for _ in range(n_samples):
+        sample = {}
+        for parameter, (low, high) in ranges.items():
+            if rng.random() < 0.2:
+                sample[parameter] = float(rng.choice(boundaries[parameter]))
+            else:
+                sample[parameter] = float(rng.uniform(low, high))
+        samples.append(sample)
+    return samples
+
+
+def test_scalar_parity():
+    """calculate_wqi matches the original function value for value"""
+    for sample in random_samples():
+        assert calculate_wqi(sample) == legacy_calculate_wqi(sample)
+
+
+def test_batch_parity():
+    """Every batch input form matches the original function exactly"""
+    samples = random_samples()
+    expected = np.array([legacy_calculate_wqi(sample) for sample in samples])
+
+    frame = pd.DataFrame(samples)
+    columns = {parameter: frame[parameter].tolist() for parameter in frame.columns}
+    for batch in (samples, frame, columns):
+        assert np.array_equal(calculate_wqi_batch(batch), expected)
+    assert np.array_equal(assess_wqi(frame)['wqi'].to_numpy(), expected)
+
+
+def test_category_parity():
+    """Batch and scalar categories match the original thresholds"""
+    values = np.concatenate([np.linspace(0, 120, 2401), [25.0, 50.0, 75.0, 100.0]])
+    categories, risks = categorize_wqi(values)
+    for value, category, risk in zip(values, categories, risks):
+        assert (category, risk) == legacy_category(value)
+        assert wqi_category(value) == legacy_category(value)
+
+
+def test_defaults_and_missing_parameters():
+    """Defaults fill absent parameters only when asked; otherwise KeyError"""
+    samples = random_samples(500, seed=7)
+    for i, sample in enumerate(samples):
+        sample.pop(list(WQI_DEFAULTS)[i % len(WQI_DEFAULTS)])
+        assert calculate_wqi(sample, use_defaults=True) == legacy_calculate_wqi(sample, use_defaults=True)
+    expected = np.array([legacy_calculate_wqi(sample, use_defaults=True) for sample in samples])
+    assert np.array_equal(calculate_wqi_batch(samples, use_defaults=True), expected)
+    assert calculate_wqi({}, use_defaults=True) == legacy_calculate_wqi({}, use_defaults=True)
+
+    for batch in (samples[0], samples, pd.DataFrame(samples).drop(columns=['ph'])):
+        try:
+            calculate_wqi_batch(batch)
+        except KeyError:
+            continue
+        raise AssertionError("Missing parameter did not raise KeyError")
+
+
+def test_nan_values():
+    """NaN measurements give a NaN WQI on both paths"""
+    sample = dict(WQI_DEFAULTS, bod=float('nan'))
+    assert np.isnan(calculate_wqi(sample)) and np.isnan(legacy_calculate_wqi(sample))
+    assert np.isnan(calculate_wqi_batch([sample])[0])
+    assert wqi_category(calculate_wqi(sample)) == ('Unknown', 'Unknown')
+
+
+def test_northeast_dataset():
+    """The bundled dataset scores identically row by row"""
+    frame = pd.read_csv(DATA_FILE)
+    expected = np.array([legacy_calculate_wqi(row) for row in frame.to_dict('records')])
+    assert np.array_equal(calculate_wqi_batch(frame), expected, equal_nan=True)
+
+
+def main():
+    """Run all parity checks"""
+    print("🧪 WQI Engine Parity Test")
+    print("=" * 40)
+    tests = [test_scalar_parity, test_batch_parity, test_category_parity,
+             test_defaults_and_missing_parameters, test_nan_values, test_northeast_dataset]
+    failures = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {test.__name__}: {str(e) or 'values differ'}")
+    print(f"\n{len(tests) - failures}/{len(tests)} checks passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
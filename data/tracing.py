@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Structured, Sampled Tracing
+===========================
+
+Lightweight spans and events for the analysis hot path, replacing per-call
+print() status lines. A trace starts at the outermost span (one analyzed
+scenario, for example) and is kept or dropped as a whole according to the
+sampling rate; nested spans and events inherit that decision, so an
+unsampled scenario costs a couple of attribute lookups per stage and no I/O.
+Warnings and errors are always emitted, sampled or not.
+
+Records go through the standard logging module ("nirogya.trace" logger).
+In JSON mode a bounded QueueHandler hands them to a background
+QueueListener that writes one compact JSON object per line, so request
+threads never block on the terminal or the disk; when the queue is full,
+records are dropped and counted instead of slowing the caller. Console mode
+prints the human-readable status messages synchronously for CLI tools.
+
+Each JSON line carries: ts, level, type (span/event), name, trace_id,
+span_id, parent_id, pid, duration_ms (spans) and the span/event fields.
+
+Configuration (environment variables):
+    NIROGYA_TRACE_OUTPUT       off | console | stderr | stdout | <file path>  (default: stderr)
+    NIROGYA_TRACE_SAMPLE_RATE  fraction of traces kept, 0.0 - 1.0             (default: 0.01)
+    NIROGYA_TRACE_LEVEL        DEBUG | INFO | WARNING | ERROR                 (default: INFO)
+    NIROGYA_TRACE_QUEUE_SIZE   records buffered for the writer thread         (default: 10000)
+
+Usage:
+    from tracing import trace_span, trace_event
+
+    with trace_span("analyze_scenario", cases=120) as span:
+        with trace_span("water_assessment"):
+            ...
+        span.set(alert_level="HIGH")
+        trace_event("disease_predicted", "✅ Predicted: Cholera", disease="Cholera")
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+TRACE_LOGGER = "nirogya.trace"
+OUTPUT_ENV = "NIROGYA_TRACE_OUTPUT"
+SAMPLE_RATE_ENV = "NIROGYA_TRACE_SAMPLE_RATE"
+LEVEL_ENV = "NIROGYA_TRACE_LEVEL"
+QUEUE_SIZE_ENV = "NIROGYA_TRACE_QUEUE_SIZE"
+
+# The innermost open span of the current thread / task
+_current_span: contextvars.ContextVar = contextvars.ContextVar("nirogya_trace_span", default=None)
+
+
+def _new_id() -> str:
+    return '%016x' % random.getrandbits(64)
+
+
+def load_tracing_settings() -> Dict[str, Any]:
+    """Read the tracing configuration from the environment"""
+    return {
+        'output': os.environ.get(OUTPUT_ENV, 'stderr'),
+        'sample_rate': min(1.0, max(0.0, float(os.environ.get(SAMPLE_RATE_ENV, 0.01)))),
+        'level': os.environ.get(LEVEL_ENV, 'INFO').upper(),
+        'queue_size': max(1, int(os.environ.get(QUEUE_SIZE_ENV, 10000)))
+    }
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One compact JSON object per trace record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='microseconds'),
+            'level': record.levelname
+        }
+        payload.update(getattr(record, 'trace', None) or {'type': 'log', 'message': record.getMessage()})
+        return json.dumps(payload, separators=(',', ':'), default=str, ensure_ascii=False)
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records when the queue is full"""
+
+    def __init__(self, record_queue: queue.Queue):
+        super().__init__(record_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Trace records are formatted by the listener; skip the message merge
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class Span:
+    """One timed stage of a trace"""
+
+    __slots__ = ('tracer', 'name', 'trace_id', 'span_id', 'parent_id', 'fields', 'started', '_token')
+
+    sampled = True
+
+    def __init__(self, tracer: 'Tracer', name: str, trace_id: str, parent_id: Optional[str], fields: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id()
+        self.parent_id = parent_id
+        self.fields = fields
+        self.started = 0.0
+        self._token = None
+
+    def set(self, **fields):
+        """Attach result fields to the span record"""
+        self.fields.update(fields)
+
+    def __enter__(self) -> 'Span':
+        self._token = _current_span.set(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.started
+        _current_span.reset(self._token)
+        level = logging.INFO
+        if exc_type is not None:
+            level = logging.ERROR
+            self.fields['error'] = f"{exc_type.__name__}: {exc}"
+        self.tracer._emit(level, 'span', self.name, self.trace_id, self.span_id, self.parent_id,
+                          dict(self.fields, duration_ms=round(duration * 1000, 3)))
+        return False
+
+
+class _UnsampledSpan:
+    """Stand-in for spans of a dropped trace: keeps nesting, emits nothing"""
+
+    __slots__ = ('tracer', 'name', 'trace_id', 'is_root', '_token')
+
+    sampled = False
+    span_id = None
+
+    def __init__(self, tracer: 'Tracer', name: str, trace_id: Optional[str], is_root: bool):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.is_root = is_root
+        self._token = None
+
+    def set(self, **fields):
+        pass
+
+    def __enter__(self) -> '_UnsampledSpan':
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        if exc_type is not None and self.is_root:
+            # Failures are always reported, even from unsampled traces
+            self.tracer._emit(logging.ERROR, 'event', 'trace_failed', self.trace_id, None, None,
+                              {'span': self.name, 'error': f"{exc_type.__name__}: {exc}"})
+        return False
+
+
+class Tracer:
+    """
+    Sampling span/event front end over the "nirogya.trace" logger.
+    """
+
+    def __init__(self, sample_rate: float = 0.01, level: int = logging.INFO,
+                 logger: Optional[logging.Logger] = None):
+        self.sample_rate = sample_rate
+        self.level = level
+        self.logger = logger or logging.getLogger(TRACE_LOGGER)
+        self.queue_handler: Optional[_DroppingQueueHandler] = None
+        self._stats_lock = threading.Lock()
+        self._traces = 0
+        self._sampled_traces = 0
+        self._records = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.logger.isEnabledFor(logging.CRITICAL)
+
+    def span(self, name: str, **fields):
+        """
+        Context manager timing one stage.
+
+        The outermost span starts a trace and decides sampling for it.
+        """
+        parent = _current_span.get()
+        if parent is None:
+            sampled = self.enabled and self.sample_rate > 0 and random.random() < self.sample_rate
+            with self._stats_lock:
+                self._traces += 1
+                self._sampled_traces += sampled
+            trace_id = _new_id() + _new_id() if self.enabled else None
+            if not sampled or self.level > logging.INFO:
+                return _UnsampledSpan(self, name, trace_id, True)
+            return Span(self, name, trace_id, None, fields)
+        if not parent.sampled or self.level > logging.INFO:
+            return _UnsampledSpan(self, name, parent.trace_id, False)
+        return Span(self, name, parent.trace_id, parent.span_id, fields)
+
+    def event(self, name: str, message: Optional[str] = None, level: int = logging.INFO, **fields):
+        """
+        Record a point-in-time event in the current span.
+
+        Events below WARNING follow the trace's sampling decision (events
+        outside any span are sampled on their own); warnings and errors are
+        always emitted.
+        """
+        if level < self.level:
+            return
+        parent = _current_span.get()
+        if level < logging.WARNING:
+            if parent is None:
+                if not (self.enabled and random.random() < self.sample_rate):
+                    return
+            elif not parent.sampled:
+                return
+        if message is not None:
+            fields['message'] = message
+        self._emit(level, 'event', name, parent.trace_id if parent else None,
+                   parent.span_id if parent else None, None, fields)
+
+    def _emit(self, level: int, record_type: str, name: str, trace_id: Optional[str],
+              span_id: Optional[str], parent_id: Optional[str], fields: Dict[str, Any]):
+        if not self.logger.isEnabledFor(level):
+            return
+        trace = {'type': record_type, 'name': name, 'trace_id': trace_id}
+        if span_id is not None:
+            trace['span_id'] = span_id
+        if parent_id is not None:
+            trace['parent_id'] = parent_id
+        trace['pid'] = os.getpid()
+        trace.update(fields)
+        with self._stats_lock:
+            self._records += 1
+        self.logger.log(level, fields.get('message', name), extra={'trace': trace})
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Sampling and writer counters for the metrics endpoints"""
+        with self._stats_lock:
+            return {
+                'enabled': self.enabled,
+                'sample_rate': self.sample_rate,
+                'level': logging.getLevelName(self.level),
+                'traces': self._traces,
+                'sampled_traces': self._sampled_traces,
+                'records': self._records,
+                'queue_depth': self.queue_handler.queue.qsize() if self.queue_handler else 0,
+                'dropped_records': self.queue_handler.dropped if self.queue_handler else 0
+            }
+
+
+_tracer: Optional[Tracer] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()  # Flushes the records still queued
+        _listener = None
+
+
+def configure_tracing(output: Optional[str] = None, sample_rate: Optional[float] = None,
+                      level: Optional[str] = None, queue_size: Optional[int] = None) -> Tracer:
+    """
+    (Re)configure the process-wide tracer; omitted arguments come from the environment.
+
+    Args:
+        output: off, console, stderr, stdout or a JSON-lines file path
+        sample_rate: Fraction of traces kept (0.0 - 1.0)
+        level: Minimum level name (DEBUG, INFO, WARNING, ERROR)
+        queue_size: Records buffered for the background writer
+
+    Returns:
+        Tracer: The configured tracer
+    """
+    global _tracer, _listener
+    settings = load_tracing_settings()
+    output = settings['output'] if output is None else output
+    sample_rate = settings['sample_rate'] if sample_rate is None else min(1.0, max(0.0, float(sample_rate)))
+    level_value = logging.getLevelName((settings['level'] if level is None else level).upper())
+    if not isinstance(level_value, int):
+        level_value = logging.INFO
+    queue_size = settings['queue_size'] if queue_size is None else max(1, int(queue_size))
+
+    with _configure_lock:
+        _stop_listener()
+        logger = logging.getLogger(TRACE_LOGGER)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+        logger.propagate = False
+
+        tracer = Tracer(sample_rate, level_value, logger)
+        if output == 'off':
+            logger.setLevel(logging.CRITICAL + 1)
+        elif output == 'console':
+            # Synchronous, human-readable status lines for interactive tools
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            # Only records with a status message; span timings stay out of the terminal
+            handler.addFilter(lambda record: 'message' in (getattr(record, 'trace', None) or {'message': 1}))
+            logger.addHandler(handler)
+            logger.setLevel(level_value)
+        else:
+            if output in ('stderr', 'stdout'):
+                target = logging.StreamHandler(sys.stderr if output == 'stderr' else sys.stdout)
+            else:
+                target = logging.FileHandler(output, encoding='utf-8')
+            target.setFormatter(JsonLinesFormatter())
+            tracer.queue_handler = _DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+            logger.addHandler(tracer.queue_handler)
+            logger.setLevel(level_value)
+            _listener = logging.handlers.QueueListener(tracer.queue_handler.queue, target)
+            _listener.start()
+
+        _tracer = tracer
+        return tracer
+
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer, configured from the environment on first use"""
+    if _tracer is None:
+        configure_tracing()
+    return _tracer
+
+
+def trace_span(name: str, **fields):
+    """Span on the process-wide tracer (see Tracer.span)"""
+    return get_tracer().span(name, **fields)
+
+
+def trace_event(name: str, message: Optional[str] = None, level: int = logging.INFO, **fields):
+    """Event on the process-wide tracer (see Tracer.event)"""
+    get_tracer().event(name, message, level, **fields)
+
+
+atexit.register(_stop_listener)
@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Flattened Tree-Ensemble Evaluator
+=================================
+
+Exports the saved tree ensembles (GradientBoosting outbreak model,
+RandomForest water quality regressor and classifier) into flat NumPy node
+arrays and evaluates them for many rows at once.
+
+sklearn's predict() walks the ensemble one estimator at a time from Python,
+paying input validation and a Python call per tree. Here the nodes of all
+trees are concatenated into shared arrays (feature, threshold, children,
+values) and every (row, tree) pair advances one level per step, so a whole
+batch takes max_depth vectorized steps regardless of the number of trees.
+
+Trees are evaluated deepest first, so each step only touches the trees
+that are still deep enough to move; thresholds are pre-rounded to float32
+so comparisons run on float32 input without changing any split decision.
+The per-call overhead disappears: single rows and what-if sweeps of a few
+hundred rows score 2-80x faster. Past that NumPy's per-element cost exceeds
+sklearn's compiled traversal (100k-row batches run at roughly 0.5-0.9x
+model.predict throughput on one core), so predict() hands batches from
+SKLEARN_BATCH_ROWS rows on to the source sklearn model when one is
+attached. Large historical backfills therefore score at model.predict
+speed, never slower. An ensemble exported with from_sklearn keeps its
+model; one rebuilt from plain arrays can get a loader that brings the
+model in on the first large batch (model_registry.py attaches one for
+bundles that still have their pickles). Without either, every batch runs
+on the flat arrays. The benchmark CLI shows the crossover on a given
+machine.
+
+Features:
+- Supports GradientBoostingRegressor, RandomForestRegressor and
+  RandomForestClassifier (including NaN routing of sklearn >= 1.3 trees)
+- Splits are compared on float32-cast inputs, exactly as sklearn does
+- Bounded memory: rows are evaluated in chunks
+- Large batches go to the attached sklearn model (SKLEARN_BATCH_ROWS)
+- Plain NumPy arrays, so an exported ensemble needs no sklearn to run
+- Benchmark CLI comparing speed and agreement with model.predict
+
+Usage:
+    ensemble = FlatTreeEnsemble.from_sklearn(joblib.load(model_path))
+    predictions = ensemble.predict(X)
+
+    python tree_ensemble.py --rows 1,100,10000,100000
+    python tree_ensemble.py --model saved_models/randomforest_regressor_20250905_215908.pkl
+"""
+
+import argparse
+import glob
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+# sklearn marks a leaf with this child index
+TREE_LEAF = -1
+
+KIND_GRADIENT_BOOSTING = 'gradient_boosting_regressor'
+KIND_FOREST_REGRESSOR = 'random_forest_regressor'
+KIND_FOREST_CLASSIFIER = 'random_forest_classifier'
+
+# Rows per chunk; keeps the (rows x trees) working arrays cache-sized
+DEFAULT_CHUNK_SIZE = 256
+
+# Smallest batch handed to the source sklearn model, per kind: the measured
+# crossover of the saved ensembles on one core (python tree_ensemble.py)
+SKLEARN_BATCH_ROWS = {
+    KIND_GRADIENT_BOOSTING: 256,
+    KIND_FOREST_REGRESSOR: 2048,
+    KIND_FOREST_CLASSIFIER: 2048
+}
+
+
+class FlatTreeEnsemble:
+    """
+    A tree ensemble as flat node arrays
+
+    Output for a row is ``base_score + scale * sum(leaf values over trees)``:
+    the learning rate and initial estimate for gradient boosting, the tree
+    average for forests (class probabilities for a classifier).
+    """
+
+    def __init__(self, kind: str, n_features: int, feature: np.ndarray, threshold: np.ndarray,
+                 children: np.ndarray, missing_go_to_left: np.ndarray, value: np.ndarray,
+                 roots: np.ndarray, tree_depths: np.ndarray, base_score: np.ndarray, scale: float,
+                 classes: Optional[np.ndarray] = None, feature_importances: Optional[np.ndarray] = None):
+        """
+        Args:
+            kind: One of the KIND_* constants
+            n_features: Number of input columns
+            feature: Split feature per node (leaves point at feature 0)
+            threshold: Split threshold per node
+            children: (n_nodes, 2) [right, left] child per node; leaves point at themselves
+            missing_go_to_left: Whether NaN goes left at each node
+            value: (n_nodes, n_outputs) leaf values
+            roots: Root node index of each tree
+            tree_depths: Depth of each tree
+            base_score: (n_outputs,) value added to every prediction
+            scale: Multiplier applied to the summed leaf values
+            classes: Class labels (classifiers only)
+            feature_importances: The source model's feature_importances_, if known
+        """
+        self.kind = kind
+        self.n_features = n_features
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.missing_go_to_left = missing_go_to_left
+        self.value = value
+        self.roots = roots
+        self.tree_depths = tree_depths
+        self.max_depth = int(tree_depths.max()) if len(tree_depths) else 0
+        self.base_score = base_score
+        self.scale = scale
+        self.classes = classes
+        self.feature_importances_ = feature_importances
+
+        # sklearn model for large batches, or a loader that provides it on first use
+        self.source_model = None
+        self.source_loader: Optional[Callable[[], Any]] = None
+        self.sklearn_batch_rows = SKLEARN_BATCH_ROWS.get(kind)
+        self._source_lock = threading.Lock()
+        self._compile()
+
+    def _compile(self):
+        """
+        Evaluation layout derived from the exported arrays
+
+        Node i's data sits at slot 2 * i and its child for a go-left flag g
+        at slot 2 * i + g, so a traversal step is ``children[node + go]``
+        on doubled ids with no multiply. Thresholds become the largest
+        float32 <= the float64 threshold: for float32 inputs ``x <= t32``
+        then decides exactly like ``x <= threshold``.
+        """
+        threshold32 = self.threshold.astype(np.float32)
+        rounded_up = threshold32.astype(np.float64) > self.threshold
+        threshold32[rounded_up] = np.nextafter(threshold32[rounded_up], np.float32(-np.inf))
+
+        self._feature2 = np.repeat(self.feature, 2)
+        self._threshold2 = np.repeat(threshold32, 2)
+        self._missing_left2 = np.repeat(self.missing_go_to_left, 2)
+        self._children2 = (self.children * 2).ravel()
+        self._value_columns = [np.ascontiguousarray(self.value[:, output]) for output in range(self.value.shape[1])]
+        self._handles_missing = bool(self.missing_go_to_left.any())
+
+        # Deepest trees first; step L only needs the first _active_trees[L] of them
+        self._tree_order = np.argsort(-self.tree_depths, kind='stable')
+        self._roots2 = self.roots[self._tree_order] * 2
+        sorted_depths = self.tree_depths[self._tree_order]
+        self._active_trees = [int((sorted_depths > level).sum()) for level in range(self.max_depth)]
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def n_features_in_(self) -> int:
+        return self.n_features
+
+    @property
+    def classes_(self) -> Optional[np.ndarray]:
+        return self.classes
+
+    @classmethod
+    def from_sklearn(cls, model) -> 'FlatTreeEnsemble':
+        """Export a fitted sklearn ensemble"""
+        ensemble = cls._export_sklearn(model)
+        ensemble.feature_importances_ = np.asarray(model.feature_importances_, dtype=np.float64)
+        ensemble.source_model = model
+        return ensemble
+
+    def _large_batch_model(self, n_rows: int):
+        """The sklearn model when a batch of n_rows should go to it, else None"""
+        if self.sklearn_batch_rows is None or n_rows < self.sklearn_batch_rows:
+            return None
+        if self.source_model is None and self.source_loader is not None:
+            with self._source_lock:
+                if self.source_model is None and self.source_loader is not None:
+                    loader, self.source_loader = self.source_loader, None
+                    try:
+                        self.source_model = loader()
+                    except Exception as e:
+                        # Keep serving from the flat arrays
+                        print(f"⚠️ Could not load the sklearn model for large batches: {e}")
+        return self.source_model
+
+    @classmethod
+    def _export_sklearn(cls, model) -> 'FlatTreeEnsemble':
+        model_type = type(model).__name__
+
+        if model_type == 'GradientBoostingRegressor':
+            trees = [estimator.tree_ for estimator in model.estimators_[:, 0]]
+            if model.init_ == 'zero':
+                base_score = np.zeros(1)
+            else:
+                # DummyRegressor init: the same constant for every row
+                base_score = np.atleast_1d(model.init_.predict(np.zeros((1, model.n_features_in_)))).astype(np.float64)
+            return cls._from_trees(KIND_GRADIENT_BOOSTING, model.n_features_in_, trees,
+                                   base_score=base_score, scale=model.learning_rate)
+
+        if model_type == 'RandomForestRegressor':
+            if model.n_outputs_ != 1:
+                raise ValueError("Only single-output forests are supported")
+            trees = [estimator.tree_ for estimator in model.estimators_]
+            return cls._from_trees(KIND_FOREST_REGRESSOR, model.n_features_in_, trees,
+                                   base_score=np.zeros(1), scale=1.0 / len(trees))
+
+        if model_type == 'RandomForestClassifier':
+            if model.n_outputs_ != 1:
+                raise ValueError("Only single-output forests are supported")
+            trees = [estimator.tree_ for estimator in model.estimators_]
+            return cls._from_trees(KIND_FOREST_CLASSIFIER, model.n_features_in_, trees,
+                                   base_score=np.zeros(len(model.classes_)), scale=1.0 / len(trees),
+                                   classes=np.asarray(model.classes_), normalize=True)
+
+        raise ValueError(f"Unsupported model type: {model_type}")
+
+    @classmethod
+    def _from_trees(cls, kind: str, n_features: int, trees: List, base_score: np.ndarray, scale: float,
+                    classes: Optional[np.ndarray] = None, normalize: bool = False) -> 'FlatTreeEnsemble':
+        """Concatenate sklearn Tree objects, renumbering children into the shared arrays"""
+        features, thresholds, children, missing, values, roots, depths = [], [], [], [], [], [], []
+        offset = 0
+
+        for tree in trees:
+            n = tree.node_count
+            node_ids = np.arange(n, dtype=np.int64) + offset
+            is_leaf = tree.children_left == TREE_LEAF
+
+            feature = np.where(is_leaf, 0, tree.feature).astype(np.int64)
+            left = np.where(is_leaf, node_ids, tree.children_left + offset)
+            right = np.where(is_leaf, node_ids, tree.children_right + offset)
+
+            # (n_nodes, n_outputs=1, n_classes) -> (n_nodes, n_classes)
+            value = tree.value[:, 0, :].astype(np.float64)
+            if normalize:
+                totals = value.sum(axis=1, keepdims=True)
+                value = np.divide(value, totals, out=np.zeros_like(value), where=totals > 0)
+
+            if hasattr(tree, 'missing_go_to_left'):
+                go_left = np.asarray(tree.missing_go_to_left, dtype=bool) & ~is_leaf
+            else:
+                go_left = np.zeros(n, dtype=bool)
+
+            features.append(feature)
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            children.append(np.stack([right, left], axis=1))
+            missing.append(go_left)
+            values.append(value)
+            roots.append(offset)
+            depths.append(tree.max_depth)
+            offset += n
+
+        return cls(kind, n_features,
+                   feature=np.concatenate(features),
+                   threshold=np.concatenate(thresholds),
+                   children=np.ascontiguousarray(np.concatenate(children)),
+                   missing_go_to_left=np.concatenate(missing),
+                   value=np.ascontiguousarray(np.concatenate(values)),
+                   roots=np.asarray(roots, dtype=np.int64),
+                   tree_depths=np.asarray(depths, dtype=np.int64),
+                   base_score=np.asarray(base_score, dtype=np.float64),
+                   scale=float(scale),
+                   classes=classes)
+
+    def _prepare_input(self, X) -> np.ndarray:
+        """float32 input, as sklearn's trees see it"""
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if self.kind == KIND_GRADIENT_BOOSTING and np.isnan(X).any():
+            # Like GradientBoostingRegressor itself, which has no NaN routing
+            raise ValueError("Input X contains NaN")
+        return X
+
+    def _apply_chunk(self, X: np.ndarray) -> np.ndarray:
+        """
+        Doubled leaf ids reached by every (tree, row) pair of a chunk
+
+        Returns:
+            ndarray: (n_trees * n_rows,) tree-major, trees in _tree_order
+        """
+        n_rows = X.shape[0]
+        flat_X = X.ravel()
+        nodes = np.repeat(self._roots2, n_rows)
+        row_offsets = np.tile(np.arange(n_rows, dtype=np.int64) * self.n_features, self.n_trees)
+
+        for active in self._active_trees:
+            k = active * n_rows
+            current = nodes[:k]
+            x = flat_X.take(row_offsets[:k] + self._feature2.take(current))
+            go_left = x <= self._threshold2.take(current)
+            if self._handles_missing:
+                go_left |= np.isnan(x) & self._missing_left2.take(current)
+            nodes[:k] = self._children2.take(current + go_left)
+
+        return nodes
+
+    def apply(self, X) -> np.ndarray:
+        """
+        Leaf node (flat index) reached by every row in every tree
+
+        Returns:
+            ndarray: (n_rows, n_trees) node indices, trees in export order
+        """
+        X = self._prepare_input(X)
+        leaves = np.empty((X.shape[0], self.n_trees), dtype=np.int64)
+        for start in range(0, X.shape[0], DEFAULT_CHUNK_SIZE):
+            chunk = X[start:start + DEFAULT_CHUNK_SIZE]
+            nodes = (self._apply_chunk(chunk) >> 1).reshape(self.n_trees, -1)
+            leaves[start:start + len(chunk), self._tree_order] = nodes.T
+        return leaves
+
+    def _raw_predict(self, X, chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+        """(n_rows, n_outputs) ensemble output"""
+        X = self._prepare_input(X)
+        n_outputs = self.value.shape[1]
+        output = np.empty((X.shape[0], n_outputs))
+        for start in range(0, X.shape[0], chunk_size):
+            chunk = X[start:start + chunk_size]
+            leaves = self._apply_chunk(chunk) >> 1
+            for column, values in enumerate(self._value_columns):
+                output[start:start + len(chunk), column] = values.take(leaves).reshape(self.n_trees, -1).sum(axis=0)
+        return self.base_score + self.scale * output
+
+    def predict(self, X, chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+        """Same result as model.predict (to floating point summation order)"""
+        model = self._large_batch_model(len(X) if np.ndim(X) > 1 else 1)
+        if model is not None:
+            return np.asarray(model.predict(X))
+        return self._predict_flat(X, chunk_size)
+
+    def _predict_flat(self, X, chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+        """predict() on the flat arrays whatever the batch size"""
+        output = self._raw_predict(X, chunk_size)
+        if self.kind == KIND_FOREST_CLASSIFIER:
+            return self.classes[np.argmax(output, axis=1)]
+        return output[:, 0]
+
+    def predict_proba(self, X, chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+        """Class probabilities, classifiers only"""
+        if self.kind != KIND_FOREST_CLASSIFIER:
+            raise ValueError("predict_proba is only available for classifiers")
+        model = self._large_batch_model(len(X) if np.ndim(X) > 1 else 1)
+        if model is not None:
+            return np.asarray(model.predict_proba(X))
+        return self._raw_predict(X, chunk_size)
+
+    def get_info(self) -> Dict:
+        return {
+            'kind': self.kind,
+            'n_features': self.n_features,
+            'n_trees': self.n_trees,
+            'n_nodes': self.n_nodes,
+            'max_depth': self.max_depth,
+            'sklearn_batch_rows': self.sklearn_batch_rows,
+            'sklearn_model_loaded': self.source_model is not None
+        }
+
+
+def make_benchmark_rows(ensemble: FlatTreeEnsemble, n_rows: int, seed: int = 42) -> np.ndarray:
+    """
+    Random rows spread over each feature's split range, so every branch of
+    the trees gets exercised.
+    """
+    rng = np.random.default_rng(seed)
+    X = np.zeros((n_rows, ensemble.n_features))
+    is_split = ensemble.children[:, 0] != np.arange(ensemble.n_nodes)
+    for f in range(ensemble.n_features):
+        thresholds = ensemble.threshold[is_split & (ensemble.feature == f)]
+        if len(thresholds):
+            low, high = thresholds.min(), thresholds.max()
+            margin = max((high - low) * 0.1, 1.0)
+            X[:, f] = rng.uniform(low - margin, high + margin, n_rows)
+    return X
+
+
+def benchmark_model(model, ensemble: FlatTreeEnsemble, name: str, n_rows: int, repeats: int = 3) -> Dict:
+    """Time model.predict against the flat evaluator and the routed predict(), and measure agreement"""
+    X = make_benchmark_rows(ensemble, n_rows)
+
+    def best_time(predict):
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = predict(X)
+            timings.append(time.perf_counter() - start)
+        return min(timings), result
+
+    sklearn_time, expected = best_time(model.predict)
+    flat_time, actual = best_time(ensemble._predict_flat)
+    routed_time, _ = best_time(ensemble.predict)
+
+    result = {
+        'model': name,
+        'rows': n_rows,
+        'sklearn_ms': round(sklearn_time * 1000, 2),
+        'flat_ms': round(flat_time * 1000, 2),
+        'speedup': round(sklearn_time / flat_time, 2) if flat_time else None,
+        'predict_ms': round(routed_time * 1000, 2),
+        'predict_speedup': round(sklearn_time / routed_time, 2) if routed_time else None
+    }
+    if ensemble.kind == KIND_FOREST_CLASSIFIER:
+        result['label_agreement'] = float(np.mean(actual == expected))
+        result['max_abs_proba_diff'] = float(np.abs(ensemble._raw_predict(X) - model.predict_proba(X)).max())
+    else:
+        result['max_abs_diff'] = float(np.abs(actual - expected).max())
+    return result
+
+
+def find_default_models(models_dir: str) -> List[str]:
+    """Latest saved file of each supported ensemble"""
+    paths = []
+    for prefix in ['gradient_boosting_model_', 'randomforest_regressor_', 'randomforest_classifier_']:
+        matches = sorted(glob.glob(os.path.join(models_dir, f"{prefix}*.pkl")))
+        if matches:
+            paths.append(matches[-1])
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the flattened tree-ensemble evaluator against model.predict",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python tree_ensemble.py
+  python tree_ensemble.py --rows 500000 --repeats 5
+  python tree_ensemble.py --model saved_models/randomforest_classifier_20250905_215908.pkl
+        """
+    )
+    parser.add_argument('--model', action='append', help='Model .pkl to benchmark (repeatable; default: saved ensembles)')
+    parser.add_argument('--models-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'saved_models'),
+                        help='Directory searched for the default models')
+    parser.add_argument('--rows', default='1,100,10000,100000',
+                        help='Comma-separated batch sizes to benchmark (default: 1,100,10000,100000)')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per model (best is reported)')
+    args = parser.parse_args()
+
+    import joblib
+    import warnings
+    # model.predict on a bare array warns that the model was fitted with feature names
+    warnings.filterwarnings('ignore', message='X does not have valid feature names')
+
+    try:
+        row_counts = [int(value) for value in args.rows.split(',')]
+    except ValueError:
+        parser.error("--rows must be comma-separated integers")
+
+    paths = args.model or find_default_models(args.models_dir)
+    if not paths:
+        print(f"❌ No tree ensembles found in {args.models_dir}")
+        sys.exit(1)
+
+    print(f"🌲 Benchmarking {len(paths)} model(s)\n")
+    for path in paths:
+        name = os.path.basename(path)
+        try:
+            model = joblib.load(path)
+            ensemble = FlatTreeEnsemble.from_sklearn(model)
+        except Exception as e:
+            print(f"❌ {name}: {e}\n")
+            continue
+
+        info = ensemble.get_info()
+        print(f"📦 {name} ({info['kind']}, {info['n_trees']} trees, {info['n_nodes']} nodes, depth {info['max_depth']})")
+        print(f"   {'rows':>8}  {'model.predict':>14}  {'flat':>10}  {'speedup':>8}  "
+              f"{'predict()':>10}  {'speedup':>8}  agreement (flat)")
+        for n_rows in row_counts:
+            result = benchmark_model(model, ensemble, name, n_rows, args.repeats)
+            if 'label_agreement' in result:
+                agreement = f"labels {result['label_agreement']:.2%}, proba diff {result['max_abs_proba_diff']:.1e}"
+            else:
+                agreement = f"max diff {result['max_abs_diff']:.1e}"
+            print(f"   {n_rows:>8,}  {result['sklearn_ms']:>11.2f} ms  {result['flat_ms']:>7.2f} ms  "
+                  f"{result['speedup']:>7}x  {result['predict_ms']:>7.2f} ms  {result['predict_speedup']:>7}x  {agreement}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
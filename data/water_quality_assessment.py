@@ -12,68 +12,7 @@ Purpose: Quick water quality assessment using standardized WQI calculation
 import numpy as np
 from datetime import datetime
 
-def calculate_wqi(water_params):
-    """Calculate Water Quality Index using standardized formula"""
-    weights = {
-        'ph': 0.15,
-        'dissolved_oxygen': 0.20,
-        'bod': 0.15,
-        'nitrate_n': 0.15,
-        'fecal_coliform': 0.20,
-        'total_coliform': 0.15
-    }
-    
-    wqi = 0
-    
-    # pH scoring (optimal range: 6.5-8.5)
-    ph_val = water_params['ph']
-    if 6.5 <= ph_val <= 8.5:
-        ph_score = 0
-    else:
-        ph_score = min(abs(ph_val - 7.0) * 15, 100)
-    wqi += weights['ph'] * ph_score
-    
-    # Dissolved Oxygen scoring (higher is better, >5 mg/L is good)
-    do_val = water_params['dissolved_oxygen']
-    if do_val >= 5:
-        do_score = 0
-    else:
-        do_score = (5 - do_val) * 20
-    wqi += weights['dissolved_oxygen'] * min(do_score, 100)
-    
-    # BOD scoring (lower is better, <3 mg/L is good)
-    bod_val = water_params['bod']
-    if bod_val <= 3:
-        bod_score = 0
-    else:
-        bod_score = (bod_val - 3) * 10
-    wqi += weights['bod'] * min(bod_score, 100)
-    
-    # Nitrate scoring (lower is better, <10 mg/L is good)
-    nitrate_val = water_params['nitrate_n']
-    if nitrate_val <= 10:
-        nitrate_score = nitrate_val * 2
-    else:
-        nitrate_score = 20 + (nitrate_val - 10) * 8
-    wqi += weights['nitrate_n'] * min(nitrate_score, 100)
-    
-    # Fecal Coliform scoring (lower is better, <50 CFU/100mL is good)
-    fc_val = water_params['fecal_coliform']
-    if fc_val <= 50:
-        fc_score = fc_val * 0.5
-    else:
-        fc_score = 25 + (fc_val - 50) * 0.1
-    wqi += weights['fecal_coliform'] * min(fc_score, 100)
-    
-    # Total Coliform scoring (lower is better, <500 CFU/100mL is good)
-    tc_val = water_params['total_coliform']
-    if tc_val <= 500:
-        tc_score = tc_val * 0.05
-    else:
-        tc_score = 25 + (tc_val - 500) * 0.01
-    wqi += weights['total_coliform'] * min(tc_score, 100)
-    
-    return wqi
+from wqi_engine import calculate_wqi
 
 def get_sample_inputs():
     """Provide sample water quality scenarios"""
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Vectorized Water Quality Index Engine
+=====================================
+
+One implementation of the standardized Water Quality Index (WQI) used by the
+correlation analyzer, the water quality assessment tool and the quick
+prediction script. Each parameter has a weight, a default and a sub-index
+score (0 = ideal, capped at 100); the WQI is the weighted sum of the
+sub-indices, so higher values mean worse water.
+
+Sub-indices are evaluated column-wise with NumPy, so scoring every sample of
+northeast_water_quality_data.csv or a batch of scenarios is a handful of
+array operations instead of an if/else chain per sample. The same rule
+table also evaluates plain Python values, and terms are added in the same
+order on both paths, so calculate_wqi() on one dict and calculate_wqi_batch()
+on many return identical numbers.
+
+Features:
+- Accepts a DataFrame, a list of sample dicts, a single dict or a dict of columns
+- Per-parameter sub-index scores, weighted WQI and quality/risk categories
+- Missing parameters raise KeyError, or fall back to defaults on request
+- NaN measurements propagate to a NaN WQI with category 'Unknown'
+
+Usage:
+    from wqi_engine import calculate_wqi, assess_wqi
+
+    wqi = calculate_wqi(water_params)                 # one sample, float
+    report = assess_wqi(pd.read_csv('northeast_water_quality_data.csv'))
+
+    python wqi_engine.py --input northeast_water_quality_data.csv --output wqi.csv
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def _where(condition, if_true, if_false):
+    """Element-wise choice for column arrays, plain choice for single values"""
+    if isinstance(condition, np.ndarray):
+        return np.where(condition, if_true, if_false)
+    return if_true if condition else if_false
+
+
+def _cap(score, limit=100):
+    """Cap a sub-index score (NaN stays NaN on both paths)"""
+    if isinstance(score, np.ndarray):
+        return np.minimum(score, limit)
+    return min(score, limit)
+
+
+# (parameter, weight, default, sub-index) in summation order. Each sub-index
+# maps the measured value to a 0-100 penalty score.
+WQI_PARAMETERS = [
+    # pH (optimal range: 6.5-8.5)
+    ('ph', 0.15, 7.0,
+     lambda v: _where((6.5 <= v) & (v <= 8.5), 0, _cap(abs(v - 7.0) * 15))),
+    # Dissolved Oxygen (higher is better, >5 mg/L is good)
+    ('dissolved_oxygen', 0.20, 5.0,
+     lambda v: _cap(_where(v >= 5, 0, (5 - v) * 20))),
+    # BOD (lower is better, <3 mg/L is good)
+    ('bod', 0.15, 3.0,
+     lambda v: _cap(_where(v <= 3, 0, (v - 3) * 10))),
+    # Nitrate (lower is better, <10 mg/L is good)
+    ('nitrate_n', 0.15, 5.0,
+     lambda v: _cap(_where(v <= 10, v * 2, 20 + (v - 10) * 8))),
+    # Fecal Coliform (lower is better, <50 CFU/100mL is good)
+    ('fecal_coliform', 0.20, 20.0,
+     lambda v: _cap(_where(v <= 50, v * 0.5, 25 + (v - 50) * 0.1))),
+    # Total Coliform (lower is better, <500 CFU/100mL is good)
+    ('total_coliform', 0.15, 100.0,
+     lambda v: _cap(_where(v <= 500, v * 0.05, 25 + (v - 500) * 0.01))),
+]
+
+WQI_WEIGHTS = {parameter: weight for parameter, weight, _, _ in WQI_PARAMETERS}
+WQI_DEFAULTS = {parameter: default for parameter, _, default, _ in WQI_PARAMETERS}
+
+# (upper WQI bound, quality category, risk level); anything above is Very Poor
+WQI_CATEGORIES = [
+    (25, 'Excellent', 'Low'),
+    (50, 'Good', 'Low'),
+    (75, 'Moderate', 'Medium'),
+    (100, 'Poor', 'High'),
+]
+WORST_CATEGORY = ('Very Poor', 'Very High')
+UNKNOWN_CATEGORY = ('Unknown', 'Unknown')
+
+
+def wqi_columns(samples, use_defaults=False):
+    """
+    Extract the WQI parameters from a batch of samples as float arrays.
+
+    Args:
+        samples: DataFrame, list of sample dicts, a single dict, or a dict of columns
+        use_defaults (bool): Use WQI_DEFAULTS for absent parameters instead of raising
+
+    Returns:
+        dict: One float64 array per WQI parameter
+
+    Raises:
+        KeyError: A parameter is absent and use_defaults is False
+    """
+    if isinstance(samples, dict):
+        values = list(samples.values())
+        if values and all(np.ndim(value) == 0 for value in values):
+            samples = [samples]  # A single sample
+
+    if isinstance(samples, (pd.DataFrame, dict)):
+        n_rows = len(samples) if isinstance(samples, pd.DataFrame) else len(next(iter(samples.values()), []))
+
+        def get_column(parameter, default):
+            if parameter in samples:
+                return np.asarray(samples[parameter], dtype=np.float64)
+            if not use_defaults:
+                raise KeyError(parameter)
+            return np.full(n_rows, default, dtype=np.float64)
+    else:
+        def get_column(parameter, default):
+            if use_defaults:
+                return np.array([sample.get(parameter, default) for sample in samples], dtype=np.float64)
+            return np.array([sample[parameter] for sample in samples], dtype=np.float64)
+
+    return {parameter: get_column(parameter, default) for parameter, default in WQI_DEFAULTS.items()}
+
+
+def wqi_subindices(columns):
+    """
+    Sub-index score per parameter.
+
+    Args:
+        columns (dict): wqi_columns() arrays, or one sample's plain values
+
+    Returns:
+        dict: Parameter -> 0-100 score (arrays for arrays, floats for floats)
+    """
+    return {parameter: subindex(columns[parameter]) for parameter, _, _, subindex in WQI_PARAMETERS}
+
+
+def calculate_wqi_batch(samples, use_defaults=False):
+    """
+    WQI for every sample of a batch.
+
+    Args:
+        samples: DataFrame, list of sample dicts, a single dict, or a dict of columns
+        use_defaults (bool): Use WQI_DEFAULTS for absent parameters instead of raising
+
+    Returns:
+        ndarray: One WQI value per sample
+    """
+    return _weighted_sum(wqi_subindices(wqi_columns(samples, use_defaults)))
+
+
+def _weighted_sum(subindices):
+    """Add the weighted sub-index arrays in table order, as the scalar path does"""
+    wqi = np.zeros(len(subindices['ph']))
+    for parameter, weight, _, _ in WQI_PARAMETERS:
+        wqi += weight * subindices[parameter]
+    return wqi
+
+
+def calculate_wqi(water_params, use_defaults=False):
+    """
+    Calculate Water Quality Index using standardized formula.
+
+    Scalar wrapper over the same rule table, evaluated on plain values
+    (much cheaper than a one-row array for single samples).
+
+    Args:
+        water_params (dict): Parameter values of one sample
+        use_defaults (bool): Use WQI_DEFAULTS for absent parameters instead of raising
+
+    Returns:
+        float: WQI (0 = ideal, higher is worse)
+    """
+    wqi = 0
+    for parameter, weight, default, subindex in WQI_PARAMETERS:
+        value = water_params.get(parameter, default) if use_defaults else water_params[parameter]
+        wqi += weight * subindex(value)
+    return wqi
+
+
+def wqi_category(wqi):
+    """(quality category, risk level) for one WQI value"""
+    if wqi != wqi:
+        return UNKNOWN_CATEGORY
+    for upper, category, risk in WQI_CATEGORIES:
+        if wqi <= upper:
+            return category, risk
+    return WORST_CATEGORY
+
+
+def categorize_wqi(wqi):
+    """
+    Quality categories and risk levels for an array of WQI values.
+
+    Returns:
+        tuple: (category array, risk array)
+    """
+    wqi = np.asarray(wqi, dtype=np.float64)
+    conditions = [np.isnan(wqi)] + [wqi <= upper for upper, _, _ in WQI_CATEGORIES]
+    categories = np.select(conditions, [UNKNOWN_CATEGORY[0]] + [c for _, c, _ in WQI_CATEGORIES],
+                           WORST_CATEGORY[0])
+    risks = np.select(conditions, [UNKNOWN_CATEGORY[1]] + [r for _, _, r in WQI_CATEGORIES],
+                      WORST_CATEGORY[1])
+    return categories, risks
+
+
+def assess_wqi(samples, use_defaults=False, include_subindices=True):
+    """
+    Full WQI assessment of a batch as a DataFrame.
+
+    Args:
+        samples: DataFrame, list of sample dicts, a single dict, or a dict of columns
+        use_defaults (bool): Use WQI_DEFAULTS for absent parameters instead of raising
+        include_subindices (bool): Add one <parameter>_score column per parameter
+
+    Returns:
+        DataFrame: The input columns (for DataFrame input) plus wqi,
+                   wqi_category and wqi_risk
+    """
+    columns = wqi_columns(samples, use_defaults)
+    subindices = wqi_subindices(columns)
+    wqi = _weighted_sum(subindices)
+
+    report = samples.copy() if isinstance(samples, pd.DataFrame) else pd.DataFrame(columns)
+    if include_subindices:
+        for parameter, scores in subindices.items():
+            report[f"{parameter}_score"] = scores
+    report['wqi'] = wqi
+    report['wqi_category'], report['wqi_risk'] = categorize_wqi(wqi)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized Water Quality Index assessment")
+    parser.add_argument('--input', default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                        'northeast_water_quality_data.csv'),
+                        help="CSV of water samples (default: northeast_water_quality_data.csv)")
+    parser.add_argument('--output', help="Write the assessed samples to this CSV")
+    parser.add_argument('--use-defaults', action='store_true',
+                        help="Use default values for parameters missing from the CSV")
+    args = parser.parse_args()
+
+    try:
+        samples = pd.read_csv(args.input)
+        started = time.perf_counter()
+        report = assess_wqi(samples, use_defaults=args.use_defaults)
+        elapsed = time.perf_counter() - started
+    except (OSError, KeyError, ValueError) as e:
+        print(f"❌ Error assessing {args.input}: {str(e)}")
+        return 1
+
+    print(f"🌊 Assessed {len(report)} samples in {elapsed * 1000:.2f} ms")
+    print(f"📊 Mean WQI: {np.nanmean(report['wqi']):.2f}" if report['wqi'].notna().any() else "📊 Mean WQI: n/a")
+    for category, count in report['wqi_category'].value_counts().items():
+        print(f"  {category}: {count}")
+
+    if args.output:
+        report.to_csv(args.output, index=False)
+        print(f"💾 Saved assessment to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
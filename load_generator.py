@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Load Generator for the Nirogya APIs
+===================================
+
+Drives the chatbot backend (/analyze-symptoms) and the correlation API
+(/api/analyze) with production-like traffic and reports latency percentiles,
+error rates and throughput, for sizing deployments ahead of the monsoon peak.
+
+Features:
+- Closed-loop mode: N concurrent users sending back-to-back requests
+- Open-loop mode: Poisson arrivals at a fixed rate, latency measured from the
+  scheduled send time so queueing delay is not hidden
+- Weighted English / Hinglish / regional symptom mixes built from the test
+  scripts and AI chatbot/regional.json
+- Correlation scenarios from data/test_correlation_scenarios.py with jitter
+- p50/p90/p95/p99 latency, error and shed (503) rates per endpoint and mix
+
+Usage:
+    python load_generator.py --concurrency 20 --duration 60
+    python load_generator.py --rate 50 --duration 120 --target backend
+    python load_generator.py --rate 30 --mix english=0.2,hinglish=0.5,regional=0.3
+    python load_generator.py --target correlation --concurrency 8 --output report.json
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+REGIONAL_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'AI chatbot', 'regional.json')
+
+NAMES = ['Ramesh', 'Priya', 'Suresh', 'Anita', 'Bikash', 'Lalremruati', 'Tenzing', 'Meena']
+
+# Inputs as sent by test_integration.py / test_speech_functionality.py
+ENGLISH_SYMPTOMS = [
+    "I have stomach pain and diarrhea",
+    "fever and vomiting since yesterday",
+    "severe diarrhea with dehydration and muscle cramps",
+    "high fever, headache and weakness",
+    "yellow eyes, dark urine and fatigue",
+    "blood in stool and abdominal pain",
+    "nausea and loss of appetite",
+    "watery stool and thirst"
+]
+
+HINGLISH_SYMPTOMS = [
+    "Mujhe pet mein dard hai",
+    "Pet mein dard, loose motion, bukhar hai",
+    "Pet dard hai, loose motion bhi aa raha hai",
+    "Bukhar hai, jee michla raha hai, kamjori lag rahi hai",
+    "Mujhe ulti aa rahi hai aur sir mein dard hai",
+    "bahut tez bukhar aur dast",
+    "kal se pet kharab hai aur ulti bhi",
+    "paani jaisa dast ho raha hai"
+]
+
+# Outbreak / water quality scenarios from data/test_correlation_scenarios.py
+CORRELATION_SCENARIOS = [
+    {
+        'outbreak_data': {'No_of_Cases': 25, 'Northeast_State': 1, 'Start_of_Outbreak_Month': 7},
+        'water_params': {'ph': 7.2, 'dissolved_oxygen': 7.5, 'bod': 2.0, 'nitrate_n': 5.0,
+                         'fecal_coliform': 15.0, 'total_coliform': 80.0, 'temperature': 24.0}
+    },
+    {
+        'outbreak_data': {'No_of_Cases': 500, 'Northeast_State': 2, 'Start_of_Outbreak_Month': 8},
+        'water_params': {'ph': 9.5, 'dissolved_oxygen': 1.0, 'bod': 25.0, 'nitrate_n': 30.0,
+                         'fecal_coliform': 800.0, 'total_coliform': 3500.0, 'temperature': 35.0}
+    },
+    {
+        'outbreak_data': {'No_of_Cases': 200, 'Northeast_State': 3, 'Start_of_Outbreak_Month': 6},
+        'water_params': {'ph': 8.0, 'dissolved_oxygen': 4.0, 'bod': 8.0, 'nitrate_n': 15.0,
+                         'fecal_coliform': 300.0, 'total_coliform': 1200.0, 'temperature': 30.0}
+    },
+    {
+        'outbreak_data': {'No_of_Cases': 150, 'Northeast_State': 2, 'Start_of_Outbreak_Month': 7},
+        'water_params': {'ph': 8.5, 'dissolved_oxygen': 3.0, 'bod': 5.0, 'nitrate_n': 12.0,
+                         'fecal_coliform': 80.0, 'total_coliform': 450.0, 'temperature': 28.0}
+    }
+]
+
+DEFAULT_MIX = {'english': 0.4, 'hinglish': 0.4, 'regional': 0.2}
+
+
+def load_regional_terms(path: str = REGIONAL_DATA_PATH) -> Dict[str, List[str]]:
+    """Regional vocabulary used to compose the 'regional' mix"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"⚠️ Could not load regional data from {path}: {e}")
+        return {}
+    return {section: list(terms.keys()) for section, terms in data.items() if isinstance(terms, dict)}
+
+
+class TrafficMix:
+    """Random request payloads drawn from the weighted input mixes"""
+
+    def __init__(self, mix: Dict[str, float], correlation_share: float, seed: Optional[int] = None):
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.mix_names = list(mix.keys())
+        self.mix_weights = list(mix.values())
+        self.correlation_share = correlation_share
+        self.regional_terms = load_regional_terms()
+
+    def regional_symptoms(self) -> str:
+        """Compose a sentence from regional.json the way users mix the terms"""
+        terms = self.regional_terms
+        if not terms.get('synonyms'):
+            return self.random.choice(HINGLISH_SYMPTOMS)
+        parts = []
+        if terms.get('time_indicators') and self.random.random() < 0.4:
+            parts.append(self.random.choice(terms['time_indicators']))
+        if terms.get('severity_indicators') and self.random.random() < 0.4:
+            parts.append(self.random.choice(terms['severity_indicators']))
+        parts.extend(self.random.sample(terms['synonyms'], k=min(len(terms['synonyms']), self.random.randint(1, 3))))
+        if terms.get('water_related_terms') and self.random.random() < 0.3:
+            parts.append(self.random.choice(terms['water_related_terms']))
+        return " aur ".join(parts) + " hai"
+
+    def next_request(self) -> Dict:
+        """Pick the next request: target API, input mix and JSON body"""
+        with self.lock:
+            if self.random.random() < self.correlation_share:
+                scenario = self.random.choice(CORRELATION_SCENARIOS)
+                water_params = {k: round(v * self.random.uniform(0.9, 1.1), 2)
+                                for k, v in scenario['water_params'].items()}
+                outbreak_data = dict(scenario['outbreak_data'])
+                outbreak_data['No_of_Cases'] = max(1, int(outbreak_data['No_of_Cases'] * self.random.uniform(0.8, 1.2)))
+                return {
+                    'target': 'correlation',
+                    'mix': 'scenario',
+                    'body': {'outbreak_data': outbreak_data, 'water_params': water_params,
+                             'include_future': True, 'months_ahead': 3}
+                }
+
+            mix = self.random.choices(self.mix_names, weights=self.mix_weights)[0]
+            if mix == 'english':
+                symptoms = self.random.choice(ENGLISH_SYMPTOMS)
+            elif mix == 'hinglish':
+                symptoms = self.random.choice(HINGLISH_SYMPTOMS)
+            else:
+                symptoms = self.regional_symptoms()
+            return {
+                'target': 'backend',
+                'mix': mix,
+                'body': {'name': self.random.choice(NAMES), 'symptoms': symptoms,
+                         'audio_input': self.random.random() < 0.3}
+            }
+
+
+class LoadStats:
+    """Thread-safe collection of per-request results"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.results = defaultdict(list)  # (target, mix) -> [(latency_s, outcome)]
+
+    def record(self, target: str, mix: str, latency: float, outcome: str):
+        with self.lock:
+            self.results[(target, mix)].append((latency, outcome))
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(results: List, elapsed: float) -> Dict:
+    """Latency percentiles (ms), error rates and throughput for one group"""
+    total = len(results)
+    latencies = sorted(latency * 1000 for latency, outcome in results if outcome == 'ok')
+    errors = sum(1 for _, outcome in results if outcome == 'error')
+    shed = sum(1 for _, outcome in results if outcome == 'shed')
+    return {
+        'requests': total,
+        'successful': len(latencies),
+        'errors': errors,
+        'shed_503': shed,
+        'error_rate': round(errors / total, 4) if total else 0.0,
+        'shed_rate': round(shed / total, 4) if total else 0.0,
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50), 2),
+            'p90': round(percentile(latencies, 90), 2),
+            'p95': round(percentile(latencies, 95), 2),
+            'p99': round(percentile(latencies, 99), 2),
+            'max': round(latencies[-1], 2) if latencies else 0.0
+        }
+    }
+
+
+class LoadGenerator:
+    """Sends the traffic mix to the APIs and collects the results"""
+
+    def __init__(self, args):
+        self.args = args
+        self.urls = {
+            'backend': args.backend_url.rstrip('/') + '/analyze-symptoms',
+            'correlation': args.correlation_url.rstrip('/') + '/api/analyze'
+        }
+        correlation_share = {'backend': 0.0, 'correlation': 1.0}.get(args.target, args.correlation_share)
+        self.traffic = TrafficMix(parse_mix(args.mix), correlation_share, args.seed)
+        self.stats = LoadStats()
+        self.local = threading.local()
+        self.measure_from = 0.0
+
+    def session(self) -> requests.Session:
+        """One keep-alive session per worker thread"""
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def send(self, scheduled_at: Optional[float] = None):
+        """Send one request; latency counts from the scheduled time in open-loop mode"""
+        req = self.traffic.next_request()
+        start = scheduled_at if scheduled_at is not None else time.perf_counter()
+        try:
+            response = self.session().post(self.urls[req['target']], json=req['body'], timeout=self.args.timeout)
+            if response.status_code == 503:
+                outcome = 'shed'
+            elif response.ok:
+                outcome = 'ok'
+            else:
+                outcome = 'error'
+        except requests.RequestException:
+            outcome = 'error'
+        finished = time.perf_counter()
+        if start >= self.measure_from:
+            self.stats.record(req['target'], req['mix'], finished - start, outcome)
+
+    def run_closed_loop(self, deadline: float):
+        """Each worker sends its next request as soon as the previous one returns"""
+        def user():
+            while time.perf_counter() < deadline:
+                self.send()
+
+        threads = [threading.Thread(target=user, daemon=True) for _ in range(self.args.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def run_open_loop(self, deadline: float):
+        """Poisson arrivals at --rate requests/s, independent of response times"""
+        arrivals = random.Random(self.args.seed)
+        with ThreadPoolExecutor(max_workers=self.args.concurrency) as pool:
+            next_send = time.perf_counter()
+            while next_send < deadline:
+                delay = next_send - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self.send, next_send)
+                next_send += arrivals.expovariate(self.args.rate)
+
+    def run(self) -> Dict:
+        args = self.args
+        start = time.perf_counter()
+        self.measure_from = start + args.warmup
+        deadline = self.measure_from + args.duration
+
+        if args.rate:
+            print(f"🚀 Open loop: {args.rate} req/s for {args.duration}s "
+                  f"(warm-up {args.warmup}s, up to {args.concurrency} in flight)")
+            self.run_open_loop(deadline)
+        else:
+            print(f"🚀 Closed loop: {args.concurrency} concurrent users for {args.duration}s "
+                  f"(warm-up {args.warmup}s)")
+            self.run_closed_loop(deadline)
+
+        elapsed = max(time.perf_counter() - self.measure_from, 1e-9)
+        report = {'config': vars(args), 'elapsed_seconds': round(elapsed, 2), 'groups': {}, 'targets': {}}
+        by_target = defaultdict(list)
+        for (target, mix), results in sorted(self.stats.results.items()):
+            report['groups'][f"{target}/{mix}"] = summarize(results, elapsed)
+            by_target[target].extend(results)
+        for target, results in by_target.items():
+            report['targets'][target] = summarize(results, elapsed)
+        report['overall'] = summarize([r for results in by_target.values() for r in results], elapsed)
+        return report
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Parse 'english=0.4,hinglish=0.4,regional=0.2' into normalized weights"""
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip().lower()
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown mix '{name}' (choose from {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight or 1.0)
+    total = sum(mix.values())
+    if total <= 0:
+        raise argparse.ArgumentTypeError("Mix weights must add up to more than 0")
+    return {name: weight / total for name, weight in mix.items()}
+
+
+def print_report(report: Dict):
+    """Display the results table"""
+    print("\n" + "=" * 100)
+    print(f"📊 LOAD TEST RESULTS ({report['elapsed_seconds']}s measured)")
+    print("=" * 100)
+    header = f"{'group':<24}{'reqs':>7}{'rps':>9}{'err%':>7}{'503%':>7}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>10}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report['groups'].items()) + [(f"{t} (all)", s) for t, s in report['targets'].items()]
+    rows.append(("overall", report['overall']))
+    for name, s in rows:
+        lat = s['latency_ms']
+        print(f"{name:<24}{s['requests']:>7}{s['throughput_rps']:>9.1f}{s['error_rate'] * 100:>7.1f}"
+              f"{s['shed_rate'] * 100:>7.1f}{lat['p50']:>9.1f}{lat['p90']:>9.1f}{lat['p95']:>9.1f}"
+              f"{lat['p99']:>9.1f}{lat['max']:>10.1f}")
+    print("\nLatencies in ms over successful requests; 503 = shed by admission control")
+
+
+def create_parser():
+    """Create command line argument parser"""
+    parser = argparse.ArgumentParser(description="Load generator for the Nirogya APIs")
+    parser.add_argument('--target', choices=['backend', 'correlation', 'both'], default='both',
+                        help='API(s) to drive (default: both)')
+    parser.add_argument('--backend-url', default='http://localhost:8001', help='Chatbot API base URL')
+    parser.add_argument('--correlation-url', default='http://localhost:5000', help='Correlation API base URL')
+    parser.add_argument('--correlation-share', type=float, default=0.3,
+                        help='Fraction of requests sent to the correlation API with --target both')
+    parser.add_argument('--concurrency', '-c', type=int, default=10,
+                        help='Concurrent users (closed loop) or max in-flight requests (open loop)')
+    parser.add_argument('--rate', '-r', type=float, default=0.0,
+                        help='Arrival rate in requests/s; enables open-loop mode')
+    parser.add_argument('--duration', '-d', type=float, default=30.0, help='Measured duration in seconds')
+    parser.add_argument('--warmup', type=float, default=5.0, help='Unmeasured warm-up in seconds')
+    parser.add_argument('--mix', default='', help='Input mix weights, e.g. english=0.4,hinglish=0.4,regional=0.2')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible traffic')
+    parser.add_argument('--output', '-o', help='Write the JSON report to this file')
+    return parser
+
+
+def main():
+    """Run the load test and print the report"""
+    args = create_parser().parse_args()
+    try:
+        parse_mix(args.mix)
+    except argparse.ArgumentTypeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    report = LoadGenerator(args).run()
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()